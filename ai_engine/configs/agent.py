@@ -84,12 +84,22 @@ class AgentConfig(BaseConfig):
         self.add_item("workspace", "workspace", des="Agent workspace directory")
         self.add_item("enable_rerank", False, des="Whether to use embed reranker")
         self.add_item("enable_kb", True, des="Whether to use knowledge base")
+        self.add_item("kb_vector_dtype", "float32", des="Storage dtype of knowledge base vectors", choices=["float32", "float16", "bfloat16", "int8"])
+        self.add_item("kb_index_type", "auto", des="Milvus vector index type, auto selects GPU_CAGRA on GPU servers", choices=["auto", "AUTOINDEX", "HNSW", "IVF_PQ", "GPU_CAGRA", "GPU_IVF_PQ"])
+        self.add_item("kb_chunk_cache", False, des="Cache chunks of processed files by content in the workspace, so re-added files skip chunking")
+        self.add_item("kb_search_micro_batching", False, des="Coalesce concurrent knowledge base searches into multi-query requests")
+        self.add_item("kb_itopk_size", 128, des="Intermediate result size for GPU_CAGRA search")
         self.add_item("enable_graph", True, des="Whether to use graph")
         self.add_item("enable_websearch", True, des="Whether to use web search")
         self.add_item("provider", "ollama", choices=["ollama", "openai", "anthropic", "google", "huggingface", "deepseek", "qwen"])
         self.add_item("model", "llama3.1:8b", des="Model name")
         self.add_item("embed_model", "ollama/bge-m3", des="Embedding model")
+        self.add_item("embed_micro_batching", False, des="Coalesce concurrent query embeddings into batches")
+        self.add_item("embed_jit", False, des="Compile local embedding models with torch.compile at load time")
+        self.add_item("embed_fp16", True, des="Run local embedding models at half precision on cuda")
+        self.add_item("query_embed_backend", "flag", des="Query embedding runtime for local models, onnx runs an int8 export on ONNX Runtime", choices=["flag", "onnx"])
         self.add_item("ranker", "ollama/bge-reranker-v2-m3", des="Ranking model")
+        self.add_item("rerank_backend", "flag", des="Reranker runtime, onnx runs an int8 export on ONNX Runtime (fp16 on cuda), decoder runs an LLM reranker", choices=["flag", "onnx", "decoder"])
         self.add_item("local_paths", {}, des="Local model paths")
         self.add_item("query_mode", "off", des="Query enhancement mode", choices=["off", "on", "hyde"])
         self.add_item("device", "cpu", des="Compute device", choices=["cpu", "cuda"])
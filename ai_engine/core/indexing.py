@@ -2,8 +2,10 @@
 This file contains the code for the indexing module.
 """
 
+import io
 import os
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from llama_index.core import Document
 from llama_index.core.node_parser import SimpleFileNodeParser
 from llama_index.core.node_parser import SentenceSplitter
@@ -12,6 +14,74 @@ from llama_index.readers.file import FlatReader, DocxReader
 from ai_engine.utils import hashstr, logger
 
 
+def _split_by_token_capacity(tokenizer, capacity):
+    """
+    Build a split function cutting text into pieces of at most capacity tokens
+
+    Each piece boundary is found by doubling the candidate end until it no
+    longer fits, then binary searching back, so a piece of n characters costs
+    O(log n) tokenizer calls instead of one call per character.
+    """
+    from llama_index.core.node_parser.text.utils import split_by_char
+
+    def fits(text):
+        return len(tokenizer(text)) <= capacity
+
+    def split(text):
+        pieces = []
+        start, size = 0, len(text)
+        while start < size:
+            lo, hi = start, min(start + capacity, size)
+            # Expand the search space until the window is over capacity
+            while fits(text[start:hi]):
+                lo = hi
+                if hi == size:
+                    break
+                hi = min(start + 2 * (hi - start), size)
+            # Largest fitting end lies in [lo, hi)
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if fits(text[start:mid]):
+                    lo = mid
+                else:
+                    hi = mid
+            end = max(lo, start + 1)
+            pieces.append(text[start:end])
+            start = end
+
+        # Keep the splitter's contract of returning several splits
+        return pieces if len(pieces) > 1 else split_by_char()(text)
+
+    return split
+
+
+def _make_splitter(params):
+    """
+    Build the sentence splitter used by chunk
+
+    Text without any separator falls through to a character split, which
+    tokenizes every character on its own; that last resort is replaced with
+    a token-capacity search. Pieces are kept at the overlap size so the
+    splitter can still carry overlap between chunks.
+    """
+    from llama_index.core.utils import get_tokenizer
+
+    chunk_size = int(params.get("chunk_size", 500))
+    chunk_overlap = int(params.get("chunk_overlap", 100))
+    tokenizer = get_tokenizer()
+    splitter = SentenceSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        tokenizer=tokenizer,
+    )
+
+    capacity = max(1, chunk_overlap or chunk_size // 2)
+    split_fns = getattr(splitter, "_sub_sentence_split_fns", None)
+    if split_fns:
+        split_fns[-1] = _split_by_token_capacity(tokenizer, capacity)
+    return splitter
+
+
 def chunk(text_or_path, params=None):
     """
     Split text or file into fixed size chunks
@@ -26,12 +96,7 @@ def chunk(text_or_path, params=None):
         nodes: Node list
     """
     params = params or {}
-    chunk_size = int(params.get("chunk_size", 500))
-    chunk_overlap = int(params.get("chunk_overlap", 100))
-    splitter = SentenceSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-    )
+    splitter = _make_splitter(params)
 
     # If the file exists and is a file in the current directory, use the file parser
     if os.path.isfile(text_or_path) and os.path.exists(text_or_path) and os.path.abspath(text_or_path).startswith(os.getcwd()):
@@ -98,3 +163,49 @@ def read_text(file, params=None):
         raise Exception(f"File format not supported, only support {support_format}")
 
 
+def _extract_pages(data, start, stop):
+    """Extract the text of pages [start, stop) from an in-memory PDF"""
+    from pypdf import PdfReader
+    # Each worker parses its own reader, pypdf readers are not thread-safe
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def read_text_fast(file, max_workers=4):
+    """
+    Read text from a PDF with a single buffered read and page-parallel extraction
+
+    Args:
+        file: PDF file path
+        max_workers: Number of threads extracting page ranges
+
+    Returns:
+        text: Text of all pages joined in page order
+    """
+    assert os.path.exists(file), "File not found"
+    assert file.endswith(".pdf"), "File format not supported"
+
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return read_text(file)
+
+    with open(file, "rb", buffering=131072) as f:
+        data = f.read()
+
+    num_pages = len(PdfReader(io.BytesIO(data)).pages)
+    if not num_pages:
+        return ""
+    workers = max(1, min(max_workers, num_pages))
+    step = -(-num_pages // workers)
+    ranges = [(start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        parts = executor.map(lambda r: _extract_pages(data, *r), ranges)
+        pages = [page for part in parts for page in part]
+
+    text = "\n\n".join(pages)
+    if not text.strip():
+        # No text layer, fall back to the OCR path
+        return read_text(file)
+    return text
@@ -2,20 +2,41 @@
 This file is responsible for handling the knowledge base related requests.
 It includes endpoints for creating, deleting, querying, and uploading databases, documents, and files.
 """
+import asyncio
+import bisect
 import os
+import queue
 import shutil
-import json
+import threading
 import time
-import random
 import traceback
-from ai_engine.utils import logger, hashstr
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+import numpy as np
+from ai_engine.utils import logger, hashstr, hashstr_batch, json_loads
 from ai_engine.configs.agent import AgentConfig
-from .milvus_manager import MilvusManager
+from .milvus_manager import MilvusManager, quantize_vectors
 from .document_processor import DocumentProcessor
 from .embedding_manager import EmbeddingManager
 from .query_engine import QueryEngine
 from .kb_db_manager import KBDBManager
 
+
+# Stage pools shared by all ingestions: encoding is serialized on the
+# single embedding model while Milvus inserts fan out
+_EMBED_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-embed")
+_INSERT_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="kb-insert")
+# Files encoded or inserted at once, bounds the chunk backlog held in memory
+MAX_INFLIGHT_FILES = 16
+# Encoded batches waiting for insertion in _stream_encode
+PREFETCH_BATCHES = 4
+
+
+def _random_ids(count):
+    """Random primary keys drawn in one call, kept below 2**53 so they survive JSON clients."""
+    return (np.frombuffer(os.urandom(8 * count), dtype=np.int64) & np.int64((1 << 53) - 1)).tolist()
+
+
 class KnowledgeBase:
     """
     Main knowledge base system interface.
@@ -32,31 +53,52 @@ class KnowledgeBase:
         """
         Initialize the knowledge base system.
         
-        Sets up all required components:
-        - Database manager
-        - Milvus vector store
-        - Document processor
-        - Embedding manager
-        - Query engine
+        Sets up the database manager and document processor. The Milvus
+        vector store, embedding manager and query engine are created on
+        first use so that startup does not wait on the Milvus connection
+        or on loading the embedding model.
         """
         self.agent_config = agent_config
         
         self.work_dir = os.path.join(str(agent_config.workspace), "data")
         
         self.db_manager = kb_db_manager
-        self.milvus_manager = MilvusManager(agent_config)
-        self.doc_processor = DocumentProcessor()
-        self.embedding_manager = EmbeddingManager(agent_config)
+        self._folder_cache = {}
+        chunk_cache = os.path.join(self.work_dir, "chunk_cache.db") if agent_config.get("kb_chunk_cache", False) else None
+        self.doc_processor = DocumentProcessor(cache_path=chunk_cache)
+        
+        self._check_migration()
+
+        if not self.agent_config.enable_kb:
+            logger.warning("Knowledge base is disabled")
+
+    @cached_property
+    def milvus_manager(self):
+        """
+        Milvus vector store, connected on first access.
         
-        self.query_engine = QueryEngine(
+        Raises:
+            ConnectionError: If cannot connect to Milvus
+        """
+        milvus_manager = MilvusManager(self.agent_config)
+        if self.agent_config.enable_kb and not milvus_manager.connect():
+            raise ConnectionError("Failed to connect to Milvus")
+        return milvus_manager
+
+    @cached_property
+    def embedding_manager(self):
+        """Embedding manager, loads the models on first access."""
+        return EmbeddingManager(self.agent_config)
+
+    @cached_property
+    def query_engine(self):
+        """Query engine over the vector store and embedding models."""
+        return QueryEngine(
             self.milvus_manager, 
             self.embedding_manager, 
             self.db_manager,
-            agent_config
+            self.agent_config
         )
-        
-        self._check_migration()
-        self._initialize()
 
     def _check_migration(self):
         """
@@ -80,7 +122,7 @@ class KnowledgeBase:
         """
         Initialize the knowledge base system.
         
-        Checks configuration and establishes connection to Milvus.
+        Checks configuration and (re)establishes connection to Milvus.
         
         Raises:
             ConnectionError: If cannot connect to Milvus
@@ -89,8 +131,10 @@ class KnowledgeBase:
             logger.warning("Knowledge base is disabled")
             return
 
-        if not self.milvus_manager.connect():
-            raise ConnectionError("Failed to connect to Milvus")
+        # Drop the cached manager so the property reconnects
+        self.__dict__.pop("milvus_manager", None)
+        self.__dict__.pop("query_engine", None)
+        _ = self.milvus_manager
 
     def restart(self):
         """Restart the knowledge base system."""
@@ -121,7 +165,11 @@ class KnowledgeBase:
         )
 
         self._ensure_db_folders(db_id)
-        self.milvus_manager.create_collection(db_id, dimension)
+        self.milvus_manager.create_collection(
+            db_id, dimension,
+            vector_dtype=self.agent_config.get("kb_vector_dtype", "float32"),
+            index_type=self.agent_config.get("kb_index_type", "auto")
+        )
 
         return db_dict
 
@@ -136,26 +184,40 @@ class KnowledgeBase:
         Raises:
             AssertionError: If knowledge base is not enabled
         """
-        print(self.agent_config.enable_kb)
+        logger.debug("enable_kb=%s", self.agent_config.enable_kb)
         assert self.agent_config.enable_kb, "Knowledge base is not enabled"
 
-        databases = self.db_manager.get_all_databases()
         databases_with_milvus = []
+        try:
+            # Describe all collections concurrently, the loop below then
+            # reads them from the info cache
+            self.milvus_manager.refresh_all()
+        except Exception as e:
+            logger.warning("Failed to refresh Milvus collection info: %s", e)
         
-        for db in databases:
-            db_copy = db.copy()
+        # Summaries carry only the listing columns and a file count, each is
+        # turned into its output dict once
+        for db in self.db_manager.iter_database_summaries():
+            db_out = {
+                "db_id": db.db_id,
+                "name": db.name,
+                "description": db.description,
+                "embed_model": db.embed_model,
+                "dimension": db.dimension,
+                "meta_info": db.meta_info,
+                "file_count": db.file_count,
+            }
             try:
-                milvus_info = self.milvus_manager.get_collection_info(db["db_id"])
-                db_copy["metadata"] = milvus_info
+                db_out["metadata"] = self.milvus_manager.get_collection_info(db.db_id)
             except Exception as e:
-                logger.warning("Failed to get Milvus info for %s: %s", db['name'], e)
-                db_copy.update({
+                logger.warning("Failed to get Milvus info for %s: %s", db.name, e)
+                db_out.update({
                     "row_count": 0,
                     "status": "Disconnected",
                     "error": str(e)
                 })
             
-            databases_with_milvus.append(db_copy)
+            databases_with_milvus.append(db_out)
 
         return {"databases": databases_with_milvus}
     
@@ -205,7 +267,10 @@ class KnowledgeBase:
         """
         self.milvus_manager.drop_collection(db_id)
         self.db_manager.delete_database(db_id)
+        if "query_engine" in self.__dict__:
+            self.query_engine.close_search_batcher(db_id)
         
+        self._folder_cache.pop(db_id, None)
         db_folder = os.path.join(self.work_dir, db_id)
         if os.path.exists(db_folder):
             shutil.rmtree(db_folder)
@@ -230,6 +295,135 @@ class KnowledgeBase:
         Returns:
             dict: Status message if error occurs
         """
+        error = self._check_add_target(db_id)
+        if error:
+            return error
+
+        file_chunks = self.doc_processor.process_files(files, params)
+
+        # Register all files in one transaction, final statuses are written
+        # in one batch after the loop
+        self.db_manager.add_files(db_id, [
+            (file_id, chunk_info["filename"], chunk_info["path"], chunk_info["type"], "processing")
+            for file_id, chunk_info in file_chunks.items()
+        ])
+
+        # The chunks of all files are encoded as one sequence, with large
+        # batches, and each encoded batch is split between the files it covers
+        all_docs = [node["text"] for chunk_info in file_chunks.values() for node in chunk_info["nodes"]]
+        file_ids = list(file_chunks)
+        starts = []
+        offset = 0
+        for chunk_info in file_chunks.values():
+            starts.append(offset)
+            offset += len(chunk_info["nodes"])
+
+        file_starts = dict(zip(file_ids, starts))
+        statuses = {file_id: "failed" if chunk_info["nodes"] else "done" for file_id, chunk_info in file_chunks.items()}
+        failed = set()
+
+        def insert(file_id, lo, hi, vectors):
+            start = file_starts[file_id]
+            nodes = file_chunks[file_id]["nodes"]
+            try:
+                self._insert_prepared(file_id, db_id, all_docs[lo:hi], vectors, nodes[lo - start:hi - start])
+                if hi == start + len(nodes):
+                    statuses[file_id] = "done"
+            except Exception as e:
+                logger.error("Failed to add file %s: %s\n%s", file_id, e, traceback.format_exc())
+                failed.add(file_id)
+
+        def store(start, vectors):
+            end = start + len(vectors)
+            pieces = []
+            idx = bisect.bisect_right(starts, start) - 1
+            while idx < len(file_ids) and starts[idx] < end:
+                file_id = file_ids[idx]
+                lo = max(start, starts[idx])
+                hi = min(end, starts[idx] + len(file_chunks[file_id]["nodes"]))
+                if lo < hi and file_id not in failed:
+                    pieces.append((file_id, lo, hi, vectors[lo - start:hi - start]))
+                idx += 1
+            # The files of one batch are inserted concurrently on the shared insert pool
+            list(_INSERT_EXECUTOR.map(lambda piece: insert(*piece), pieces))
+
+        if all_docs:
+            try:
+                self._stream_encode(all_docs, store, batch_size=256)
+            except Exception as e:
+                logger.error("Failed to encode files %s: %s\n%s", file_ids, e, traceback.format_exc())
+
+        self.db_manager.update_files_status(statuses)
+
+    async def add_files_async(self, db_id, files, params=None):
+        """
+        Add files to a knowledge base, overlapping processing and storage.
+        
+        Runs the document processor pipeline so that while one file is
+        being chunked, the previous one is already being encoded and
+        inserted into Milvus, each encoded batch while the next one is
+        encoded. Files are stored on the shared embedding stage pool, with
+        at most MAX_INFLIGHT_FILES files between chunking and insertion.
+        Final statuses are written in one batch once every file is stored.
+        
+        Args:
+            db_id (str): ID of the target database
+            files (list): List of file paths to process
+            params (dict, optional): Processing parameters
+            
+        Returns:
+            dict: Status message if error occurs
+        """
+        error = self._check_add_target(db_id)
+        if error:
+            return error
+
+        inflight = threading.BoundedSemaphore(MAX_INFLIGHT_FILES)
+        encode_futures = []
+        statuses = {}
+
+        def encode(chunk_info):
+            file_id = chunk_info["file_id"]
+            docs = [node["text"] for node in chunk_info["nodes"]]
+            statuses[file_id] = "failed"
+            try:
+                if docs:
+                    self._add_documents_to_milvus(file_id, db_id, docs, chunk_info["nodes"])
+                statuses[file_id] = "done"
+            except Exception as e:
+                logger.error("Failed to add file %s: %s\n%s", file_id, e, traceback.format_exc())
+            finally:
+                inflight.release()
+
+        def store(chunk_info):
+            # Blocks the pipeline writer while too many files are in flight
+            inflight.acquire()
+            try:
+                self.db_manager.add_files(db_id, [
+                    (chunk_info["file_id"], chunk_info["filename"], chunk_info["path"], chunk_info["type"], "processing")
+                ])
+                encode_futures.append(_EMBED_EXECUTOR.submit(encode, chunk_info))
+            except Exception as e:
+                # The file never reaches encode, which would release its slot
+                logger.error("Failed to add file %s: %s\n%s", chunk_info["file_id"], e, traceback.format_exc())
+                statuses[chunk_info["file_id"]] = "failed"
+                inflight.release()
+
+        await self.doc_processor.process_files_pipeline(files, params, on_file=store)
+
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in encode_futures))
+        self.db_manager.update_files_status(statuses)
+
+    def _check_add_target(self, db_id):
+        """
+        Check that files can be added to a database.
+        
+        Args:
+            db_id (str): ID of the target database
+            
+        Returns:
+            dict: Status message if files cannot be added, None otherwise
+        """
         db = self.db_manager.get_database_by_id(db_id)
         if not db:
             return {"message": "Database not found", "status": "failed"}
@@ -239,60 +433,117 @@ class KnowledgeBase:
             logger.error(error_msg)
             return {"message": error_msg, "status": "failed"}
 
-        file_chunks = self.doc_processor.process_files(files, params)
+        # Checked once here so no file is chunked and encoded into vectors
+        # the collection would reject
+        dimension = db.get("dimension")
+        if dimension and dimension != self.embedding_manager.get_dimension():
+            error_msg = f"Dimension mismatch: current={self.embedding_manager.get_dimension()}, required={dimension}"
+            logger.error(error_msg)
+            return {"message": error_msg, "status": "failed"}
+        return None
+
+    def _add_documents_to_milvus(self, file_id, collection_name, docs, chunk_infos, batch_size=256):
+        """
+        Add document chunks to Milvus vector store.
         
-        for file_id, chunk_info in file_chunks.items():
-            try:
-                self.db_manager.add_file(
-                    db_id=db_id,
-                    file_id=file_id,
-                    filename=chunk_info["filename"],
-                    path=chunk_info["path"],
-                    file_type=chunk_info["type"],
-                    status="processing"
-                )
+        Chunks are encoded batch by batch while a consumer thread inserts
+        the batches already encoded, with at most PREFETCH_BATCHES waiting.
+        
+        Args:
+            file_id (str): ID of the source file
+            collection_name (str): Name of the Milvus collection
+            docs (list): List of text chunks
+            chunk_infos (list): List of chunk metadata
+            batch_size (int, optional): Chunks per encode batch. Defaults to 256
+            
+        Returns:
+            list: Milvus insertion results, one per insert batch
+        """
+        results = []
 
-                self._add_documents_to_milvus(
-                    file_id=file_id,
-                    collection_name=db_id,
-                    docs=[node["text"] for node in chunk_info["nodes"]],
-                    chunk_infos=chunk_info["nodes"]
-                )
+        def store(start, vectors):
+            end = start + len(vectors)
+            results.extend(self._insert_prepared(
+                file_id, collection_name, docs[start:end], vectors, chunk_infos[start:end]
+            ))
 
-                self.db_manager.update_file_status(file_id, "done")
+        self._stream_encode(docs, store, batch_size=batch_size)
+        return results
 
-            except Exception as e:
-                logger.error("Failed to add file %s: %s\n%s", file_id, e, traceback.format_exc())
-                self.db_manager.update_file_status(file_id, "failed")
+    def _stream_encode(self, docs, store, batch_size=256):
+        """
+        Encode texts batch by batch while a consumer thread stores the
+        batches already encoded, with at most PREFETCH_BATCHES waiting.
+        
+        Args:
+            docs (list): List of text chunks
+            store (callable): Called on the consumer thread with the start
+                index of each batch in docs and its vectors
+            batch_size (int, optional): Chunks per encode batch. Defaults to 256
+            
+        Raises:
+            Exception: The first error of encoding or of store, after the
+                batches already queued have been drained
+        """
+        pending = queue.Queue(maxsize=PREFETCH_BATCHES)
+        errors = []
+
+        def consume():
+            while (item := pending.get()) is not None:
+                if errors:
+                    # Keep draining so the producer never blocks
+                    continue
+                try:
+                    store(*item)
+                except Exception as e:
+                    errors.append(e)
+
+        consumer = threading.Thread(target=consume, name="kb-prefetch-insert", daemon=True)
+        consumer.start()
+        try:
+            for item in self.embedding_manager.encode_texts_iter(docs, batch_size=batch_size):
+                if errors:
+                    break
+                pending.put(item)
+        finally:
+            pending.put(None)
+            consumer.join()
+
+        if errors:
+            raise errors[0]
 
-    def _add_documents_to_milvus(self, file_id, collection_name, docs, chunk_infos):
+    def _insert_prepared(self, file_id, collection_name, docs, vectors, chunk_infos):
         """
-        Add document chunks to Milvus vector store.
+        Insert already-encoded document chunks into Milvus.
         
         Args:
             file_id (str): ID of the source file
             collection_name (str): Name of the Milvus collection
             docs (list): List of text chunks
+            vectors (np.ndarray): float32 vectors of the chunks
             chunk_infos (list): List of chunk metadata
             
         Returns:
-            dict: Milvus insertion result
+            list: Milvus insertion results, one per insert batch
         """
-        
-        vectors = self.embedding_manager.encode_texts(docs)
-        
-        data = []
-        for i, (doc, vector, chunk_info) in enumerate(zip(docs, vectors, chunk_infos)):
-            data.append({
-                "id": int(random.random() * 1e12),
-                "vector": vector,
-                "text": doc,
-                "hash": hashstr(doc, with_salt=True),
-                "file_id": file_id,
-                **chunk_info
-            })
-        
-        return self.milvus_manager.insert_vectors(collection_name, data)
+        vectors, scales = quantize_vectors(
+            vectors, self.milvus_manager.get_vector_dtype(collection_name)
+        )
+
+        # Columnar batch: the (N, dim) vector array is passed through as-is
+        data = {
+            "id": _random_ids(len(docs)),
+            "vector": vectors,
+            "text": docs,
+            "hash": hashstr_batch(docs),
+            "file_id": [file_id] * len(docs),
+        }
+        for key in (chunk_infos[0] if chunk_infos else ()):
+            data.setdefault(key, [chunk_info.get(key) for chunk_info in chunk_infos])
+        if scales is not None:
+            data["scale"] = scales.tolist()
+
+        return self.milvus_manager.insert_vectors_batched(collection_name, data)
 
     def delete_file(self, db_id, file_id):
         """
@@ -306,7 +557,7 @@ class KnowledgeBase:
             db_id (str): ID of the database
             file_id (str): ID of the file to delete
         """
-        self.milvus_manager.delete_vectors(db_id, f"file_id == '{file_id}'")
+        self.milvus_manager.delete_vectors_batched(db_id, f"file_id == '{file_id}'")
         self.db_manager.delete_file(file_id)
 
     def query(self, query, db_id, **kwargs):
@@ -343,16 +594,17 @@ class KnowledgeBase:
             dict: Dictionary mapping database IDs to their retrievers
         """
         retrievers = {}
-        for db in self.db_manager.get_all_databases():
-            if self.embedding_manager.check_model_compatibility(db["embed_model"]):
-                retrievers[db["db_id"]] = {
-                    "name": db["name"],
-                    "description": db["description"],
-                    "retriever": self.get_retriever_by_db_id(db["db_id"]),
-                    "embed_model": db["embed_model"],
+        current_model = self.embedding_manager.get_model_name()
+        for db in self.db_manager.iter_database_summaries():
+            if db.embed_model == current_model:
+                retrievers[db.db_id] = {
+                    "name": db.name,
+                    "description": db.description,
+                    "retriever": self.get_retriever_by_db_id(db.db_id),
+                    "embed_model": db.embed_model,
                 }
             else:
-                logger.warning(f"Model mismatch for {db['name']}")
+                logger.warning(f"Model mismatch for {db.name}")
         return retrievers
 
     # Utility methods
@@ -366,10 +618,14 @@ class KnowledgeBase:
         Returns:
             tuple: Paths to database and uploads folders
         """
+        folders = self._folder_cache.get(db_id)
+        if folders is not None:
+            return folders
+
         db_folder = os.path.join(self.work_dir, db_id)
         uploads_folder = os.path.join(db_folder, "uploads")
-        os.makedirs(db_folder, exist_ok=True)
         os.makedirs(uploads_folder, exist_ok=True)
+        self._folder_cache[db_id] = (db_folder, uploads_folder)
         return db_folder, uploads_folder
 
     def get_db_upload_path(self, db_id=None):
@@ -401,18 +657,18 @@ class KnowledgeBase:
         if db_dict is None:
             return None
         
-        db_copy = db_dict.copy()
+        # get_database_by_id builds a fresh dict, it is updated in place
         try:
             milvus_info = self.milvus_manager.get_collection_info(db_id)
-            db_copy.update(milvus_info)
+            db_dict.update(milvus_info)
         except Exception as e:
             logger.warning("Failed to get Milvus info for %s: %s", db_id, e)
-            db_copy.update({
+            db_dict.update({
                 "row_count": 0,
                 "status": "Disconnected",
                 "error": str(e)
             })
-        return db_copy
+        return db_dict
     
     def json2sqlite(self):
         """Migrate knowledge base data from JSON to SQLite"""
@@ -425,8 +681,8 @@ class KnowledgeBase:
 
         try:
             # Read JSON file
-            with open(json_path, "r", encoding='utf-8') as f:
-                data = json.load(f)
+            with open(json_path, "rb") as f:
+                data = json_loads(f.read())
 
             if not data or "databases" not in data or not data["databases"]:
                 logger.info("JSON file does not contain database information, no need to migrate")
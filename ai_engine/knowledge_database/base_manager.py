@@ -9,13 +9,34 @@ common across all specialized database managers.
 import os
 import pathlib
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from ai_engine.models.knowledge import Base
-from ai_engine.utils import logger
+from ai_engine.utils import logger, json_dumps, json_loads
 from ai_engine.configs.agent import AgentConfig
 
+# Applied to every new SQLite connection: WAL lets readers run alongside the
+# single writer, and the mmap/cache sizes keep hot pages out of read() calls
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Connection event hook applying SQLITE_PRAGMAS."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
 class BaseDBManager:
     """
     Base database manager with shared logic for all database operations.
@@ -40,8 +61,13 @@ class BaseDBManager:
         self.db_path = os.path.join(str(agent_config.workspace), "data", "knowledge.db")
         self.ensure_db_dir()
 
-        # Create SQLAlchemy engine
-        self.engine = create_engine(f"sqlite:///{self.db_path}")
+        # Create SQLAlchemy engine, JSON columns (node/file metadata) go through orjson
+        self.engine = create_engine(
+            f"sqlite:///{self.db_path}",
+            json_serializer=json_dumps,
+            json_deserializer=json_loads
+        )
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
 
         # Create session factory
         self.Session = sessionmaker(bind=self.engine)
@@ -5,11 +5,13 @@ This module provides specialized functionality for managing knowledge databases.
 It handles CRUD operations for knowledge base databases and their metadata.
 """
 
-from sqlalchemy.orm import joinedload
+from functools import cached_property
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import selectinload
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
-from ai_engine.models.knowledge import KnowledgeDatabase, KnowledgeFile
+from ai_engine.models.knowledge import DatabaseSummary, KnowledgeDatabase, KnowledgeFile, KnowledgeNode
 from .base_manager import BaseDBManager
 from ai_engine.configs.agent import AgentConfig
 
@@ -31,24 +33,20 @@ class DatabaseManager(BaseDBManager):
             agent_config: Agent configuration object containing database settings.
         """
         super().__init__(agent_config)
-        self._knowledge_models = None
         self._agent_config = agent_config
         self._setup_database()
 
-    @property
+    @cached_property
     def knowledge_models(self):
-        """Lazy load knowledge models."""
-        if self._knowledge_models is None:
-            from ai_engine.models.knowledge import KnowledgeDatabase, KnowledgeFile
-            self._knowledge_models = (KnowledgeDatabase, KnowledgeFile)
-        return self._knowledge_models
+        """Knowledge models, computed once per instance."""
+        return (KnowledgeDatabase, KnowledgeFile)
 
-    @property
+    @cached_property
     def agent_config(self):
         """Lazy load agent config."""
         if self._agent_config is None:
             from ai_engine import agent_config
-            self._agent_config = agent_config
+            return agent_config
         return self._agent_config
 
     def _setup_database(self):
@@ -56,31 +54,82 @@ class DatabaseManager(BaseDBManager):
         KnowledgeDatabase, KnowledgeFile = self.knowledge_models
         # Rest of the setup code...
 
-    def get_all_databases(self):
+    def iter_all_databases(self, batch=100):
         """
-        Get all registered knowledge bases.
+        Iterate over all registered knowledge bases.
         
-        Uses eager loading to fetch associated files along with the database
-        information to avoid N+1 query problems.
+        Rows are fetched ``batch`` at a time, so memory stays flat however
+        many databases exist. Associated files are loaded with one extra IN
+        query per batch (selectin) rather than a join, which would repeat
+        every database row once per file. File nodes are not loaded, so each
+        file's "nodes" list is empty. The session stays open until the
+        generator is exhausted or closed.
         
-        Returns:
-            list: List of dictionaries containing database information
+        Args:
+            batch (int, optional): Rows fetched per round-trip. Defaults to 100
+            
+        Yields:
+            dict: Database information
         """
         with self.get_session() as session:
-            # Use eager loading to load associated files
-            databases = session.query(KnowledgeDatabase).options(
-                joinedload(KnowledgeDatabase.related_files)
-            ).all()
+            databases = session.execute(
+                select(KnowledgeDatabase)
+                .options(selectinload(KnowledgeDatabase.related_files))
+                .execution_options(yield_per=batch)
+            ).scalars()
 
-            # Convert to dictionary and return, avoid subsequent lazy loading
-            return [db.as_dict() for db in databases]
+            # Convert to dictionary as we go, avoid subsequent lazy loading
+            for db in databases:
+                yield db.as_dict_fast()
+
+    def iter_database_summaries(self, batch=100):
+        """
+        Iterate over all registered knowledge bases as listing summaries.
+        
+        Only the database columns and a per-database file count are
+        selected, in one grouped query, so no file rows or ORM instances
+        are built.
+        
+        Args:
+            batch (int, optional): Rows fetched per round-trip. Defaults to 100
+            
+        Yields:
+            DatabaseSummary: Database summary
+        """
+        with self.get_session() as session:
+            rows = session.execute(
+                select(
+                    KnowledgeDatabase.uid,
+                    KnowledgeDatabase.name,
+                    KnowledgeDatabase.description,
+                    KnowledgeDatabase.embedding,
+                    KnowledgeDatabase.dimension,
+                    KnowledgeDatabase.metadata_extra,
+                    func.count(KnowledgeFile.id)
+                )
+                .outerjoin(KnowledgeFile, KnowledgeFile.repo_uid == KnowledgeDatabase.uid)
+                .group_by(KnowledgeDatabase.id)
+                .execution_options(yield_per=batch)
+            )
+            for uid, name, description, embedding, dimension, metadata_extra, file_count in rows:
+                yield DatabaseSummary(uid, name, description, embedding, dimension, metadata_extra or {}, file_count)
+
+    def get_all_databases(self):
+        """
+        Get all registered knowledge bases.
+        
+        Returns:
+            list: List of dictionaries containing database information,
+                as produced by iter_all_databases
+        """
+        return list(self.iter_all_databases())
 
     def get_database_by_id(self, db_id):
         """
         Get knowledge base by ID.
         
-        Uses eager loading to fetch the complete database information
-        including associated files and nodes.
+        Uses eager loading (one extra IN query per level) to fetch the
+        complete database information including associated files and nodes.
         
         Args:
             db_id (str): The unique identifier of the database
@@ -89,13 +138,15 @@ class DatabaseManager(BaseDBManager):
             dict: Database information if found, None otherwise
         """
         with self.get_session() as session:
-            # Use eager loading to load associated files
-            db = session.query(KnowledgeDatabase).options(
-                joinedload(KnowledgeDatabase.related_files).joinedload(KnowledgeFile.content_blocks)
-            ).filter_by(uid=db_id).first()
+            db = session.execute(
+                select(KnowledgeDatabase)
+                .options(selectinload(KnowledgeDatabase.related_files).selectinload(KnowledgeFile.content_blocks))
+                .filter_by(uid=db_id)
+                .limit(1)
+            ).scalars().first()
 
             # Convert to dictionary and return, avoid subsequent lazy loading
-            return db.as_dict() if db else None
+            return db.as_dict_fast() if db else None
 
     def create_database(self, db_id, name, description, embed_model=None, dimension=None, metadata=None):
         """
@@ -137,6 +188,8 @@ class DatabaseManager(BaseDBManager):
         Delete a knowledge database.
         
         This operation will cascade delete all associated files and nodes.
+        Rows are removed with bulk DELETE statements in one transaction, so
+        nothing is loaded into the session first.
         
         Args:
             db_id (str): ID of the database to delete
@@ -145,8 +198,21 @@ class DatabaseManager(BaseDBManager):
             bool: True if database was found and deleted, False otherwise
         """
         with self.get_session() as session:
-            db = session.query(KnowledgeDatabase).filter_by(uid=db_id).first()
-            if db:
-                session.delete(db)
-                return True
-            return False
\ No newline at end of file
+            result = session.execute(
+                delete(KnowledgeDatabase).where(KnowledgeDatabase.uid == db_id),
+                execution_options={"synchronize_session": False}
+            )
+            if not result.rowcount:
+                return False
+
+            # SQLite does not enforce foreign keys here, so cascade by hand
+            file_ids = select(KnowledgeFile.uid).where(KnowledgeFile.repo_uid == db_id)
+            session.execute(
+                delete(KnowledgeNode).where(KnowledgeNode.file_uid.in_(file_ids)),
+                execution_options={"synchronize_session": False}
+            )
+            session.execute(
+                delete(KnowledgeFile).where(KnowledgeFile.repo_uid == db_id),
+                execution_options={"synchronize_session": False}
+            )
+            return True
\ No newline at end of file
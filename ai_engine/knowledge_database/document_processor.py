@@ -7,9 +7,192 @@ file formats and provides text chunking functionality.
 """
 
 import os
+import json
 import time
-from ai_engine.utils import hashstr, logger
-from ai_engine.core.indexing import chunk, read_text
+import asyncio
+import hashlib
+import mmap
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from llama_index.core.schema import TextNode
+from pydantic import TypeAdapter
+from ai_engine.utils import hashstr, hashstr_stream, logger, json_dumps, json_loads
+from ai_engine.core.indexing import chunk, read_text_fast
+
+_SUPPORTED_TYPES = frozenset(("pdf", "txt", "md", "docx"))
+
+# Dumps a whole node list in one pydantic-core pass instead of one .dict() per node
+_NODES_ADAPTER = TypeAdapter(list[TextNode])
+
+
+def _file_type(file):
+    """Lower-case extension of a file path, without the dot."""
+    return os.path.splitext(file)[1][1:].lower()
+
+
+def _new_file_id(file):
+    """Generate a unique file ID from the path and the current time."""
+    return "file_" + hashstr_stream(file.encode(), str(time.time()).encode())
+
+
+def _nodes_to_dicts(nodes):
+    """Convert chunked nodes into plain dictionaries."""
+    return _NODES_ADAPTER.dump_python(list(nodes))
+
+
+def _file_info(file, file_id, file_type, nodes, error=None):
+    """Build the file information dictionary returned by process_files."""
+    info = {
+        "file_id": file_id,
+        "filename": os.path.basename(file),
+        "path": file,
+        "type": file_type,
+        "status": "waiting" if error is None else "failed",
+        "created_at": time.time(),
+        "nodes": nodes
+    }
+    if error is not None:
+        info["error"] = error
+    return info
+
+
+def _process_one(file, params=None):
+    """
+    Read and chunk a single file.
+    
+    Module-level so it can be pickled into worker processes.
+    
+    Args:
+        file (str): Path of the file to process
+        params (dict, optional): Parameters for the chunking process
+        
+    Returns:
+        tuple: (file_id, file information dictionary)
+    """
+    file_id = _new_file_id(file)
+    file_type = _file_type(file)
+    
+    try:
+        if file_type == "pdf":
+            texts = read_text_fast(file)
+            nodes = chunk(texts, params=params)
+        else:
+            nodes = chunk(file, params=params)
+        
+        return file_id, _file_info(file, file_id, file_type, _nodes_to_dicts(nodes))
+    except Exception as e:
+        logger.error(f"Failed to process file {file}: {e}")
+        return file_id, _file_info(file, file_id, file_type, [], error=str(e))
+
+
+_MMAP_HASH_THRESHOLD = 8 * 1024 * 1024
+
+
+def _content_hash(file):
+    """
+    SHA-256 of a file's content.
+    
+    hashlib releases the GIL while hashing, so several files can be hashed
+    in parallel threads. Small files are read and hashed in one update,
+    large ones are mapped into memory instead of being read in chunks.
+    """
+    with open(file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _MMAP_HASH_THRESHOLD:
+            return hashlib.sha256(f.read()).hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+
+def _chunk_source(text_or_path, params=None):
+    """
+    Chunk the read text of a PDF, or another file from its path, into node
+    dictionaries, the same way _process_one does.
+    
+    Module-level so it can be pickled into worker processes.
+    """
+    return _nodes_to_dicts(chunk(text_or_path, params=params))
+
+
+class ChunkCache:
+    """
+    Persistent cache of chunked nodes keyed by file content and parameters.
+    
+    Backed by a small SQLite database in WAL mode so that several processes
+    can read it while one writes.
+    """
+
+    def __init__(self, path):
+        """
+        Open (and create if needed) the cache database.
+        
+        Args:
+            path (str): Path of the SQLite cache file
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_cache ("
+            "content_hash TEXT, params_hash TEXT, nodes_json BLOB, "
+            "PRIMARY KEY (content_hash, params_hash))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(file, params=None):
+        """
+        Compute the cache key of a file.
+        
+        Args:
+            file (str): Path of the file
+            params (dict, optional): Parameters for the chunking process
+            
+        Returns:
+            tuple: (content_hash, params_hash), or None if the file cannot be read
+        """
+        try:
+            content_hash = _content_hash(file)
+        except OSError:
+            return None
+        # The extension selects the reader, so it is part of the parameters
+        file_type = _file_type(file)
+        params_hash = hashstr(json.dumps([file_type, params or {}], sort_keys=True, default=str), length=16)
+        return content_hash, params_hash
+
+    def get(self, key):
+        """
+        Look up cached nodes.
+        
+        Args:
+            key (tuple): Cache key from ChunkCache.key
+            
+        Returns:
+            list: Cached node dictionaries, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT nodes_json FROM chunk_cache WHERE content_hash = ? AND params_hash = ?", key
+            ).fetchone()
+        return json_loads(row[0]) if row else None
+
+    def put(self, key, nodes):
+        """
+        Store chunked nodes.
+        
+        Args:
+            key (tuple): Cache key from ChunkCache.key
+            nodes (list): Node dictionaries to cache
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chunk_cache (content_hash, params_hash, nodes_json) VALUES (?, ?, ?)",
+                (*key, json_dumps(nodes))
+            )
+            self._conn.commit()
 
 
 class DocumentProcessor:
@@ -21,16 +204,32 @@ class DocumentProcessor:
     formats including PDF, TXT, MD, and DOCX.
     """
     
-    def __init__(self):
-        """Initialize the document processor."""
-        pass
+    def __init__(self, max_workers=None, cache_path=None):
+        """
+        Initialize the document processor.
+        
+        Args:
+            max_workers (int, optional): Number of worker processes used to
+                process several files. Defaults to the number of CPUs
+            cache_path (str, optional): Path of the chunk cache database.
+                Defaults to None, no caching
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = None
+        if cache_path:
+            try:
+                self.cache = ChunkCache(cache_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Chunk cache disabled, failed to open {cache_path}: {e}")
     
     def process_files(self, files, params=None):
         """
         Convert files into chunks suitable for knowledge base storage.
         
         Processes multiple files, converting each into a series of text chunks
-        based on the file type and chunking parameters.
+        based on the file type and chunking parameters. Files whose content
+        and parameters were chunked before are served from the chunk cache;
+        the others are processed in parallel worker processes.
         
         Args:
             files (list): List of file paths to process
@@ -48,40 +247,154 @@ class DocumentProcessor:
                 - error: Error message if processing failed
         """
         file_infos = {}
-        for file in files:
-            file_id = "file_" + hashstr(file + str(time.time()))
-            file_type = file.split(".")[-1].lower()
-            
-            try:
-                if file_type == "pdf":
-                    texts = read_text(file)
-                    nodes = chunk(texts, params=params)
-                else:
-                    nodes = chunk(file, params=params)
-                
-                file_infos[file_id] = {
-                    "file_id": file_id,
-                    "filename": os.path.basename(file),
-                    "path": file,
-                    "type": file_type,
-                    "status": "waiting",
-                    "created_at": time.time(),
-                    "nodes": [node.dict() for node in nodes]
-                }
-            except Exception as e:
-                logger.error(f"Failed to process file {file}: {e}")
-                file_infos[file_id] = {
-                    "file_id": file_id,
-                    "filename": os.path.basename(file),
-                    "path": file,
-                    "type": file_type,
-                    "status": "failed",
-                    "error": str(e),
-                    "created_at": time.time(),
-                    "nodes": []
-                }
+        misses = []
+        for file, key in zip(files, self._cache_keys(files, params)):
+            nodes = self.cache.get(key) if key else None
+            if nodes is None:
+                misses.append((file, key))
+                continue
+            file_id = _new_file_id(file)
+            file_infos[file_id] = _file_info(file, file_id, _file_type(file), nodes)
+
+        for (file, key), (file_id, info) in zip(misses, self._process_misses([file for file, _ in misses], params)):
+            file_infos[file_id] = info
+            if key and info["status"] != "failed":
+                self.cache.put(key, info["nodes"])
+
+        return file_infos
+
+    async def process_files_pipeline(self, files, params=None, on_file=None, queue_size=4):
+        """
+        Convert files into chunks with overlapping read, chunk and write stages.
+        
+        Files are hashed and PDFs read in a thread pool, chunked in worker
+        processes and handed to on_file in the thread pool again, with
+        bounded queues between the stages. While one file is being chunked
+        the next one is already being read and the previous one written,
+        instead of each stage waiting for the others. Other files are parsed
+        from their path in the chunk stage, by the same readers as
+        process_files, so both produce the same nodes. Cached files skip
+        the chunk stage.
         
+        Args:
+            files (list): List of file paths to process
+            params (dict, optional): Parameters for the chunking process
+            on_file (callable, optional): Called with each file information
+                dictionary as it completes, e.g. to store it
+            queue_size (int, optional): Files buffered between stages. Defaults to 4
+            
+        Returns:
+            dict: Dictionary mapping file IDs to file information, in the
+                same format as process_files
+        """
+        loop = asyncio.get_running_loop()
+        workers = max(1, min(self.max_workers, len(files)))
+        read_q = asyncio.Queue(maxsize=queue_size)
+        chunk_q = asyncio.Queue(maxsize=queue_size)
+        file_infos = {}
+
+        async def reader(io_pool):
+            for file in files:
+                file_id = _new_file_id(file)
+                file_type = _file_type(file)
+                try:
+                    key = await loop.run_in_executor(io_pool, ChunkCache.key, file, params) if self.cache else None
+                    nodes = await loop.run_in_executor(io_pool, self.cache.get, key) if key else None
+                    if nodes is not None:
+                        await chunk_q.put(_file_info(file, file_id, file_type, nodes))
+                        continue
+                    # Only PDFs are read ahead, chunk() parses other files with their reader
+                    if file_type == "pdf":
+                        source = await loop.run_in_executor(io_pool, read_text_fast, file)
+                    elif os.path.isfile(file):
+                        source = file
+                    else:
+                        raise FileNotFoundError(f"File not found: {file}")
+                except Exception as e:
+                    logger.error(f"Failed to process file {file}: {e}")
+                    await chunk_q.put(_file_info(file, file_id, file_type, [], error=str(e)))
+                    continue
+                await read_q.put((file, file_id, file_type, key, source))
+            for _ in range(workers):
+                await read_q.put(None)
+
+        async def chunker(cpu_pool, io_pool):
+            while (item := await read_q.get()) is not None:
+                file, file_id, file_type, key, source = item
+                try:
+                    nodes = await loop.run_in_executor(cpu_pool, _chunk_source, source, params)
+                    info = _file_info(file, file_id, file_type, nodes)
+                    if key:
+                        await loop.run_in_executor(io_pool, self.cache.put, key, nodes)
+                except Exception as e:
+                    logger.error(f"Failed to process file {file}: {e}")
+                    info = _file_info(file, file_id, file_type, [], error=str(e))
+                await chunk_q.put(info)
+            await chunk_q.put(None)
+
+        async def writer(io_pool):
+            remaining = workers
+            while remaining:
+                info = await chunk_q.get()
+                if info is None:
+                    remaining -= 1
+                    continue
+                file_infos[info["file_id"]] = info
+                if on_file is not None:
+                    try:
+                        await loop.run_in_executor(io_pool, on_file, info)
+                    except Exception as e:
+                        # Keep draining so the other stages are not left blocked
+                        logger.error(f"Failed to store file {info['path']}: {e}")
+
+        # Chunking is CPU-bound, it only gets worker processes when there
+        # is more than one file to spread over them
+        with ThreadPoolExecutor(max_workers=4) as io_pool:
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as cpu_pool:
+                    await asyncio.gather(reader(io_pool), writer(io_pool), *(chunker(cpu_pool, io_pool) for _ in range(workers)))
+            else:
+                await asyncio.gather(reader(io_pool), writer(io_pool), chunker(io_pool, io_pool))
+
         return file_infos
+
+    def _cache_keys(self, files, params=None):
+        """
+        Compute the chunk cache keys of files, hashing them in parallel threads.
+        
+        Args:
+            files (list): List of file paths
+            params (dict, optional): Parameters for the chunking process
+            
+        Returns:
+            list: Cache keys in the order of files, None where caching is
+                disabled or the file cannot be read
+        """
+        if not self.cache:
+            return [None] * len(files)
+        if len(files) <= 1:
+            return [ChunkCache.key(file, params) for file in files]
+        with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+            return list(executor.map(ChunkCache.key, files, repeat(params)))
+
+    def _process_misses(self, files, params=None):
+        """
+        Read and chunk files, in parallel when there are several.
+        
+        Args:
+            files (list): List of file paths to process
+            params (dict, optional): Parameters for the chunking process
+            
+        Returns:
+            list: (file_id, file information) tuples in the order of files
+        """
+        workers = min(self.max_workers, len(files))
+        if workers <= 1:
+            return [_process_one(file, params) for file in files]
+
+        # Reading and chunking are CPU-bound, fan files out across processes
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_process_one, files, repeat(params)))
     
     def process_url(self, url, params=None):
         """
@@ -106,6 +419,4 @@ class DocumentProcessor:
         Returns:
             bool: True if file type is supported, False otherwise
         """
-        supported_types = ['pdf', 'txt', 'md', 'docx']
-        file_type = file_path.split(".")[-1].lower()
-        return file_type in supported_types
+        return _file_type(file_path) in _SUPPORTED_TYPES
@@ -6,11 +6,128 @@ It provides a unified interface for encoding text into vectors and
 computing similarity scores for search results reranking.
 """
 
-from ai_engine.models.embedding import initialize_embedding
-from ai_engine.models.rerank_model import initialize_reranker
+import queue
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
 from ai_engine.utils import logger
 from ai_engine.configs.agent import AgentConfig
 
+
+class _PendingEncode:
+    """A single text waiting in the micro-batch queue, with its result slot."""
+    __slots__ = ("text", "result", "error", "done")
+
+    def __init__(self, text):
+        self.text = text
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-text encode calls into batched forward passes.
+    
+    Callers block in ``submit`` while a background thread collects up to
+    ``batch_size`` pending texts, or whatever arrives within ``max_wait``
+    seconds of the first one, and encodes them in one call.
+    """
+
+    def __init__(self, encode_fn, batch_size=64, max_wait=0.005, name="embed-micro-batcher"):
+        """
+        Initialize the micro-batcher.
+        
+        Args:
+            encode_fn (callable): Function encoding a list of texts into vectors
+            batch_size (int, optional): Maximum texts per batch. Defaults to 64
+            max_wait (float, optional): Seconds to wait for more texts after
+                the first one arrives. Defaults to 0.005
+            name (str, optional): Worker thread name. Defaults to "embed-micro-batcher"
+        """
+        self.encode_fn = encode_fn
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._closed = False
+        # Makes closing atomic with submits, so nothing is queued behind the stop sentinel
+        self._close_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, text):
+        """
+        Encode a text as part of the next batch.
+        
+        Args:
+            text (str): Text to encode
+            
+        Returns:
+            np.ndarray: Encoded vector
+            
+        Raises:
+            RuntimeError: If the batcher is closed
+        """
+        pending = _PendingEncode(text)
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("Micro-batcher is closed")
+            self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def close(self):
+        """Stop the worker thread once the texts already submitted are encoded."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+
+    def _collect(self):
+        """Block for the first pending text, then gather a batch around it, None once closed."""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                # Closed, stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        """Worker loop encoding collected batches and dispatching the results."""
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                vectors = self.encode_fn([pending.text for pending in batch])
+                for pending, vector in zip(batch, vectors):
+                    pending.result = vector
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
+
+
 class EmbeddingManager:
     """
     Embedding models and reranker manager.
@@ -28,8 +145,22 @@ class EmbeddingManager:
         Sets up embedding and reranking models based on configuration.
         """
         self.embed_model = None
+        # Optional faster model of the same embedding, used for single queries
+        self.query_model = None
         self.reranker = None
         self.agent_config = agent_config
+        self._micro_batcher = None
+        self._rerank_cache = OrderedDict()
+        self._rerank_cache_size = 2048
+        self._rerank_cache_lock = threading.Lock()
+        # Query vectors of recent texts, for the model they were encoded with
+        self._query_cache = OrderedDict()
+        self._query_cache_size = 1024
+        self._query_cache_model = None
+        self._query_cache_lock = threading.Lock()
+        # (model, value) pairs, recomputed when embed_model is replaced
+        self._dimension = (None, None)
+        self._model_name = (None, None)
         self._initialize_models()
     
     def _initialize_models(self):
@@ -45,79 +176,191 @@ class EmbeddingManager:
         if not self.agent_config.enable_kb:
             return
         
+        # Imported here so that importing this module does not pull in
+        # FlagEmbedding/torch, e.g. in document processing workers
         try:
+            from ai_engine.models.embedding import initialize_embedding
             self.embed_model = initialize_embedding(self.agent_config)
             logger.info(f"Embedding model initialized: {self.embed_model.embed_model_fullname}")
         except Exception as e:
             logger.error(f"Failed to initialize embedding model: {e}")
+
+        if self.embed_model and self.agent_config.get("query_embed_backend", "flag") == "onnx":
+            if str(self.agent_config.embed_model).startswith("local/"):
+                try:
+                    from ai_engine.models.embedding import OnnxEmbeddingModel
+                    self.query_model = OnnxEmbeddingModel(self.agent_config)
+                    logger.info("ONNX query embedding model initialized")
+                except Exception as e:
+                    logger.error(f"Failed to initialize ONNX query embedding model: {e}")
+            else:
+                logger.warning("query_embed_backend=onnx only applies to local embedding models")
+
+        if self.embed_model and self.agent_config.get("embed_micro_batching", False):
+            self._micro_batcher = MicroBatcher(self._encode_queries)
             
         if self.agent_config.enable_rerank:
             try:
+                from ai_engine.models.rerank_model import initialize_reranker
                 self.reranker = initialize_reranker(self.agent_config)
+                with self._rerank_cache_lock:
+                    self._rerank_cache.clear()
                 logger.info("Reranker model initialized")
             except Exception as e:
                 logger.error(f"Failed to initialize reranker: {e}")
     
-    def encode_texts(self, texts):
+    def encode_texts(self, texts, batch_size=64):
         """
         Encode multiple texts into vectors.
         
         Args:
             texts (list): List of texts to encode
+            batch_size (int, optional): Texts per model call. Defaults to 64
             
         Returns:
-            list: List of encoded vectors
+            np.ndarray: C-contiguous float32 array of shape (len(texts), dimension)
+            
+        Raises:
+            ValueError: If embedding model is not initialized
+        """
+        return self.encode_batch(texts, batch_size=batch_size)
+
+    def _encode_queries(self, texts):
+        """Encode query texts, on the query model when one is loaded for the current embedding model."""
+        query_model = self.query_model
+        if query_model is not None and self.embed_model is not None \
+                and query_model.embed_model_fullname == self.embed_model.embed_model_fullname:
+            return np.ascontiguousarray(query_model.vectorize(texts), dtype=np.float32)
+        return self.encode_batch(texts)
+
+    def encode_batch(self, texts, batch_size=64):
+        """
+        Encode texts in forward passes of up to batch_size texts.
+        
+        Prefer this over calling encode_single_text in a loop.
+        
+        Args:
+            texts (list): List of texts to encode
+            batch_size (int, optional): Texts per model call. Defaults to 64
+            
+        Returns:
+            np.ndarray: C-contiguous float32 array of shape (len(texts), dimension)
             
         Raises:
             ValueError: If embedding model is not initialized
         """
         if not self.embed_model:
             raise ValueError("Embedding model not initialized")
-        return self.embed_model.batch_vectorize(texts)
+        vectors = self.embed_model.batch_vectorize(texts, batch_limit=batch_size)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+    
+    def encode_texts_iter(self, texts, batch_size=256):
+        """
+        Encode texts lazily, one batch per iteration.
+        
+        Lets a consumer store each batch while the next one is encoded.
+        
+        Args:
+            texts (list): List of texts to encode
+            batch_size (int, optional): Texts per batch. Defaults to 256
+            
+        Yields:
+            tuple: (start index of the batch in texts, float32 array of its vectors)
+            
+        Raises:
+            ValueError: If embedding model is not initialized
+        """
+        for start in range(0, len(texts), batch_size):
+            yield start, self.encode_batch(texts[start:start + batch_size], batch_size=batch_size)
     
     def encode_single_text(self, text):
         """
         Encode a single text into a vector.
         
+        Recently encoded texts (retried or repeated queries) are served
+        from an LRU cache, which is emptied when the embedding model
+        changes. Runs on the int8 ONNX query model when one is loaded.
+        When micro-batching is enabled, concurrent calls are coalesced
+        into a single batched forward pass.
+        
         Args:
             text (str): Text to encode
             
         Returns:
-            list: Encoded vector
+            np.ndarray: Encoded float32 vector, read-only when cached
         """
-        return self.encode_texts([text])[0]
+        cache = self._query_cache
+        with self._query_cache_lock:
+            if self._query_cache_model is not self.embed_model:
+                cache.clear()
+                self._query_cache_model = self.embed_model
+            vector = cache.get(text)
+            if vector is not None:
+                cache.move_to_end(text)
+                return vector
+
+        model = self.embed_model
+        if self._micro_batcher is not None:
+            vector = self._micro_batcher.submit(text)
+        else:
+            vector = self._encode_queries([text])[0]
+
+        if isinstance(vector, np.ndarray):
+            vector.setflags(write=False)
+        with self._query_cache_lock:
+            if self._query_cache_model is model:
+                cache[text] = vector
+                while len(cache) > self._query_cache_size:
+                    cache.popitem(last=False)
+        return vector
     
     def get_dimension(self):
         """
         Get the dimension of the embedding vectors.
         
+        Looked up once per embedding model.
+        
         Returns:
             int: Vector dimension if model is initialized,
                  None otherwise
         """
-        if not self.embed_model:
+        model = self.embed_model
+        if not model:
             return None
-        return self.embed_model.get_dimension()
+        if self._dimension[0] is not model:
+            self._dimension = (model, model.get_dimension())
+        return self._dimension[1]
     
     def get_model_name(self):
         """
         Get the name of the current embedding model.
         
+        Looked up once per embedding model.
+        
         Returns:
             str: Model name if initialized,
                  None otherwise
         """
-        if not self.embed_model:
+        model = self.embed_model
+        if not model:
             return None
-        return self.embed_model.embed_model_fullname
+        if self._model_name[0] is not model:
+            self._model_name = (model, model.embed_model_fullname)
+        return self._model_name[1]
     
-    def compute_rerank_scores(self, query, texts):
+    def compute_rerank_scores(self, query, texts, batch_size=32):
         """
         Compute reranking scores for search results.
         
+        The reranker is a cross-encoder, so every (query, text) pair needs
+        its own forward pass; pairs are scored in batches of batch_size and
+        recently scored pairs (e.g. repeated or paginated queries) are
+        served from an LRU cache.
+        
         Args:
             query (str): Search query
             texts (list): List of texts to rerank
+            batch_size (int, optional): Pairs per forward pass. Defaults to 32
             
         Returns:
             list: Reranking scores if reranker is available,
@@ -125,7 +368,32 @@ class EmbeddingManager:
         """
         if not self.reranker:
             return None
-        return self.reranker.compute_score([query, texts], normalize=False)
+
+        # Scores of this call are collected in found, so evicting cache
+        # entries below cannot lose any of them
+        cache = self._rerank_cache
+        found = {}
+        with self._rerank_cache_lock:
+            for text in dict.fromkeys(texts):
+                score = cache.get((query, text))
+                if score is not None:
+                    cache.move_to_end((query, text))
+                    found[text] = score
+
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        if missing:
+            scores = self.reranker.compute_score(
+                [[query, text] for text in missing],
+                batch_size=batch_size,
+                normalize=False
+            )
+            with self._rerank_cache_lock:
+                for text, score in zip(missing, np.atleast_1d(scores).tolist()):
+                    found[text] = cache[(query, text)] = score
+                while len(cache) > self._rerank_cache_size:
+                    cache.popitem(last=False)
+
+        return [found[text] for text in texts]
     
     def check_model_compatibility(self, required_model):
         """
@@ -6,9 +6,12 @@ the knowledge base. It handles CRUD operations for files and their
 associated metadata.
 """
 
-from sqlalchemy.orm import joinedload
+import time
+from datetime import datetime, timezone
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.orm import selectinload
 
-from ai_engine.models.knowledge import KnowledgeFile
+from ai_engine.models.knowledge import KnowledgeFile, KnowledgeNode
 from .base_manager import BaseDBManager
 from ai_engine.configs.agent import AgentConfig
 
@@ -62,6 +65,37 @@ class FileManager(BaseDBManager):
             # Return a dictionary instead of an object to avoid lazy loading issues after session closing
             return file.as_dict()
 
+    def add_files(self, db_id, records):
+        """
+        Add several files to the knowledge base in one transaction.
+        
+        Args:
+            db_id (str): ID of the database to add the files to
+            records (list): (uid, filename, path, kind, state) tuples
+            
+        Returns:
+            list: Added file information, in the same format as add_file
+        """
+        # Set client-side so the returned dicts need no read-back
+        created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        with self.get_session() as session:
+            files = [
+                KnowledgeFile(
+                    uid=uid,
+                    repo_uid=db_id,
+                    filename=filename,
+                    path=path,
+                    kind=kind,
+                    state=state,
+                    created_at=created_at
+                )
+                for uid, filename, path, kind, state in records
+            ]
+            session.add_all(files)
+
+            # Build the dicts before commit expires the instances
+            return [file.as_dict_fast() for file in files]
+
     def update_file_status(self, file_id, status):
         """
         Update the processing status of a file.
@@ -80,11 +114,37 @@ class FileManager(BaseDBManager):
                 return True
             return False
 
+    def update_files_status(self, statuses):
+        """
+        Update the processing status of several files in one statement.
+        
+        Issues a single ``UPDATE ... SET state = CASE uid ...`` so the whole
+        batch is written in one transaction.
+        
+        Args:
+            statuses (dict): Mapping of file ID to new status value
+            
+        Returns:
+            int: Number of files updated
+        """
+        if not statuses:
+            return 0
+
+        with self.get_session() as session:
+            result = session.execute(
+                update(KnowledgeFile)
+                .where(KnowledgeFile.uid.in_(list(statuses)))
+                .values(state=case(statuses, value=KnowledgeFile.uid)),
+                execution_options={"synchronize_session": False}
+            )
+            return result.rowcount
+
     def delete_file(self, file_id):
         """
         Delete a file and its associated data.
         
-        This operation will cascade delete all associated nodes.
+        This operation will cascade delete all associated nodes. Rows are
+        removed with bulk DELETE statements, so nothing is loaded first.
         
         Args:
             file_id (str): ID of the file to delete
@@ -93,18 +153,28 @@ class FileManager(BaseDBManager):
             bool: True if file was found and deleted, False otherwise
         """
         with self.get_session() as session:
-            file = session.query(KnowledgeFile).filter_by(uid=file_id).first()
-            if file:
-                session.delete(file)
-                return True
-            return False
+            result = session.execute(
+                delete(KnowledgeFile).where(KnowledgeFile.uid == file_id),
+                execution_options={"synchronize_session": False}
+            )
+            if not result.rowcount:
+                return False
+
+            # SQLite does not enforce foreign keys here, so cascade by hand
+            session.execute(
+                delete(KnowledgeNode).where(KnowledgeNode.file_uid == file_id),
+                execution_options={"synchronize_session": False}
+            )
+            return True
 
     def get_files_by_database(self, db_id):
         """
         Get all files associated with a database.
         
-        Uses eager loading to fetch associated nodes along with the file
-        information to avoid N+1 query problems.
+        Selects only the needed columns as plain row mappings, skipping ORM
+        object construction. Nodes are fetched with one separate query and
+        grouped by file in Python, which avoids the per-node row duplication
+        of a join.
         
         Args:
             db_id (str): ID of the database
@@ -112,11 +182,44 @@ class FileManager(BaseDBManager):
         Returns:
             list: List of dictionaries containing file information
         """
+        file_uids = select(KnowledgeFile.uid).where(KnowledgeFile.repo_uid == db_id)
         with self.get_session() as session:
-            files = session.query(KnowledgeFile).options(
-                joinedload(KnowledgeFile.content_blocks)
-            ).filter_by(repo_uid=db_id).all()
-            return [file.as_dict() for file in files]
+            files = session.execute(
+                select(
+                    KnowledgeFile.uid,
+                    KnowledgeFile.filename,
+                    KnowledgeFile.path,
+                    KnowledgeFile.kind.label("type"),
+                    KnowledgeFile.state.label("status"),
+                    KnowledgeFile.created_at
+                ).where(KnowledgeFile.repo_uid == db_id)
+            ).mappings().all()
+            nodes = session.execute(
+                select(
+                    KnowledgeNode.id,
+                    KnowledgeNode.file_uid.label("file_id"),
+                    KnowledgeNode.content_text.label("text"),
+                    KnowledgeNode.hash,
+                    KnowledgeNode.start_pos.label("start_char_idx"),
+                    KnowledgeNode.end_pos.label("end_char_idx"),
+                    KnowledgeNode.metadata_extra.label("metadata")
+                ).where(KnowledgeNode.file_uid.in_(file_uids))
+            ).mappings().all()
+
+        nodes_by_file = {}
+        for node in nodes:
+            node = dict(node)
+            node["metadata"] = node["metadata"] or {}
+            nodes_by_file.setdefault(node["file_id"], []).append(node)
+
+        results = []
+        for file in files:
+            file = dict(file)
+            created_at = file["created_at"]
+            file["created_at"] = created_at.timestamp() if created_at else time.time()
+            file["nodes"] = nodes_by_file.get(file["uid"], [])
+            results.append(file)
+        return results
 
     def get_file_by_id(self, file_id):
         """
@@ -132,7 +235,36 @@ class FileManager(BaseDBManager):
             dict: File information if found, None otherwise
         """
         with self.get_session() as session:
-            file = session.query(KnowledgeFile).options(
-                joinedload(KnowledgeFile.content_blocks)
-            ).filter_by(uid=file_id).first()
-            return file.as_dict() if file else None
\ No newline at end of file
+            file = session.execute(
+                select(KnowledgeFile)
+                .options(selectinload(KnowledgeFile.content_blocks))
+                .filter_by(uid=file_id)
+                .limit(1)
+            ).scalars().first()
+            return file.as_dict_fast() if file else None
+
+    def get_files_by_ids(self, file_ids):
+        """
+        Get information about several files in one query.
+        
+        Associated nodes are loaded with one extra IN query for all files,
+        so looking up N files costs two round-trips instead of 2N.
+        
+        Args:
+            file_ids (iterable): IDs of the files, duplicates are ignored
+            
+        Returns:
+            dict: File ID to file information, in the format of
+                get_file_by_id; IDs not found are left out
+        """
+        file_ids = list(dict.fromkeys(file_ids))
+        if not file_ids:
+            return {}
+
+        with self.get_session() as session:
+            files = session.execute(
+                select(KnowledgeFile)
+                .options(selectinload(KnowledgeFile.content_blocks))
+                .where(KnowledgeFile.uid.in_(file_ids))
+            ).scalars().all()
+            return {file.uid: file.as_dict_fast() for file in files}
@@ -25,6 +25,14 @@ class KBDBManager:
     def get_all_databases(self):
         """Get all registered knowledge databases"""
         return self.db_manager.get_all_databases()
+
+    def iter_all_databases(self, batch: int = 100):
+        """Iterate over all registered knowledge databases, fetching them in batches"""
+        return self.db_manager.iter_all_databases(batch)
+    
+    def iter_database_summaries(self, batch: int = 100):
+        """Iterate over all registered knowledge databases as DatabaseSummary listings"""
+        return self.db_manager.iter_database_summaries(batch)
     
     def get_database_by_id(self, db_id: str) -> dict:
         """
@@ -85,6 +93,19 @@ class KBDBManager:
         """
         return self.file_manager.add_file(db_id, file_id, filename, path, file_type, status)
     
+    def add_files(self, db_id: str, records: list) -> list:
+        """
+        Add several files to the knowledge base in one transaction
+        
+        Args:
+            db_id (str): ID of the database to add the files to
+            records (list): (file_id, filename, path, file_type, status) tuples
+            
+        Returns:
+            list: Added file information
+        """
+        return self.file_manager.add_files(db_id, records)
+    
     def update_file_status(self, file_id: str, status: str) -> bool:
         """
         Update the processing status of a file
@@ -98,6 +119,18 @@ class KBDBManager:
         """
         return self.file_manager.update_file_status(file_id, status)
     
+    def update_files_status(self, statuses: dict) -> int:
+        """
+        Update the processing status of several files at once
+        
+        Args:
+            statuses (dict): Mapping of file ID to new status value
+            
+        Returns:
+            int: Number of files updated
+        """
+        return self.file_manager.update_files_status(statuses)
+    
     def delete_file(self, file_id: str) -> bool:
         """
         Delete a file and its associated data
@@ -134,6 +167,18 @@ class KBDBManager:
         """
         return self.file_manager.get_file_by_id(file_id)
     
+    def get_files_by_ids(self, file_ids) -> dict:
+        """
+        Get information about several files at once
+        
+        Args:
+            file_ids (iterable): IDs of the files
+            
+        Returns:
+            dict: File ID to file information, for the files found
+        """
+        return self.file_manager.get_files_by_ids(file_ids)
+    
     # Knowledge Node operations
     def add_node(self, file_id, text, hash_value=None, start_char_idx=None, end_char_idx=None, metadata=None):
         """
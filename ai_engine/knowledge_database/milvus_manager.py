@@ -10,9 +10,153 @@ It handles all vector storage operations including:
 """
 
 import os
-from pymilvus import MilvusClient, MilvusException
+import time
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pymilvus import MilvusClient, MilvusException, DataType
 from ai_engine.utils import logger
 from ai_engine.configs.agent import AgentConfig
+from ai_engine.utils.kernels import cosine_scores, quantize_int8
+
+# Rows per insert call when a large batch is split up
+INSERT_BATCH_SIZE = 10000
+
+# Primary keys fetched per query_iterator page, and deleted per call, when
+# deleting by filter in batches
+DELETE_BATCH_SIZE = 10000
+
+# Seconds a get_collection_info result is served from cache
+COLLECTION_INFO_TTL = 2.0
+
+# Storage dtype name -> Milvus vector field type
+VECTOR_FIELD_TYPES = {
+    "float32": DataType.FLOAT_VECTOR,
+    "float16": DataType.FLOAT16_VECTOR,
+    "bfloat16": DataType.BFLOAT16_VECTOR,
+}
+# Only newer pymilvus releases have int8 vector fields, on older ones
+# "int8" is rejected as an unsupported dtype
+if getattr(DataType, "INT8_VECTOR", None) is not None:
+    VECTOR_FIELD_TYPES["int8"] = DataType.INT8_VECTOR
+
+# Build parameters per index type. GPU indexes do not support COSINE, they use
+# inner product, which ranks identically on the normalized embeddings we store.
+INDEX_PARAMS = {
+    "AUTOINDEX": {"metric_type": "COSINE", "params": {}},
+    "HNSW": {"metric_type": "COSINE", "params": {"M": 16, "efConstruction": 200}},
+    "IVF_PQ": {"metric_type": "COSINE", "params": {"nlist": 1024, "m": 0, "nbits": 8}},
+    "GPU_CAGRA": {"metric_type": "IP", "params": {"intermediate_graph_degree": 128, "graph_degree": 64}},
+    "GPU_IVF_PQ": {"metric_type": "IP", "params": {"nlist": 1024, "m": 0, "nbits": 8}},
+}
+
+# Default search parameters per index type
+SEARCH_PARAMS = {
+    "HNSW": {"ef": 64},
+    "IVF_PQ": {"nprobe": 16},
+    "GPU_CAGRA": {"itopk_size": 128},
+    "GPU_IVF_PQ": {"nprobe": 16},
+}
+
+
+# Compressed indexes whose approximate scores are refined with the stored
+# vectors, and the default over-fetch factor for that refinement
+REFINED_INDEXES = frozenset(("IVF_PQ",))
+REFINE_K_FACTOR = 4
+
+
+def _pq_subquantizers(dimension):
+    """Number of PQ sub-vectors: dimension / 8, lowered to a divisor of dimension."""
+    m = max(1, dimension // 8)
+    while dimension % m:
+        m -= 1
+    return m
+
+
+def _to_bfloat16_bytes(vectors):
+    """
+    Round float32 vectors to bfloat16, packed as raw bytes per vector.
+    
+    NumPy has no bfloat16 dtype, and pymilvus takes bfloat16 vectors as
+    bytes, so the upper 16 bits of each float32 are kept with
+    round-to-nearest-even.
+    """
+    bits = vectors.view(np.uint32)
+    rounded = ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype(np.uint16)
+    if rounded.ndim == 1:
+        return rounded.tobytes()
+    return [row.tobytes() for row in rounded]
+
+
+def _from_bfloat16_bytes(data):
+    """Inverse of _to_bfloat16_bytes, returning float32 vectors."""
+    if isinstance(data, bytes):
+        halves = np.frombuffer(data, dtype=np.uint16)
+    else:
+        halves = np.stack([np.frombuffer(row, dtype=np.uint16) for row in data])
+    return (halves.astype(np.uint32) << 16).view(np.float32)
+
+
+def quantize_vectors(vectors, vector_dtype="float32"):
+    """
+    Cast embeddings to the storage dtype of a collection.
+    
+    int8 uses symmetric per-vector quantization (``q = round(v / s)`` with
+    ``s = max|v| / 127``); the scales are returned so the original vectors
+    can be reconstructed as ``q * s``. bfloat16 vectors are returned as raw
+    bytes per vector, the form pymilvus accepts for that field type.
+    
+    Args:
+        vectors (array-like): Vector or 2-D batch of vectors
+        vector_dtype (str, optional): One of "float32", "float16",
+            "bfloat16", "int8". Defaults to "float32"
+            
+    Returns:
+        tuple: (quantized array, per-vector scales or None)
+        
+    Raises:
+        ValueError: If vector_dtype is not supported
+    """
+    if vector_dtype not in VECTOR_FIELD_TYPES:
+        raise ValueError(f"Unsupported vector dtype: {vector_dtype}")
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vector_dtype == "float32":
+        return vectors, None
+    if vector_dtype == "float16":
+        return vectors.astype(np.float16), None
+    if vector_dtype == "bfloat16":
+        return _to_bfloat16_bytes(vectors), None
+
+    if vectors.ndim == 2 and vectors.shape[0] > 64:
+        return quantize_int8(vectors)
+    scales = np.abs(vectors).max(axis=-1, keepdims=True) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(vectors / scales).astype(np.int8)
+    return quantized, scales.squeeze(-1)
+
+
+def dequantize_vectors(quantized, scales=None):
+    """
+    Reconstruct float32 vectors from the output of quantize_vectors.
+    
+    Args:
+        quantized (np.ndarray | bytes | list): Quantized vector or 2-D batch
+            of vectors, bytes for bfloat16
+        scales (array-like, optional): Per-vector int8 scales, None for
+            float16/bfloat16/float32 input
+            
+    Returns:
+        np.ndarray: float32 vectors
+    """
+    if isinstance(quantized, bytes) or (isinstance(quantized, list) and quantized and isinstance(quantized[0], bytes)):
+        return _from_bfloat16_bytes(quantized)
+    vectors = np.asarray(quantized).astype(np.float32)
+    if scales is not None:
+        vectors *= np.asarray(scales, dtype=np.float32)[..., None]
+    return vectors
+
+
 class MilvusManager:
     """
     Milvus vector database manager.
@@ -32,27 +176,71 @@ class MilvusManager:
         or configuration defaults.
         """
         self.client = None
+        self._vector_dtypes = {}
+        self._index_types = {}
+        self._has_gpu = None
+        self._info_cache = {}
+        self._known_collections = set()
+        self._clients = None
+        self._rr = None
         self.uri = os.getenv('MILVUS_URI', agent_config.get('milvus_uri', "http://localhost:19530/"))
+        self.itopk_size = agent_config.get('kb_itopk_size', 128)
+        self.pool_size = max(1, int(os.getenv('MILVUS_POOL_SIZE', agent_config.get('milvus_pool_size', 4))))
         
     def connect(self) -> bool:
         """
         Connect to Milvus server.
         
         Attempts to establish connection and verify it by listing collections.
+        Besides the main client, pool_size - 1 clients with dedicated
+        channels are opened; inserts, searches and queries are spread
+        over all of them so a large insert does not hold up queries.
         
         Returns:
             bool: True if connection successful, False otherwise
         """
         try:
             self.client = MilvusClient(uri=self.uri)
-            self.client.list_collections()
+            self._known_collections = set(self.client.list_collections())
+            self._clients = [self.client] + [
+                MilvusClient(uri=self.uri, dedicated=True) for _ in range(self.pool_size - 1)
+            ]
+            self._rr = itertools.cycle(self._clients)
             logger.info("Successfully connected to Milvus at %s", self.uri)
             return True
         except MilvusException as e:
             logger.error("Failed to connect to Milvus with uri: %s, %s", self.uri, e)
             return False
     
-    def create_collection(self, collection_name, dimension):
+    def _next_client(self):
+        """Next client of the pool in round-robin order, the main client if there is no pool."""
+        if self._rr is None or self._clients[0] is not self.client:
+            return self.client
+        return next(self._rr)
+
+    def has_gpu(self) -> bool:
+        """
+        Check whether the Milvus server can build GPU indexes.
+        
+        Uses the MILVUS_GPU environment variable when set, otherwise
+        probes the server version string for a GPU build.
+        
+        Returns:
+            bool: True if GPU indexes are available
+        """
+        if self._has_gpu is None:
+            env = os.getenv('MILVUS_GPU')
+            if env is not None:
+                self._has_gpu = env.lower() in ("1", "true", "yes")
+            else:
+                try:
+                    self._has_gpu = "gpu" in str(self.client.get_server_version()).lower()
+                except MilvusException as e:
+                    logger.warning("Failed to get Milvus server version: %s", e)
+                    return False
+        return self._has_gpu
+
+    def create_collection(self, collection_name, dimension, vector_dtype="float32", index_type="AUTOINDEX"):
         """
         Create a new collection in Milvus.
         
@@ -61,23 +249,119 @@ class MilvusManager:
         Args:
             collection_name (str): Name for the new collection
             dimension (int): Vector dimension for the collection
+            vector_dtype (str, optional): Storage dtype of the vector field,
+                one of "float32", "float16", "bfloat16", "int8". Defaults to "float32"
+            index_type (str, optional): Vector index type, or "auto" to use
+                GPU_CAGRA when the server has a GPU. Defaults to "AUTOINDEX"
         """
+        if vector_dtype not in VECTOR_FIELD_TYPES:
+            raise ValueError(f"Unsupported vector dtype: {vector_dtype}")
+
+        if index_type == "auto":
+            index_type = "GPU_CAGRA" if self.has_gpu() else "AUTOINDEX"
+        if index_type not in INDEX_PARAMS:
+            raise ValueError(f"Unsupported index type: {index_type}")
+
         if self.client.has_collection(collection_name=collection_name):
             logger.warning("Collection %s already exists, dropping it", collection_name)
             self.client.drop_collection(collection_name=collection_name)
 
-        self.client.create_collection(
-            collection_name=collection_name,
-            dimension=dimension
-        )
+        if vector_dtype == "float32" and index_type == "AUTOINDEX":
+            self.client.create_collection(
+                collection_name=collection_name,
+                dimension=dimension
+            )
+        else:
+            # Same layout as the quick setup, with a custom vector field and index
+            schema = MilvusClient.create_schema(auto_id=False, enable_dynamic_field=True)
+            schema.add_field(field_name="id", datatype=DataType.INT64, is_primary=True)
+            schema.add_field(field_name="vector", datatype=VECTOR_FIELD_TYPES[vector_dtype], dim=dimension)
+
+            build_params = INDEX_PARAMS[index_type]
+            if index_type == "IVF_PQ":
+                build_params = {**build_params, "params": {**build_params["params"], "m": _pq_subquantizers(dimension)}}
+
+            index_params = self.client.prepare_index_params()
+            index_params.add_index(field_name="vector", index_type=index_type, **build_params)
+
+            self.client.create_collection(
+                collection_name=collection_name,
+                schema=schema,
+                index_params=index_params
+            )
+
+        self._known_collections.add(collection_name)
+        self._vector_dtypes[collection_name] = vector_dtype
+        self._index_types[collection_name] = index_type
+        self._invalidate_info(collection_name)
+
+    def _has_collection(self, collection_name):
+        """
+        Check that a collection exists, without an RPC once it is known.
+        
+        Collections listed at connect or created or seen here are
+        remembered; unknown names are checked with the server, so
+        collections created by another process are still found.
+        """
+        if collection_name in self._known_collections:
+            return True
+        if self.client.has_collection(collection_name=collection_name):
+            self._known_collections.add(collection_name)
+            return True
+        return False
+
+    def get_vector_dtype(self, collection_name):
+        """
+        Get the storage dtype of a collection's vector field.
+        
+        Args:
+            collection_name (str): Name of the collection
+            
+        Returns:
+            str: "float32", "float16", "bfloat16" or "int8"; "float32" if unknown
+        """
+        if collection_name not in self._vector_dtypes:
+            vector_dtype = "float32"
+            try:
+                fields = self.client.describe_collection(collection_name).get("fields", [])
+                for field in fields:
+                    for name, field_type in VECTOR_FIELD_TYPES.items():
+                        if field.get("type") == field_type:
+                            vector_dtype = name
+            except MilvusException as e:
+                logger.warning("Failed to get vector dtype of %s: %s", collection_name, e)
+                return vector_dtype
+            self._vector_dtypes[collection_name] = vector_dtype
+        return self._vector_dtypes[collection_name]
     
+    def get_index_type(self, collection_name):
+        """
+        Get the index type of a collection's vector field.
+        
+        Args:
+            collection_name (str): Name of the collection
+            
+        Returns:
+            str: Index type, "AUTOINDEX" if unknown
+        """
+        if collection_name not in self._index_types:
+            try:
+                index = self.client.describe_index(collection_name, index_name="vector")
+                self._index_types[collection_name] = index.get("index_type", "AUTOINDEX")
+            except MilvusException as e:
+                logger.warning("Failed to get index type of %s: %s", collection_name, e)
+                return "AUTOINDEX"
+        return self._index_types[collection_name]
+
     def insert_vectors(self, collection_name, data):
         """
         Insert vectors into a collection.
         
         Args:
             collection_name (str): Target collection name
-            data (list): List of dictionaries containing vectors and metadata
+            data (dict | list): Columnar dictionary mapping field names to
+                equal-length sequences (``"vector"`` as a 2-D float32 array),
+                or a list of row dictionaries containing vectors and metadata
             
         Returns:
             dict: Insertion result from Milvus
@@ -85,34 +369,218 @@ class MilvusManager:
         Raises:
             ValueError: If collection doesn't exist
         """
-        if not self.client.has_collection(collection_name=collection_name):
+        if not self._has_collection(collection_name):
             raise ValueError(f"Collection {collection_name} not found")
+
+        if isinstance(data, dict):
+            data = self._columns_to_rows(data)
+
+        self._invalidate_info(collection_name)
+        return self._next_client().insert(collection_name=collection_name, data=data)
+
+    def insert_vectors_batched(self, collection_name, data, batch_size=INSERT_BATCH_SIZE, max_workers=8):
+        """
+        Insert a large columnar batch as several concurrent insert calls.
+        
+        Splits the columns into slices of batch_size rows and inserts them
+        from a thread pool, so the per-call RPC overhead is spread across
+        connections and shards instead of one oversized request.
         
-        return self.client.insert(collection_name=collection_name, data=data)
+        Args:
+            collection_name (str): Target collection name
+            data (dict): Columnar dictionary, as accepted by insert_vectors
+            batch_size (int, optional): Rows per insert call. Defaults to 10000
+            max_workers (int, optional): Concurrent insert calls. Defaults to 8
+            
+        Returns:
+            list: Insertion results from Milvus, one per slice
+            
+        Raises:
+            ValueError: If collection doesn't exist
+        """
+        if not self._has_collection(collection_name):
+            raise ValueError(f"Collection {collection_name} not found")
+
+        self._invalidate_info(collection_name)
+        total = len(next(iter(data.values()), ()))
+        slices = [
+            self._columns_to_rows({field: values[start:start + batch_size] for field, values in data.items()})
+            for start in range(0, total, batch_size)
+        ]
+        if len(slices) <= 1:
+            return [self._next_client().insert(collection_name=collection_name, data=rows) for rows in slices]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(slices))) as executor:
+            return list(executor.map(
+                lambda rows: self._next_client().insert(collection_name=collection_name, data=rows), slices
+            ))
+
+    @staticmethod
+    def _columns_to_rows(columns):
+        """
+        Expand a columnar batch into the row format expected by MilvusClient.
+        
+        Rows hold views into the column buffers, so a 2-D float32 vector
+        array is handed to pymilvus without a per-row list conversion.
+        
+        Args:
+            columns (dict): Field name to sequence of values
+            
+        Returns:
+            list: List of row dictionaries
+        """
+        fields = list(columns)
+        return [dict(zip(fields, values)) for values in zip(*columns.values())]
     
-    def search_vectors(self, collection_name, query_vector, limit=3, output_fields=None):
+    def search_vectors(self, collection_name, query_vector, limit=3, output_fields=None, k_factor=None,
+                       distance_threshold=None):
         """
-        Search for similar vectors in a collection.
+        Search for vectors similar to a single query.
+        
+        Thin wrapper over search_vectors_batch for single-query callers.
         
         Args:
             collection_name (str): Collection to search in
             query_vector (list): Query vector
             limit (int, optional): Maximum number of results. Defaults to 3
             output_fields (list, optional): Fields to return. Defaults to ["text", "file_id"]
+            k_factor (int, optional): Candidate over-fetch factor for
+                refinement, 1 disables it. Defaults to 4 on compressed indexes
+            distance_threshold (float, optional): Only return hits with a
+                higher similarity, see search_vectors_batch
             
         Returns:
             list: Search results sorted by similarity
         """
+        results = self.search_vectors_batch(
+            collection_name, [query_vector], limit, output_fields, k_factor, distance_threshold
+        )
+        return results[0] if results else []
+
+    def search_vectors_batch(self, collection_name, query_vectors, limit=3, output_fields=None, k_factor=None,
+                             distance_threshold=None):
+        """
+        Search for similar vectors for several queries in one request.
+        
+        On compressed indexes (IVF_PQ) the search is two-stage: limit *
+        k_factor candidates are fetched from the index, then re-scored
+        exactly against their stored float32 vectors and cut to limit.
+        
+        With a distance_threshold the search runs as a Milvus range search,
+        so hits at or below the threshold are pruned by the server instead
+        of being returned. It is skipped where index scores are not the
+        final cosine similarity (refined searches, int8 storage); callers
+        should still check the threshold on the returned hits.
+        
+        Args:
+            collection_name (str): Collection to search in
+            query_vectors (list): Query vectors
+            limit (int, optional): Maximum number of results per query. Defaults to 3
+            output_fields (list, optional): Fields to return. Defaults to ["text", "file_id"]
+            k_factor (int, optional): Candidate over-fetch factor for
+                refinement, 1 disables it. Defaults to 4 on compressed indexes
+            distance_threshold (float, optional): Minimum similarity of
+                returned hits, exclusive. Defaults to None, no range filter
+            
+        Returns:
+            list: One list of search results per query, sorted by similarity
+        """
         if output_fields is None:
             output_fields = ["text", "file_id"]
+        if len(query_vectors) == 0:
+            return []
+
+        index_type = self.get_index_type(collection_name)
+        vector_dtype = self.get_vector_dtype(collection_name)
+        if k_factor is None:
+            k_factor = REFINE_K_FACTOR if index_type in REFINED_INDEXES else 1
+        # Exact re-scoring needs full-precision stored vectors
+        refine = k_factor > 1 and vector_dtype == "float32"
+
+        search_data = list(query_vectors)
+        if vector_dtype != "float32":
+            quantized, _ = quantize_vectors(np.asarray(query_vectors, dtype=np.float32), vector_dtype)
+            search_data = list(quantized)
+
+        search_kwargs = {}
+        search_params = dict(SEARCH_PARAMS.get(index_type, {}))
+        if "itopk_size" in search_params:
+            # CAGRA requires itopk_size >= limit
+            search_params["itopk_size"] = max(int(self.itopk_size), limit)
+        if distance_threshold is not None and not refine and vector_dtype != "int8":
+            # COSINE and IP both rank higher as more similar, so only scores above
+            # radius are kept. No range_filter upper bound: rounding puts exact
+            # matches slightly above 1.0, and IP scores are not capped at 1.0
+            search_params["radius"] = float(distance_threshold)
+        if search_params:
+            search_kwargs["search_params"] = {"params": search_params}
+            
+        res = self._next_client().search(
+            collection_name=collection_name,
+            data=search_data,
+            limit=limit * k_factor if refine else limit,
+            output_fields=output_fields,
+            **search_kwargs
+        )
+        results = [list(hits) for hits in res] if res else [[] for _ in search_data]
+        if refine and any(results):
+            results = self._refine_hits(collection_name, query_vectors, results, limit)
+        return results
+
+    def _refine_hits(self, collection_name, query_vectors, results, limit):
+        """
+        Re-score search hits with exact cosine similarity.
+        
+        Stored vectors for every candidate across all queries are fetched
+        in a single request.
+        
+        Args:
+            collection_name (str): Collection the hits come from
+            query_vectors (array-like): Query vectors, one per result list
+            results (list): Candidate hits from search, one list per query
+            limit (int): Number of hits to keep per query
             
-        res = self.client.search(
+        Returns:
+            list: Top hits by exact similarity per query, with updated distances
+        """
+        ids = list({hit["id"] for hits in results for hit in hits})
+        rows = self._next_client().get(
             collection_name=collection_name,
-            data=[query_vector],
-            limit=limit,
-            output_fields=output_fields
+            ids=ids,
+            output_fields=["vector"]
         )
-        return res[0] if res else []
+        stored = {row["id"]: row["vector"] for row in rows}
+
+        refined_results = []
+        for query_vector, hits in zip(query_vectors, results):
+            hits = [hit for hit in hits if hit["id"] in stored]
+            if not hits:
+                refined_results.append([])
+                continue
+
+            scores = self.rerank_candidates(query_vector, [stored[hit["id"]] for hit in hits])
+
+            refined = []
+            for i in np.argsort(-scores)[:limit]:
+                hit = hits[i]
+                hit["distance"] = float(scores[i])
+                refined.append(hit)
+            refined_results.append(refined)
+        return refined_results
+
+    @staticmethod
+    def rerank_candidates(query_vector, candidate_vectors):
+        """
+        Exact cosine similarity of candidate vectors to a query.
+        
+        Args:
+            query_vector (array-like): Query vector
+            candidate_vectors (array-like): (N, dim) candidate vectors
+            
+        Returns:
+            np.ndarray: (N,) float32 similarities, in candidate order
+        """
+        return cosine_scores(query_vector, candidate_vectors)
     
     def delete_vectors(self, collection_name, filter_expr):
         """
@@ -125,7 +593,49 @@ class MilvusManager:
         Returns:
             dict: Deletion result from Milvus
         """
+        self._invalidate_info(collection_name)
         return self.client.delete(collection_name=collection_name, filter=filter_expr)
+
+    def delete_vectors_batched(self, collection_name, filter_expr, batch_size=DELETE_BATCH_SIZE, max_workers=4):
+        """
+        Delete vectors matching a filter by primary key, page by page.
+        
+        Streams the matching IDs with a query iterator and deletes each page
+        with a concurrent delete-by-ID call, so only the rows of the filter
+        are touched and no single request has to cover all of them.
+        
+        Args:
+            collection_name (str): Collection to delete from
+            filter_expr (str): Expression to filter vectors to delete
+            batch_size (int, optional): IDs per page and per delete call. Defaults to 10000
+            max_workers (int, optional): Concurrent delete calls. Defaults to 4
+            
+        Returns:
+            int: Number of vectors deleted
+        """
+        self._invalidate_info(collection_name)
+        iterator = self.client.query_iterator(
+            collection_name=collection_name,
+            filter=filter_expr,
+            output_fields=["id"],
+            batch_size=batch_size
+        )
+
+        def delete(ids):
+            result = self._next_client().delete(collection_name=collection_name, ids=ids)
+            return result.get("delete_count", len(ids)) if isinstance(result, dict) else len(ids)
+
+        futures = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                while True:
+                    page = iterator.next()
+                    if not page:
+                        break
+                    futures.append(executor.submit(delete, [row["id"] for row in page]))
+            finally:
+                iterator.close()
+            return sum(future.result() for future in futures)
     
     def drop_collection(self, collection_name):
         """
@@ -137,12 +647,19 @@ class MilvusManager:
         Returns:
             dict: Operation result from Milvus
         """
+        self._known_collections.discard(collection_name)
+        self._vector_dtypes.pop(collection_name, None)
+        self._index_types.pop(collection_name, None)
+        self._invalidate_info(collection_name)
         return self.client.drop_collection(collection_name=collection_name)
     
     def get_collection_info(self, collection_name):
         """
         Get information about a collection.
         
+        Results are cached for COLLECTION_INFO_TTL seconds, and dropped
+        early when the collection is written to.
+        
         Args:
             collection_name (str): Name of the collection
             
@@ -153,10 +670,12 @@ class MilvusManager:
                 - status: Collection status
                 - error_message: Error if any occurred
         """
+        cached = self._info_cache.get(collection_name)
+        if cached and time.monotonic() - cached[0] < COLLECTION_INFO_TTL:
+            return dict(cached[1])
+
         try:
-            collection = self.client.describe_collection(collection_name)
-            collection.update(self.client.get_collection_stats(collection_name))
-            return collection
+            collection = self._fetch_collection_info(collection_name)
         except MilvusException as e:
             logger.warning(f"Failed to get collection {collection_name} info: {e}")
             return {
@@ -165,6 +684,41 @@ class MilvusManager:
                 "status": "Error",
                 "error_message": str(e)
             }
+        return dict(collection)
+
+    def refresh_all(self, max_workers=16):
+        """
+        Refresh the cached information of every collection concurrently.
+        
+        Collections that fail to describe are left out of the cache, so
+        get_collection_info reports their error individually.
+        
+        Args:
+            max_workers (int, optional): Concurrent describe calls. Defaults to 16
+        """
+        names = self.client.list_collections()
+        if not names:
+            return
+
+        def fetch(name):
+            try:
+                self._fetch_collection_info(name)
+            except MilvusException as e:
+                logger.warning(f"Failed to get collection {name} info: {e}")
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as executor:
+            list(executor.map(fetch, names))
+
+    def _fetch_collection_info(self, collection_name):
+        """Describe a collection, add its stats and cache the result."""
+        collection = self.client.describe_collection(collection_name)
+        collection.update(self.client.get_collection_stats(collection_name))
+        self._info_cache[collection_name] = (time.monotonic(), collection)
+        return collection
+
+    def _invalidate_info(self, collection_name):
+        """Drop the cached information of a collection after a write."""
+        self._info_cache.pop(collection_name, None)
     
     def list_collections(self):
         """
@@ -188,7 +742,7 @@ class MilvusManager:
         Returns:
             list: Query results from Milvus
         """
-        return self.client.query(
+        return self._next_client().query(
             collection_name=collection_name,
             filter=filter_expr,
             output_fields=output_fields,
@@ -6,10 +6,32 @@ It handles CRUD operations for text chunks and their metadata within
 the knowledge base.
 """
 
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
 from ai_engine.models.knowledge import KnowledgeNode
+from ai_engine.utils import logger
 from .base_manager import BaseDBManager
 from ai_engine.configs.agent import AgentConfig
 
+# External-content FTS5 index over knowledge_nodes.content_text, kept in sync
+# by triggers. The trigram tokenizer gives the same case-insensitive substring
+# semantics as LIKE '%x%', but served from the index instead of a table scan.
+FTS_TABLE = "knowledge_node_fts"
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "content_text, content='knowledge_nodes', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS knowledge_nodes_fts_insert AFTER INSERT ON knowledge_nodes BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, content_text) VALUES (new.id, new.content_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS knowledge_nodes_fts_delete AFTER DELETE ON knowledge_nodes BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content_text) VALUES ('delete', old.id, old.content_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS knowledge_nodes_fts_update AFTER UPDATE ON knowledge_nodes BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content_text) VALUES ('delete', old.id, old.content_text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, content_text) VALUES (new.id, new.content_text); END",
+)
+# Trigrams need at least three characters to match anything
+FTS_MIN_QUERY = 3
+
 class NodeManager(BaseDBManager):
     """
     Knowledge Node operations manager.
@@ -22,6 +44,32 @@ class NodeManager(BaseDBManager):
     """
     def __init__(self, agent_config: AgentConfig):
         super().__init__(agent_config)
+        self.fts_enabled = self._ensure_fts()
+
+    def _ensure_fts(self):
+        """
+        Create the full-text index over node content if it does not exist.
+        
+        Existing nodes are indexed once, when the index is first created.
+        
+        Returns:
+            bool: True if the index is available, False if this SQLite build
+                lacks FTS5 or the trigram tokenizer
+        """
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": FTS_TABLE}
+                ).first()
+                for statement in FTS_SCHEMA:
+                    conn.execute(text(statement))
+                if not exists:
+                    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            return True
+        except OperationalError as e:
+            logger.warning(f"Full-text node search unavailable, falling back to LIKE: {e}")
+            return False
 
     def add_node(self, file_id, text, hash_value=None, start_char_idx=None, end_char_idx=None, metadata=None):
         """
@@ -77,6 +125,9 @@ class NodeManager(BaseDBManager):
         """
         Search for nodes/chunks using filters.
         
+        Text search of three or more characters goes through the full-text
+        index; shorter text falls back to a LIKE scan.
+        
         Args:
             file_id (str, optional): Filter by specific file
             search_text (str, optional): Filter by text content
@@ -89,7 +140,14 @@ class NodeManager(BaseDBManager):
             query = session.query(KnowledgeNode)
             if file_id:
                 query = query.filter_by(file_uid=file_id)
-            if search_text:
+            if search_text and self.fts_enabled and len(search_text) >= FTS_MIN_QUERY:
+                # Quoted so the text is matched literally as one substring
+                phrase = '"' + search_text.replace('"', '""') + '"'
+                query = query.filter(
+                    text(f"knowledge_nodes.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :phrase)")
+                    .bindparams(phrase=phrase)
+                )
+            elif search_text:
                 query = query.filter(KnowledgeNode.content_text.like(f"%{search_text}%"))
             nodes = query.limit(limit).all()
             return [node.as_dict() for node in nodes]
\ No newline at end of file
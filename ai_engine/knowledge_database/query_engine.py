@@ -5,7 +5,63 @@ This module provides advanced search functionality for the knowledge base.
 It combines vector similarity search with reranking to provide accurate
 and relevant search results.
 """
+import threading
+import time
+from functools import partial
+from collections import OrderedDict
+
+import numpy as np
 from ai_engine.configs.agent import AgentConfig
+from .embedding_manager import MicroBatcher
+from ai_engine.utils.kernels import filter_topk, warm_kernels
+
+
+# Seconds rerank scores of a (query, candidates) pair are reused
+RERANK_CACHE_TTL = 30.0
+
+# Hit count above which the distance filter runs in the compiled kernel,
+# smaller lists are cheaper to filter in Python than to box into an array
+FILTER_KERNEL_MIN_HITS = 64
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire ttl seconds after being set."""
+
+    def __init__(self, max_items=4096, ttl=RERANK_CACHE_TTL):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Value stored for key, or None if missing or expired."""
+        with self._lock:
+            item = self._store.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value):
+        """Store value for key, evicting the least recently used entries over max_items."""
+        with self._lock:
+            self._store[key] = (time.monotonic() + self.ttl, value)
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_items:
+                self._store.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._store.clear()
+
+
+# Rerank scores keyed by (db_id, query, candidate IDs), shared by all engines
+_RERANK_CACHE = TTLCache()
+
 
 class QueryEngine:
     """
@@ -36,8 +92,71 @@ class QueryEngine:
         self.default_distance_threshold = 0.5
         self.default_rerank_threshold = 0.15
         self.default_max_query_count = 20
+
+        # One batcher per collection, each flush searches once per limit and threshold
+        self.micro_batching = bool(self.agent_config.get("kb_search_micro_batching", False))
+        self._search_batchers = {}
+        self._batchers_lock = threading.Lock()
+
+        # Compile the scoring kernels now instead of on the first query
+        warm_kernels()
     
-    def search(self, query, collection_name, limit=3):
+    def _get_search_batcher(self, collection_name):
+        """
+        Get or create the search micro-batcher of a collection.
+        
+        Args:
+            collection_name (str): Collection to search in
+            
+        Returns:
+            MicroBatcher: Batcher taking (vector, limit, distance_threshold)
+                items and flushing them as multi-query searches
+        """
+        with self._batchers_lock:
+            batcher = self._search_batchers.get(collection_name)
+            if batcher is None:
+                batcher = MicroBatcher(
+                    partial(self._search_queued, collection_name),
+                    name=f"search-micro-batcher-{collection_name}"
+                )
+                self._search_batchers[collection_name] = batcher
+            return batcher
+
+    def _search_queued(self, collection_name, items):
+        """
+        Search queued (vector, limit, distance_threshold) items, with one
+        multi-query request per distinct limit and threshold.
+        
+        Returns:
+            list: One list of search results per item
+        """
+        groups = {}
+        for idx, (_, limit, distance_threshold) in enumerate(items):
+            groups.setdefault((limit, distance_threshold), []).append(idx)
+
+        results = [None] * len(items)
+        for (limit, distance_threshold), idxs in groups.items():
+            search_kwargs = {} if distance_threshold is None else {"distance_threshold": distance_threshold}
+            hits = self.milvus_manager.search_vectors_batch(
+                collection_name, [items[idx][0] for idx in idxs], limit, **search_kwargs
+            )
+            for idx, item_hits in zip(idxs, hits):
+                results[idx] = item_hits
+        return results
+
+    def close_search_batcher(self, collection_name):
+        """
+        Stop the search micro-batcher of a collection, e.g. once it is dropped.
+        
+        Args:
+            collection_name (str): Collection name
+        """
+        with self._batchers_lock:
+            batcher = self._search_batchers.pop(collection_name, None)
+        if batcher is not None:
+            batcher.close()
+
+    def search(self, query, collection_name, limit=3, distance_threshold=None):
         """
         Perform basic vector similarity search.
         
@@ -45,12 +164,46 @@ class QueryEngine:
             query (str): Search query
             collection_name (str): Collection to search in
             limit (int, optional): Maximum number of results. Defaults to 3
+            distance_threshold (float, optional): Let Milvus drop hits at or
+                below this similarity. Defaults to None, all hits
             
         Returns:
             list: Search results sorted by similarity
         """
         query_vector = self.embedding_manager.encode_single_text(query)
-        return self.milvus_manager.search_vectors(collection_name, query_vector, limit)
+        if self.micro_batching:
+            return self._get_search_batcher(collection_name).submit((query_vector, limit, distance_threshold))
+        if distance_threshold is None:
+            return self.milvus_manager.search_vectors(collection_name, query_vector, limit)
+        return self.milvus_manager.search_vectors(
+            collection_name, query_vector, limit, distance_threshold=distance_threshold
+        )
+
+    def search_many(self, queries, collection_name, limit=3, distance_threshold=None):
+        """
+        Perform vector similarity search for several queries at once.
+        
+        Queries are encoded in one batch and sent to Milvus as a single
+        multi-query search.
+        
+        Args:
+            queries (list): Search queries
+            collection_name (str): Collection to search in
+            limit (int, optional): Maximum number of results per query. Defaults to 3
+            distance_threshold (float, optional): Let Milvus drop hits at or
+                below this similarity. Defaults to None, all hits
+            
+        Returns:
+            list: One list of search results per query
+        """
+        if not queries:
+            return []
+        query_vectors = self.embedding_manager.encode_batch(list(queries))
+        if distance_threshold is None:
+            return self.milvus_manager.search_vectors_batch(collection_name, query_vectors, limit)
+        return self.milvus_manager.search_vectors_batch(
+            collection_name, query_vectors, limit, distance_threshold=distance_threshold
+        )
     
     def advanced_query(self, query, db_id, **kwargs):
         """
@@ -64,46 +217,113 @@ class QueryEngine:
                 - rerank_threshold: Minimum reranking score
                 - max_query_count: Maximum number of initial results
                 - top_k: Maximum number of final results
+                - range_search: Filter by distance_threshold inside Milvus,
+                  all_results then only holds hits above the threshold
+                - attach_all_files: Attach file info to all_results too,
+                  not only to results. Defaults to True
             
         Returns:
             dict: Search results including:
                 - results: Filtered and reranked results
                 - all_results: All initial results before filtering
         """
-        distance_threshold = kwargs.get("distance_threshold", self.default_distance_threshold)
-        rerank_threshold = kwargs.get("rerank_threshold", self.default_rerank_threshold)
         max_query_count = kwargs.get("max_query_count", self.default_max_query_count)
-        top_k = kwargs.get("top_k", None)
+        all_results = self.search(query, db_id, limit=max_query_count, **self._range_kwargs(kwargs))
+        return self._rank_results(query, db_id, all_results, **kwargs)
+
+    def advanced_query_many(self, queries, db_id, **kwargs):
+        """
+        Perform advanced search for several queries at once.
         
-        # Initial search
-        all_results = self.search(query, db_id, limit=max_query_count)
-        all_results = [dict(r) for r in all_results]
+        The queries are encoded and searched as one batch, then each
+        result list is filtered and reranked as in advanced_query.
         
-        # Add file information
-        for res in all_results:
-            file = self.db_manager.get_file_by_id(res["entity"]["file_id"])
-            if file:
-                res["file"] = file
+        Args:
+            queries (list): Search queries
+            db_id (str): Database to search in
+            **kwargs: Additional parameters, as for advanced_query
+            
+        Returns:
+            list: One advanced_query response per query
+        """
+        max_query_count = kwargs.get("max_query_count", self.default_max_query_count)
+        all_results = self.search_many(queries, db_id, limit=max_query_count, **self._range_kwargs(kwargs))
+        return [
+            self._rank_results(query, db_id, results, **kwargs)
+            for query, results in zip(queries, all_results)
+        ]
+
+    def _range_kwargs(self, kwargs):
+        """Search arguments pushing the distance threshold into Milvus when range_search is set."""
+        if not kwargs.get("range_search"):
+            return {}
+        return {"distance_threshold": kwargs.get("distance_threshold", self.default_distance_threshold)}
+
+    def _rank_results(self, query, db_id, all_results, **kwargs):
+        """
+        Attach files to search hits, filter them and rerank them.
         
-        # Filter by distance threshold
-        filtered_results = [r for r in all_results if r["distance"] > distance_threshold]
+        Args:
+            query (str): Search query
+            db_id (str): Database the hits come from
+            all_results (list): Search hits for the query
+            **kwargs: Additional parameters, as for advanced_query
+            
+        Returns:
+            dict: Search results, as returned by advanced_query
+        """
+        distance_threshold = kwargs.get("distance_threshold", self.default_distance_threshold)
+        rerank_threshold = kwargs.get("rerank_threshold", self.default_rerank_threshold)
+        top_k = kwargs.get("top_k", None)
+
+        # MilvusClient hits are usually plain dicts already, only other hit
+        # types (e.g. pymilvus Hit) are converted for serialization
+        all_results = [r if type(r) is dict else dict(r) for r in all_results]
+        
+        # Filter by distance threshold, also after a range search since
+        # Milvus skips the range filter on refined and int8 searches
+        rerank = self.agent_config.enable_rerank and self.embedding_manager.reranker
+        if len(all_results) > FILTER_KERNEL_MIN_HITS:
+            # Without rerank the search order is final, so the scan stops at top_k
+            k = top_k if top_k and not rerank else len(all_results)
+            dist = np.fromiter((r["distance"] for r in all_results), dtype=np.float64, count=len(all_results))
+            filtered_results = [all_results[i] for i in filter_topk(dist, distance_threshold, k)]
+        else:
+            filtered_results = [r for r in all_results if r["distance"] > distance_threshold]
         
         # Apply reranking if enabled
-        if self.agent_config.enable_rerank and len(filtered_results) > 0 and self.embedding_manager.reranker:
-            texts = [r["entity"]["text"] for r in filtered_results]
-            rerank_scores = self.embedding_manager.compute_rerank_scores(query, texts)
+        if rerank and filtered_results:
+            # Retries and follow-ups often hit the same candidates seconds later
+            ids = tuple(r.get("id") for r in filtered_results)
+            cache_key = (db_id, query, ids) if None not in ids else None
+            rerank_scores = _RERANK_CACHE.get(cache_key) if cache_key else None
+            if rerank_scores is None:
+                texts = [r["entity"]["text"] for r in filtered_results]
+                rerank_scores = self.embedding_manager.compute_rerank_scores(query, texts)
+                if cache_key:
+                    _RERANK_CACHE.set(cache_key, rerank_scores)
             
-            for i, r in enumerate(filtered_results):
-                r["rerank_score"] = rerank_scores[i]
-            
-            filtered_results.sort(key=lambda x: x["rerank_score"], reverse=True)
-            filtered_results = [res for res in filtered_results 
-                              if res["rerank_score"] > rerank_threshold]
+            for r, score in zip(filtered_results, rerank_scores):
+                r["rerank_score"] = score
+
+            # Sort and threshold in one pass, ties keep search order
+            scores = np.asarray(rerank_scores, dtype=np.float32)
+            order = np.argsort(-scores, kind="stable")
+            filtered_results = [filtered_results[i] for i in order[scores[order] > rerank_threshold]]
         
         # Apply top_k limit
         if top_k:
             filtered_results = filtered_results[:top_k]
         
+        # Add file information, all files fetched in one lookup. Hits are
+        # shared between both lists, so only the returned ones need files
+        attached = all_results if kwargs.get("attach_all_files", True) else filtered_results
+        files = self.db_manager.get_files_by_ids({res["entity"]["file_id"] for res in attached})
+        for res in attached:
+            file = files.get(res["entity"]["file_id"])
+            if file:
+                res["file"] = file
+        
         return {
             "results": filtered_results,
             "all_results": all_results,
@@ -122,17 +342,39 @@ class QueryEngine:
                 - top_k: Maximum number of final results
             
         Returns:
-            callable: Function that takes a query string and returns search results
+            callable: Function that takes a query string and returns search results.
+                Its ``batch`` attribute takes a list of queries, searches them in
+                one request and returns one result list per query
         """
         retriever_params = {
             "distance_threshold": params.get("distance_threshold", self.default_distance_threshold),
             "rerank_threshold": params.get("rerank_threshold", self.default_rerank_threshold),
             "max_query_count": params.get("max_query_count", self.default_max_query_count),
             "top_k": params.get("top_k", 10),
+            # Retrievers only return the filtered results
+            "range_search": True,
+            "attach_all_files": False,
         }
         
+        # Resolved once, the single-query path then only encodes, searches and ranks
+        encode = self.embedding_manager.encode_single_text
+        if self.micro_batching:
+            batcher = self._get_search_batcher(db_id)
+            limit, distance_threshold = retriever_params["max_query_count"], retriever_params["distance_threshold"]
+            search = lambda query_vector: batcher.submit((query_vector, limit, distance_threshold))
+        else:
+            search = partial(
+                self.milvus_manager.search_vectors, db_id, limit=retriever_params["max_query_count"],
+                distance_threshold=retriever_params["distance_threshold"]
+            )
+        rank = partial(self._rank_results, db_id=db_id, **retriever_params)
+
         def retriever(query):
-            response = self.advanced_query(query, db_id, **retriever_params)
-            return response["results"]
-        
+            return rank(query, all_results=search(encode(query)))["results"]
+
+        def retriever_batch(queries):
+            responses = self.advanced_query_many(queries, db_id, **retriever_params)
+            return [response["results"] for response in responses]
+
+        retriever.batch = retriever_batch
         return retriever
@@ -1,17 +1,53 @@
 """Handles model selection and initialization."""
 import os
+import threading
 import traceback
 from ai_engine.configs.agent import AgentConfig
 from ai_engine.utils.logging import logger
 from ai_engine.models.chat_model import OpenAIBase, OpenModel, CustomModel, OllamaModel
 
 
+def _build_default(model_name, model_info):
+    """Other providers, served through an OpenAI-compatible endpoint."""
+    return OpenAIBase(
+        api_key=os.getenv(model_info["env"][0]),
+        base_url=model_info["base_url"],
+        model_name=model_name,
+    )
+
+
+# Model constructors by provider, each taking (model_name, model_info)
+_PROVIDERS = {
+    "openai": lambda model_name, model_info: OpenModel(model_name),
+    "ollama": lambda model_name, model_info: OllamaModel(model_name, model_info.get("list_models", [])),
+    "custom": lambda model_name, model_info: CustomModel(model_info),
+}
+
+# Environment variables the constructors read beyond the `env` list of the config
+_PROVIDER_ENV = {
+    "openai": ("OPENAI_API_KEY", "OPENAI_API_BASE"),
+    "ollama": ("OLLAMA_API_URL",),
+}
+
+# Models hold no per-request state, so one instance per provider, name and
+# settings is shared by all requests
+_MODEL_CACHE = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def _env_values(model_provider, model_info):
+    """Current values of the environment variables a model is built from"""
+    names = list(model_info.get("env", [])) if isinstance(model_info, dict) else []
+    names += _PROVIDER_ENV.get(model_provider, ())
+    return tuple(os.getenv(name) for name in names)
+
+
 def select_model(model_provider=None, model_name=None):
     """Select model based on model provider"""
     config = AgentConfig()
     model_info = []
     if hasattr(config, "models"):
-        
+
         model_provider = model_provider or config.provider
         model_info = config.models.get(model_provider, {})
         model_name = model_name or config.model or model_info.get("default", "")
@@ -21,27 +57,27 @@ def select_model(model_provider=None, model_name=None):
     if model_provider is None:
         raise ValueError("Model provider not specified, please modify `model_provider` in `src/config/base.yaml`")
 
-    if model_provider == "openai":
-        return OpenModel(model_name)
-    
-    if model_provider == "ollama":
-        return OllamaModel(model_name, model_info.get("list_models", []))
-
-    if model_provider == "custom":
-        if hasattr(config, "custom_models"):
-            model_info = next((x for x in config.custom_models if x["custom_id"] == model_name), None)
-            if model_info is None:
-                raise ValueError(f"Model {model_name} not found in custom models")
-
-        return CustomModel(model_info)
-
-    # Other models, use OpenAIBase by default
-    try:
-        model = OpenAIBase(
-            api_key=os.getenv(model_info["env"][0]),
-            base_url=model_info["base_url"],
-            model_name=model_name,
-        )
+    if model_provider == "custom" and hasattr(config, "custom_models"):
+        model_info = next((x for x in config.custom_models if x["custom_id"] == model_name), None)
+        if model_info is None:
+            raise ValueError(f"Model {model_name} not found in custom models")
+
+    # Settings and their environment values are part of the key, so edited
+    # provider configs and rotated API keys build a new model
+    key = (model_provider, model_name, repr(model_info), _env_values(model_provider, model_info))
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(key)
+        if model is not None:
+            return model
+
+        build = _PROVIDERS.get(model_provider)
+        if build is not None:
+            model = build(model_name, model_info)
+        else:
+            try:
+                model = _build_default(model_name, model_info)
+            except Exception as e:
+                raise ValueError("Model provider %s load failed, %s \n %s" % (model_provider, e, traceback.format_exc()))
+
+        _MODEL_CACHE[key] = model
         return model
-    except Exception as e:
-        raise ValueError("Model provider %s load failed, %s \n %s" % (model_provider, e, traceback.format_exc()))
@@ -1,11 +1,133 @@
 """Handles interactions with OpenAI-compatible chat models."""
+import asyncio
 import os
+import threading
+import time
+import weakref
+import httpx
 import requests
-from openai import OpenAI
+from requests.adapters import HTTPAdapter
+from openai import AsyncOpenAI, OpenAI
 from langchain_openai import ChatOpenAI
 from ai_engine.utils import logger, get_docker_safe_url
 
 
+# Clients shared by all model instances of an endpoint, so their connection
+# pools are reused instead of being rebuilt on every select_model call
+_CLIENT_CACHE = {}
+_LC_CACHE = {}
+# Async clients per event loop, an httpx.AsyncClient's connections belong to the
+# loop they were opened on; a loop's clients are dropped along with the loop
+_ASYNC_CLIENT_CACHE = weakref.WeakKeyDictionary()
+_CLIENT_LOCK = threading.Lock()
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# Streamed deltas are merged until this many are pending or this much time has
+# passed, so consumers serialize and send one chunk per group instead of per token
+STREAM_BATCH_SIZE = 8
+STREAM_BATCH_MS = 50
+
+# Keep-alive session for the plain HTTP calls to providers and Ollama
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+
+def _get_clients(api_key, base_url, model_name):
+    """
+    Returns the pooled OpenAI client of (api_key, base_url) and the pooled ChatOpenAI of
+    (model_name, api_key, base_url), creating them on first use. Both share one httpx.Client.
+    """
+    with _CLIENT_LOCK:
+        cached = _CLIENT_CACHE.get((api_key, base_url))
+        if cached is None:
+            http_client = httpx.Client(limits=HTTP_LIMITS)
+            cached = (OpenAI(api_key=api_key, base_url=base_url, http_client=http_client), http_client)
+            _CLIENT_CACHE[(api_key, base_url)] = cached
+        client, http_client = cached
+
+        chat_open_ai = _LC_CACHE.get((model_name, api_key, base_url))
+        if chat_open_ai is None:
+            chat_open_ai = ChatOpenAI(
+                model=model_name,
+                api_key=api_key,
+                base_url=base_url,
+                http_client=http_client
+            )
+            _LC_CACHE[(model_name, api_key, base_url)] = chat_open_ai
+        return client, chat_open_ai
+
+
+def _get_async_client(api_key, base_url):
+    """
+    Returns the pooled AsyncOpenAI client of (api_key, base_url) on the running event loop,
+    creating it on first use. Must be called from a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    with _CLIENT_LOCK:
+        clients = _ASYNC_CLIENT_CACHE.setdefault(loop, {})
+        client = clients.get((api_key, base_url))
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=httpx.AsyncClient(limits=HTTP_LIMITS)
+            )
+            clients[(api_key, base_url)] = client
+        return client
+
+
+class _DeltaBuffer:
+    """
+    Merges consecutive streamed deltas of the same kind (answer content or reasoning content).
+    Deltas carrying anything else (roles, tool calls, full replacements) pass through unmerged.
+    """
+    def __init__(self, max_items=STREAM_BATCH_SIZE, max_ms=STREAM_BATCH_MS):
+        self.max_items = max_items
+        self.max_wait = max_ms / 1000
+        self.pending = []
+        self.kind = None
+        self.started = 0.0
+
+    @staticmethod
+    def _kind(delta):
+        if getattr(delta, "tool_calls", None) or getattr(delta, "is_full", False):
+            return None
+        if delta.content:
+            return "content"
+        if getattr(delta, "reasoning_content", None):
+            return "reasoning_content"
+        return None
+
+    def add(self, delta, final=False):
+        """Buffers delta, returning the deltas that are due to be yielded."""
+        kind = self._kind(delta) if self.max_items > 1 else None
+        out = []
+        if self.pending and kind != self.kind:
+            out.extend(self.flush())
+        if kind is None:
+            out.append(delta)
+            return out
+
+        if not self.pending:
+            self.kind = kind
+            self.started = time.monotonic()
+        self.pending.append(delta)
+        if final or len(self.pending) >= self.max_items or time.monotonic() - self.started >= self.max_wait:
+            out.extend(self.flush())
+        return out
+
+    def flush(self):
+        """Returns the pending deltas merged into one, if any."""
+        if not self.pending:
+            return []
+        pending, self.pending = self.pending, []
+        if len(pending) == 1:
+            return pending
+        text = "".join(getattr(d, self.kind) or "" for d in pending)
+        return [pending[0].model_copy(update={self.kind: text})]
+
+
 class OpenAIBase:
     """Base class for interacting with OpenAI-compatible chat models."""
     def __init__(self, api_key, base_url, model_name, **options):
@@ -21,14 +143,15 @@ class OpenAIBase:
         self.api_key = api_key
         self.base_url = base_url
         self.model_name = model_name
-        self.llm_client = OpenAI(api_key=api_key, base_url=base_url)
         self.model_config = options
+        self.stream_batch_size = options.get("stream_batch_size", STREAM_BATCH_SIZE)
+        self.stream_batch_ms = options.get("stream_batch_ms", STREAM_BATCH_MS)
+        self.llm_client, self.chat_open_ai = _get_clients(api_key, base_url, model_name)
 
-        self.chat_open_ai = ChatOpenAI(
-            model=model_name,
-            api_key=api_key,
-            base_url=base_url
-        )
+    @property
+    def async_client(self):
+        """The pooled AsyncOpenAI client of this endpoint on the running event loop, created on first async call."""
+        return _get_async_client(self.api_key, self.base_url)
 
     def generate_response(self, prompt_payload, use_streaming=False):
         """
@@ -46,6 +169,22 @@ class OpenAIBase:
 
         return self._handle_stream(prompt_payload) if use_streaming else self._handle_sync(prompt_payload)
 
+    def generate_response_async(self, prompt_payload, use_streaming=False):
+        """
+        Generates a response from the chat model without blocking the event loop.
+
+        Args:
+            prompt_payload (str | list[dict]): The prompt string or a list of message dictionaries.
+            use_streaming (bool, optional): Whether to use streaming for the response. Defaults to False.
+
+        Returns:
+            An async iterator of deltas if use_streaming is True, otherwise an awaitable of the message object.
+        """
+        if isinstance(prompt_payload, str):
+            prompt_payload = [{"role": "user", "content": prompt_payload}]
+
+        return self._handle_stream_async(prompt_payload) if use_streaming else self._handle_sync_async(prompt_payload)
+
     def _handle_stream(self, prompt_payload):
         """
         Handles generating a response using streaming.
@@ -54,7 +193,7 @@ class OpenAIBase:
             prompt_payload (list[dict]): The list of message dictionaries.
 
         Yields:
-            The delta of each chunk in the streamed response.
+            The deltas of the streamed response, consecutive text deltas merged in small groups.
 
         Raises:
             RuntimeError: If there is an error during streaming.
@@ -65,9 +204,12 @@ class OpenAIBase:
                 messages=prompt_payload,
                 stream=True,
             )
+            buffer = _DeltaBuffer(self.stream_batch_size, self.stream_batch_ms)
             for piece in result:
                 if piece.choices:
-                    yield piece.choices[0].delta
+                    choice = piece.choices[0]
+                    yield from buffer.add(choice.delta, final=choice.finish_reason is not None)
+            yield from buffer.flush()
         except Exception as err:
             msg = "Streaming error: %s, URL: %s, API: %s***, Model: %s" % (err, self.base_url, self.api_key[:5], self.model_name)
             logger.error(msg)
@@ -90,6 +232,55 @@ class OpenAIBase:
         )
         return result.choices[0].message
 
+    async def _handle_stream_async(self, prompt_payload):
+        """
+        Handles generating a response using streaming, on the async client.
+
+        Args:
+            prompt_payload (list[dict]): The list of message dictionaries.
+
+        Yields:
+            The deltas of the streamed response, consecutive text deltas merged in small groups.
+
+        Raises:
+            RuntimeError: If there is an error during streaming.
+        """
+        try:
+            result = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=prompt_payload,
+                stream=True,
+            )
+            buffer = _DeltaBuffer(self.stream_batch_size, self.stream_batch_ms)
+            async for piece in result:
+                if piece.choices:
+                    choice = piece.choices[0]
+                    for delta in buffer.add(choice.delta, final=choice.finish_reason is not None):
+                        yield delta
+            for delta in buffer.flush():
+                yield delta
+        except Exception as err:
+            msg = "Streaming error: %s, URL: %s, API: %s***, Model: %s" % (err, self.base_url, self.api_key[:5], self.model_name)
+            logger.error(msg)
+            raise RuntimeError(msg)
+
+    async def _handle_sync_async(self, prompt_payload):
+        """
+        Handles generating a non-streaming response, on the async client.
+
+        Args:
+            prompt_payload (list[dict]): The list of message dictionaries.
+
+        Returns:
+            The message object from the model's response.
+        """
+        result = await self.async_client.chat.completions.create(
+            model=self.model_name,
+            messages=prompt_payload,
+            stream=False,
+        )
+        return result.choices[0].message
+
     def list_available_models(self):
         """
         Lists available text models from the provider.
@@ -117,7 +308,7 @@ class OpenAIBase:
             "accept": "application/json",
             "authorization": f"Bearer {self.api_key}"
         }
-        response = requests.get(model_url, headers=headers, timeout=10)
+        response = _SESSION.get(model_url, headers=headers, timeout=10)
         return response.json()
 
 
@@ -197,7 +388,7 @@ class OllamaModel(OpenAIBase):
         try:
             # Remove /v1 from base_url for health check
             health_url = self.base_url.replace("/v1", "")
-            response = requests.get(f"{health_url}/api/tags", timeout=5)
+            response = _SESSION.get(f"{health_url}/api/tags", timeout=5)
             return response.status_code == 200
         except Exception as err:
             logger.warning("Ollama connection check failed: %s", err)
@@ -221,7 +412,7 @@ class OllamaModel(OpenAIBase):
             pull_url = self.base_url.replace("/v1", "/api/pull")
             
             payload = {"name": target_model}
-            response = requests.post(pull_url, json=payload, timeout=300)
+            response = _SESSION.post(pull_url, json=payload, timeout=300)
             
             if response.status_code == 200:
                 logger.info("Model %s pulled successfully", target_model)
@@ -258,7 +449,7 @@ class OllamaModel(OpenAIBase):
             delete_url = self.base_url.replace("/v1", "/api/delete")
             
             payload = {"name": model_name}
-            response = requests.delete(delete_url, json=payload, timeout=30)
+            response = _SESSION.delete(delete_url, json=payload, timeout=30)
             
             if response.status_code == 200:
                 logger.info("Model %s deleted successfully", model_name)
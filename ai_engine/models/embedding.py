@@ -1,11 +1,58 @@
 """Handles embedding model interactions, supporting local, Ollama, and other remote services."""
 import os
 import json
+import queue
+import random
 import asyncio
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from FlagEmbedding import FlagModel
 
-from ai_engine.utils import hashstr, logger, get_docker_safe_url
+from ai_engine.utils import logger, get_docker_safe_url, json_dumps, json_loads
+from ai_engine.utils.kernels import normalize_rows
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+# Batch size above which post-processing runs in the compiled kernels,
+# smaller batches are cheaper in NumPy than a parallel dispatch
+KERNEL_MIN_ROWS = 64
+
+# Embedding a large batch can take minutes on CPU, connecting should not
+OLLAMA_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+OLLAMA_LIMITS = httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0)
+API_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=30.0)
+API_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _json_body(payload):
+    """Request body of an embedding call, serialized with orjson when available."""
+    return json_dumps(payload).encode("utf-8")
+
+
+def _pooled_session():
+    """
+    Creates a requests.Session that keeps connections to the embedding server alive,
+    so repeated embedding calls skip the TCP (and TLS) handshake.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=32, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 class BaseEmbeddingModel:
@@ -13,29 +60,44 @@ class BaseEmbeddingModel:
     Base class for embedding models, providing a common interface and utility methods.
 
     Attributes:
-        status_tracker (dict): A dictionary to track the progress of batch embedding operations.
+        status_tracker (OrderedDict): Progress of this model's batch embedding operations,
+                                      keeping the latest `status_tracker_size` of them.
+        dimension (int | None): Embedding dimension from the model's configuration, set in __init__.
+        max_in_flight (int): Batches embedded concurrently, above 1 for remote providers
+                             where each batch is mostly waiting on the network.
+        prefetch (bool): Prepare (tokenize) the next batch on a thread while one is embedded.
+        query_cache_size (int): Query embeddings kept by `vectorize_queries`.
+        network_bound (bool): Inference is an HTTP call with a native `arun_inference`, so the
+                              async methods await it instead of blocking a worker thread.
+        max_tokens_per_batch (int): Padded tokens per batch of `batch_vectorize`, which
+                                    ends a batch early once its texts would exceed it.
     """
-    status_tracker = {}
+    dimension = None
+    max_in_flight = 1
+    prefetch = False
+    max_tokens_per_batch = 16384
+    network_bound = False
+    _inference_executor = None
+    query_cache_size = 4096
+    status_tracker_size = 1000
+
+    def __init__(self):
+        """Sets up the per-model status tracker and query embedding cache, subclasses call this from their own __init__."""
+        self.status_tracker = OrderedDict()
+        self._status_lock = threading.Lock()
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
 
     def get_dimension(self):
         """
         Retrieves the embedding dimension for the model.
 
-        It first checks for a 'dimension' attribute on the instance,
-        then in the model configuration based on 'embed_model_fullname',
-        and finally based on 'model'.
+        Every model resolves its dimension from its configuration once, in __init__.
 
         Returns:
-            int or None: The embedding dimension if found, otherwise None.
+            int or None: The embedding dimension if configured, otherwise None.
         """
-        if hasattr(self, "dimension"):
-            return self.dimension
-
-        if hasattr(self, "embed_model_fullname"):
-            return self.config.embed_model_names[self.embed_model_fullname].get("dimension", None)
-        if hasattr(self, "model"):
-            return self.config.embed_model[self.model].get("dimension", None)
-        return None
+        return self.dimension
 
     def vectorize(self, input_data):
         """
@@ -53,15 +115,60 @@ class BaseEmbeddingModel:
     def vectorize_queries(self, queries):
         """
         Generates embeddings specifically for query-like input data.
-        By default, this calls the standard vectorize method.
+        Repeated queries are served from an LRU cache of this model, only the
+        others (each once) are embedded with the standard inference.
 
         Args:
             queries (str | list[str]): The input query or list of queries to embed.
 
         Returns:
-            list: A list of embeddings.
+            list: A list of read-only float32 embeddings.
+        """
+        if isinstance(queries, str):
+            queries = [queries]
+
+        found, missing = self._cached_queries(queries)
+        if missing:
+            self._cache_queries(missing, self.run_inference(missing), found)
+        return [found[text] for text in queries]
+
+    def _cached_queries(self, queries):
+        """
+        Looks queries up in the query cache.
+
+        Returns:
+            tuple: (dict of cached query -> embedding, list of distinct queries to embed)
         """
-        return self.run_inference(queries)
+        cache = self._query_cache
+        with self._query_cache_lock:
+            found = {}
+            for text in queries:
+                vector = cache.get(text)
+                if vector is not None:
+                    cache.move_to_end(text)
+                    found[text] = vector
+
+        missing = [text for text in dict.fromkeys(queries) if text not in found]
+        return found, missing
+
+    def _cache_queries(self, missing, vectors, found):
+        """Adds the embeddings of missing queries to the query cache and to found."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        cache = self._query_cache
+        with self._query_cache_lock:
+            for text, vector in zip(missing, vectors):
+                # Copied so a cached row does not keep its whole batch alive
+                vector = vector.copy()
+                vector.setflags(write=False)
+                found[text] = cache[text] = vector
+            while len(cache) > self.query_cache_size:
+                cache.popitem(last=False)
+
+    async def _run_blocking(self, func, *args):
+        """Runs a blocking method off the event loop, on this model's own executor when it has one."""
+        if self._inference_executor is None:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._inference_executor, func, *args)
 
     async def avectorize(self, input_data):
         """
@@ -73,7 +180,9 @@ class BaseEmbeddingModel:
         Returns:
             list: A list of embeddings.
         """
-        return await asyncio.to_thread(self.vectorize, input_data)
+        if self.network_bound:
+            return await self.arun_inference(input_data)
+        return await self._run_blocking(self.vectorize, input_data)
 
     async def avectorize_queries(self, queries):
         """
@@ -85,12 +194,22 @@ class BaseEmbeddingModel:
         Returns:
             list: A list of embeddings.
         """
-        return await asyncio.to_thread(self.vectorize_queries, queries)
+        if not self.network_bound:
+            return await self._run_blocking(self.vectorize_queries, queries)
+
+        if isinstance(queries, str):
+            queries = [queries]
+        found, missing = self._cached_queries(queries)
+        if missing:
+            self._cache_queries(missing, await self.arun_inference(missing), found)
+        return [found[text] for text in queries]
 
     async def abatch_vectorize(self, items, batch_limit=20):
         """
         Asynchronously generates embeddings for a list of items in batches.
 
+        Network-bound models keep up to `max_in_flight` requests pending on the event loop.
+
         Args:
             items (list[str]): A list of texts to embed.
             batch_limit (int, optional): The maximum number of items to process in a single batch.
@@ -99,53 +218,255 @@ class BaseEmbeddingModel:
         Returns:
             list: A list of embeddings for all items.
         """
-        return await asyncio.to_thread(self.batch_vectorize, items, batch_limit)
+        if self.network_bound:
+            return await self.abatch_vectorize_concurrent(items, batch_limit, self.max_in_flight)
+        return await self._run_blocking(self.batch_vectorize, items, batch_limit)
+
+    async def abatch_vectorize_concurrent(self, items, batch_limit=20, max_in_flight=5):
+        """
+        Asynchronously generates embeddings for a list of items, with up to max_in_flight batches pending at once.
+
+        Each request but the first waits a random 0-50 ms, so a burst of batches does not hit
+        a rate-limited API at the same instant. Batches are packed from the items in order
+        of length, as in `batch_vectorize`.
+
+        Args:
+            items (list[str]): A list of texts to embed.
+            batch_limit (int, optional): The maximum number of items to process in a single batch.
+                                         Defaults to 20.
+            max_in_flight (int, optional): The maximum number of concurrent batches. Defaults to 5.
+
+        Returns:
+            list: A list of embeddings for all items, in input order.
+        """
+        semaphore = asyncio.Semaphore(max_in_flight)
+        order = sorted(range(len(items)), key=lambda i: len(items[i]))
+        starts, segments = self._pack_batches([items[i] for i in order], batch_limit)
+
+        async def embed(idx, segment):
+            async with semaphore:
+                if idx:
+                    await asyncio.sleep(random.uniform(0, 0.05))
+                return await self.arun_inference(segment)
+
+        batches = await asyncio.gather(*(embed(idx, segment) for idx, segment in zip(starts, segments)))
+        result = [None] * len(items)
+        for i, vector in zip(order, (vector for vectors in batches for vector in vectors)):
+            result[i] = vector
+        return result
+
+    def _vectorize_segment(self, idx, segment):
+        """Embeds one batch of batch_vectorize, staggering concurrent requests by up to 50 ms."""
+        if idx and self.max_in_flight > 1:
+            time.sleep(random.uniform(0, 0.05))
+        logger.debug("Encoding items %d to %d", idx, idx + len(segment))
+        vectors = self.vectorize(segment)
+        logger.debug("Vector count: %d, Segment size: %d, Dim: %d", len(vectors), len(segment), len(vectors[0]))
+        return vectors
+
+    @staticmethod
+    def _postprocess(arr, normalize=True):
+        """
+        Converts a batch of embeddings to a C-contiguous float32 array, L2-normalizing its rows in place.
+
+        Norms come from one fused einsum pass instead of a squared temporary, or from the
+        compiled kernel for batches over 64 rows; zero rows are left as-is.
+
+        Args:
+            arr (array-like): (N, dim) embeddings.
+            normalize (bool, optional): Whether to L2-normalize the rows. Defaults to True.
+
+        Returns:
+            np.ndarray: (N, dim) float32 array.
+        """
+        arr = np.require(arr, dtype=np.float32, requirements=["C", "W"])
+        if normalize and arr.size:
+            if arr.ndim == 2 and arr.shape[0] > KERNEL_MIN_ROWS:
+                return normalize_rows(arr, out=arr)
+            norms = np.sqrt(np.einsum("ij,ij->i", arr, arr))[:, None]
+            np.divide(arr, norms, out=arr, where=norms > 0)
+        return arr
+
+    def _prepare_segment(self, segment):
+        """Model-side preprocessing of one batch (e.g. tokenization), run ahead on the prefetch thread."""
+        return segment
+
+    def _embed_prepared(self, segment, prepared):
+        """Embeds one batch from the output of `_prepare_segment`."""
+        return self.vectorize(segment)
+
+    def _token_counts(self, items):
+        """Approximate token count of each text, about 4 characters per token."""
+        return [len(text) // 4 + 1 for text in items]
+
+    def _pack_batches(self, items, batch_limit):
+        """
+        Splits items into consecutive batches of at most batch_limit texts, ending a batch
+        early when padding it to its longest text would exceed `max_tokens_per_batch` tokens.
+
+        Many short texts share a batch while long ones go a few at a time, so batches
+        cost about the same instead of a fixed count of long texts stalling the model.
+
+        Returns:
+            tuple: (list of batch start indices, list of batches)
+        """
+        starts, segments = [], []
+        start, longest = 0, 0
+        for idx, tokens in enumerate(self._token_counts(items)):
+            longest = max(longest, tokens)
+            size = idx - start
+            if size and (size >= batch_limit or (size + 1) * longest > self.max_tokens_per_batch):
+                starts.append(start)
+                segments.append(items[start:idx])
+                start, longest = idx, tokens
+        if start < len(items):
+            starts.append(start)
+            segments.append(items[start:])
+        return starts, segments
+
+    def _vectorize_prefetched(self, starts, segments):
+        """
+        Embeds batches in order while a thread prepares the next two, so the model does not wait
+        on tokenization between batches.
+
+        Yields:
+            The embeddings of each batch, in order.
+        """
+        prepared = queue.Queue(maxsize=2)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    prepared.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for segment in segments:
+                    if not put((segment, self._prepare_segment(segment), None)):
+                        return
+            except Exception as e:
+                put((None, None, e))
 
-    def batch_vectorize(self, items, batch_limit=20):
+        threading.Thread(target=produce, name="embed-prefetch", daemon=True).start()
+        try:
+            for idx in starts:
+                segment, inputs, error = prepared.get()
+                if error is not None:
+                    raise error
+                logger.debug("Encoding items %d to %d", idx, idx + len(segment))
+                yield self._embed_prepared(segment, inputs)
+        finally:
+            stop.set()
+
+    def batch_vectorize(self, items, batch_limit=20, out=None):
         """
         Generates embeddings for a list of items in batches.
 
         Logs progress if the number of items exceeds the batch_limit and updates
-        the `status_tracker`.
+        the `status_tracker`. Items are batched in order of length and up to
+        `max_in_flight` batches are embedded concurrently; results keep input order.
+
+        When the dimension is known, every batch is written straight into its rows
+        of one (len(items), dimension) float32 array, so batches are never joined
+        or reordered in extra copies. Call `.tolist()` on it where nested lists are needed.
 
         Args:
             items (list[str]): A list of texts to embed.
             batch_limit (int, optional): The maximum number of items to process in a single batch.
                                          Defaults to 20.
+            out (np.ndarray, optional): (len(items), dimension) float32 array to fill,
+                                        allocated when omitted and the dimension is known.
 
         Returns:
-            list: A list of embeddings for all items.
+            np.ndarray | list: out, or a list of embeddings when the dimension is unknown.
         """
         logger.info("Processing vectorization in batches: total %d items", len(items))
-        result = []
 
         if len(items) > batch_limit:
-            task_tag = hashstr(items)
-            self.status_tracker[task_tag] = {
-                'status': 'in-progress',
-                'total': len(items),
-                'progress': 0
-            }
-
-        for idx in range(0, len(items), batch_limit):
-            segment = items[idx:idx + batch_limit]
-            logger.info("Encoding items %d to %d", idx, idx + batch_limit)
-            vectors = self.vectorize(segment)
-            logger.debug("Vector count: %d, Segment size: %d, Dim: %d", len(vectors), len(segment), len(vectors[0]))
-            result.extend(vectors)
+            task_tag = uuid.uuid4().hex
+            with self._status_lock:
+                self.status_tracker[task_tag] = {
+                    'status': 'in-progress',
+                    'total': len(items),
+                    'progress': 0
+                }
+                while len(self.status_tracker) > self.status_tracker_size:
+                    self.status_tracker.popitem(last=False)
+
+        # Batches of similar lengths are padded to similar lengths, so short
+        # texts do not pay for the longest text of an arrival-order batch
+        order = sorted(range(len(items)), key=lambda i: len(items[i])) if len(items) > batch_limit else None
+        sorted_items = [items[i] for i in order] if order else items
+
+        if out is None and self.dimension:
+            out = np.empty((len(items), self.dimension), dtype=np.float32)
+        positions = np.asarray(order) if order else None
+
+        starts, segments = self._pack_batches(sorted_items, batch_limit)
+        executor = None
+        if self.max_in_flight > 1 and len(segments) > 1:
+            executor = ThreadPoolExecutor(min(self.max_in_flight, len(segments)))
+            batches = executor.map(self._vectorize_segment, starts, segments)
+        elif self.prefetch and len(segments) > 1:
+            batches = self._vectorize_prefetched(starts, segments)
+        else:
+            batches = map(self._vectorize_segment, starts, segments)
+
+        result = []
+        try:
+            for idx, vectors in zip(starts, batches):
+                if out is None:
+                    result.extend(vectors)
+                    continue
+                # Rows go to their input positions, undoing the length sort as they land
+                rows = slice(idx, idx + len(vectors)) if positions is None else positions[idx:idx + len(vectors)]
+                out[rows] = vectors
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        if out is not None:
+            result = out
+        elif order:
+            unsorted = [None] * len(items)
+            for pos, i in enumerate(order):
+                unsorted[i] = result[pos]
+            result = unsorted
 
         if len(items) > batch_limit:
-            self.status_tracker[task_tag]['progress'] = len(items)
-            self.status_tracker[task_tag]['status'] = 'completed'
+            with self._status_lock:
+                status = self.status_tracker.get(task_tag)
+                if status is not None:
+                    status['progress'] = len(items)
+                    status['status'] = 'completed'
 
         return result
     
     def run_inference(self, input_data: list[str] | str):
         pass
 
+    async def arun_inference(self, input_data):
+        """
+        Asynchronously generates embeddings, on a worker thread unless a subclass has an async client.
+
+        Args:
+            input_data (str | list[str]): The input text or list of texts to embed.
+
+        Returns:
+            list: A list of embeddings.
+        """
+        return await self._run_blocking(self.run_inference, input_data)
+
 
 class LocalEmbeddingModel(FlagModel, BaseEmbeddingModel):
     """Embedding model that loads and runs models locally using FlagEmbedding."""
+    prefetch = True
+    token_cache_size = 20000
     def __init__(self, config, **kwargs):
         """
         Initializes a local embedding model using FlagEmbedding.
@@ -159,47 +480,262 @@ class LocalEmbeddingModel(FlagModel, BaseEmbeddingModel):
             config: The application configuration object.
             **kwargs: Additional keyword arguments passed to the FlagModel constructor.
         """
+        BaseEmbeddingModel.__init__(self)
+        self._token_cache = OrderedDict()
+        self._token_cache_lock = threading.Lock()
+        self.max_tokens_per_batch = config.embed_model_names[config.embed_model].get("max_tokens_per_batch", self.max_tokens_per_batch)
+        # Async calls run one at a time on their own thread, so concurrent
+        # requests queue for the model instead of contending for the device
+        self._inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-local")
         model_meta = config.embed_model_names[config.embed_model]
         self.config = config
 
-        self.model = config.model_local_paths.get(model_meta["name"], model_meta.get("local_path"))
-        self.model = self.model or model_meta["name"]
+        self.model = _local_embedding_path(config, model_meta)
         self.dimension = model_meta["dimension"]
         self.embed_model_fullname = config.embed_model
 
-        if os.getenv("MODEL_DIR"):
-            potential_path = os.path.join(os.getenv("MODEL_DIR"), self.model)
-            if os.path.exists(potential_path):
-                self.model = potential_path
-            else:
-                logger.warning("Model `%s` not found at `%s`, using fallback `%s`", model_meta['name'], self.model, model_meta['name'])
-
         logger.info("Initializing local embedding model `%s` from `%s` on `%s`", model_meta['name'], self.model, config.device)
 
+        # Tensor cores run half precision at twice the fp32 rate, at half the memory traffic
+        use_fp16 = config.device == "cuda" and bool(config.get("embed_fp16", True))
+
         super().__init__(
             self.model,
             query_instruction_for_retrieval=model_meta.get("query_instruction", None),
-            use_fp16=False,
+            use_fp16=use_fp16,
             device=config.device,
             **kwargs
         )
 
+        if config.get("embed_jit", False):
+            self._compile_model()
+
         logger.info("Model `%s` loaded successfully.", model_meta['name'])
 
+    def _compile_model(self, warmup_batch=8):
+        """
+        Compiles the transformer with torch.compile and runs one warmup batch, so the first
+        real request is not billed for compilation. Keeps the eager model if either step fails.
+
+        Args:
+            warmup_batch (int, optional): Texts in the warmup batch. Defaults to 8.
+        """
+        import torch
+
+        eager_model = self.model
+        try:
+            # dynamic shapes, batch and sequence lengths vary per call
+            self.model = torch.compile(eager_model, dynamic=True)
+            self.run_inference(["warmup"] * warmup_batch)
+            logger.info("Embedding model compiled with torch.compile")
+        except Exception as e:
+            self.model = eager_model
+            logger.warning("torch.compile failed for the embedding model, running eagerly: %s", e)
+
+    def _token_ids(self, texts):
+        """
+        Truncated token ids of each text, tokenizing only texts missing from the LRU token cache.
+
+        Re-indexing and evaluation runs embed the same chunks again, their tokenization is reused.
+
+        Returns:
+            list[np.ndarray]: int32 token ids per text.
+        """
+        cache = self._token_cache
+        with self._token_cache_lock:
+            found = {}
+            for text in texts:
+                ids = cache.get(text)
+                if ids is not None:
+                    cache.move_to_end(text)
+                    found[text] = ids
+
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        if missing:
+            encoded = self.tokenizer(missing, padding=False, truncation=True, max_length=self.passage_max_length)
+            with self._token_cache_lock:
+                for text, ids in zip(missing, encoded["input_ids"]):
+                    found[text] = cache[text] = np.asarray(ids, dtype=np.int32)
+                while len(cache) > self.token_cache_size:
+                    cache.popitem(last=False)
+        return [found[text] for text in texts]
+
+    def _token_counts(self, items):
+        """Exact token count of each text, the ids are cached for tokenizing its batch later."""
+        return [len(ids) for ids in self._token_ids(items)]
+
+    def _prepare_segment(self, segment):
+        """Tokenizes and right-pads a batch, into pinned memory on cuda so the device copy does not block."""
+        import torch
+
+        token_ids = self._token_ids(segment)
+        input_ids = np.full((len(token_ids), max(len(ids) for ids in token_ids)), self.tokenizer.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros(input_ids.shape, dtype=np.int64)
+        for row, ids in enumerate(token_ids):
+            input_ids[row, :len(ids)] = ids
+            attention_mask[row, :len(ids)] = 1
+
+        inputs = {"input_ids": torch.from_numpy(input_ids), "attention_mask": torch.from_numpy(attention_mask)}
+        if str(self.target_devices[0]).startswith("cuda"):
+            inputs = {name: value.pin_memory() for name, value in inputs.items()}
+        return inputs
+
+    def _embed_prepared(self, segment, prepared):
+        """Runs the transformer on a tokenized batch, pooled and normalized as FlagModel.encode does."""
+        import torch
+
+        device = self.target_devices[0]
+        if not getattr(self, "_placed", False):
+            if self.use_fp16:
+                self.model.half()
+            self.model.to(device)
+            self.model.eval()
+            self._placed = True
+
+        with torch.inference_mode():
+            inputs = {name: value.to(device, non_blocking=True) for name, value in prepared.items()}
+            hidden = self.model(**inputs, return_dict=True).last_hidden_state
+            vectors = self.pooling(hidden, inputs["attention_mask"])
+            if self.normalize_embeddings:
+                vectors = torch.nn.functional.normalize(vectors, dim=-1)
+            return vectors.float().cpu().numpy()
+
     def run_inference(self, input_data: list[str] | str):
-        """Generates embeddings using the underlying FlagModel.
+        """Generates embeddings with the underlying FlagModel's transformer, on cached tokenizations.
 
         Args:
             input_data (list[str] | str): The text or list of texts to embed.
 
         Returns:
-            list: A list of embeddings.
+            np.ndarray: A (len(input_data), dimension) float32 array, or one vector for a single text.
+        """
+        texts = [input_data] if isinstance(input_data, str) else input_data
+        vectors = np.concatenate([
+            self._embed_prepared(segment, self._prepare_segment(segment))
+            for segment in (texts[idx:idx + self.batch_size] for idx in range(0, len(texts), self.batch_size))
+        ]) if texts else np.empty((0, self.dimension), dtype=np.float32)
+        return vectors[0] if isinstance(input_data, str) else vectors
+
+
+class OnnxEmbeddingModel(BaseEmbeddingModel):
+    """
+    Local embedding model run on ONNX Runtime, from the `onnx_path` export of the model's config
+    (e.g. an optimum-cli int8/VNNI export) or an int8-quantized export built next to a local model directory on first use.
+    Runs on the CUDA provider when the device is cuda and ONNX Runtime has CUDA support, on CPU otherwise.
+    Vectors are pooled as the model's `pooling` setting says (CLS, like FlagModel, by default) and L2-normalized.
+    """
+    onnx_filename = "embedding-int8.onnx"
+    prefetch = True
+
+    def __init__(self, config, max_length=512):
         """
-        return self.encode(input_data)
+        Initializes the ONNX embedding model of `config.embed_model`.
+
+        Args:
+            config: The application configuration object.
+            max_length (int, optional): Maximum tokens per text. Defaults to 512.
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        super().__init__()
+        model_meta = config.embed_model_names[config.embed_model]
+        self.config = config
+        self.model = _local_embedding_path(config, model_meta)
+        self.dimension = model_meta["dimension"]
+        self.embed_model_fullname = config.embed_model
+        self.pooling = model_meta.get("pooling", "cls")
+
+        onnx_path = model_meta.get("onnx_path") or os.path.join(self.model, self.onnx_filename)
+        if not os.path.exists(onnx_path):
+            # The export is built from, and written next to, a local copy of the model
+            if not os.path.isdir(self.model):
+                raise ValueError(
+                    f"ONNX embedding model `{config.embed_model}` has no export at `{onnx_path}` and `{self.model}` "
+                    "is not a local model directory to export from, set `onnx_path` to an existing export"
+                )
+            export_onnx_embedding(self.model, onnx_path)
+
+        use_cuda = str(config.device).startswith("cuda") and "CUDAExecutionProvider" in ort.get_available_providers()
+        providers = ["CUDAExecutionProvider", "CPUExecutionProvider"] if use_cuda else ["CPUExecutionProvider"]
+        logger.info("Initializing ONNX embedding model `%s` from `%s` on %s", model_meta['name'], onnx_path, providers[0])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+        self.session = ort.InferenceSession(onnx_path, options, providers=providers)
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model)
+        self.max_length = max_length
+
+    def run_inference(self, input_data):
+        """
+        Generates normalized embeddings on ONNX Runtime.
+
+        Args:
+            input_data (str | list[str]): The text or list of texts to embed.
+
+        Returns:
+            np.ndarray: float32 array of shape (len(input_data), dimension).
+        """
+        if isinstance(input_data, str):
+            input_data = [input_data]
+        return self._embed_prepared(input_data, self._prepare_segment(input_data))
+
+    def _prepare_segment(self, segment):
+        """Tokenizes a batch into the session's int64 inputs."""
+        inputs = self.tokenizer(
+            segment,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        return {name: value.astype(np.int64) for name, value in inputs.items()}
+
+    def _embed_prepared(self, segment, prepared):
+        """Runs the session on a tokenized batch, then pools and normalizes."""
+        feed = {name: value for name, value in prepared.items() if name in self.input_names}
+        hidden = self.session.run(["last_hidden_state"], feed)[0]
+        if self.pooling == "mean":
+            mask = prepared["attention_mask"][..., None].astype(hidden.dtype)
+            vectors = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1)
+        else:
+            vectors = hidden[:, 0]
+        return self._postprocess(vectors)
+
+
+def export_onnx_embedding(model_path, onnx_path):
+    """
+    Exports an embedding model to ONNX and dynamically quantizes its weights to int8.
+
+    Args:
+        model_path (str): Local path of the Hugging Face model.
+        onnx_path (str): Destination of the quantized export.
+
+    Returns:
+        str: onnx_path.
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    logger.info("Exporting int8 embedding model at %s to %s", model_path, onnx_path)
+    with tempfile.TemporaryDirectory() as export_dir:
+        model = ORTModelForFeatureExtraction.from_pretrained(model_path, export=True)
+        model.save_pretrained(export_dir)
+        quantize_dynamic(os.path.join(export_dir, "model.onnx"), onnx_path, weight_type=QuantType.QInt8)
+    return onnx_path
 
 
 class OllamaEmbedding(BaseEmbeddingModel):
     """Embedding model that interacts with an Ollama API."""
+    network_bound = True
+
+    # (base_url, model) -> time.monotonic() of the last check or embed that found
+    # the model, shared so instances created per request skip the /api/tags call
+    _verified_models = {}
+    _verified_lock = threading.Lock()
+    verified_ttl = 300.0
     
     def __init__(self, config) -> None:
         """
@@ -209,6 +745,7 @@ class OllamaEmbedding(BaseEmbeddingModel):
                     to find the model details in `config.embed_model_names`.
             logger: Logger instance for logging messages
         """
+        super().__init__()
         self.meta = config.embed_models[config.embed_model]
         
         logger.info(f"Initializing Ollama embedding with config: {self.meta}")
@@ -218,12 +755,68 @@ class OllamaEmbedding(BaseEmbeddingModel):
         self.url = get_docker_safe_url(self.url)
         self.dimension = self.meta.get("dimension", None)
         self.embed_model_fullname = config.embed_model
+        # /api/embed batches server-side, so requests carry many more texts than local batches
+        self.server_batch_size = self.meta.get("server_batch_size", 256)
+        self.max_in_flight = self.meta.get("max_in_flight", 4)
+        self.max_tokens_per_batch = self.meta.get("max_tokens_per_batch", self.max_tokens_per_batch)
         
         # Base URL for other Ollama API endpoints
         self.base_url = self.url.replace("/api/embed", "")
+        self.client = httpx.Client(http2=HTTP2, headers=JSON_HEADERS, timeout=OLLAMA_TIMEOUT, limits=OLLAMA_LIMITS)
+        # One AsyncClient per event loop, its connections belong to the loop they were opened on
+        self._async_clients = weakref.WeakKeyDictionary()
         
-        # Check if model exists, if not, try to pull it
-        self._ensure_model_available()
+        # Check if model exists, if not, try to pull it. Runs in the background
+        # so startup does not wait for a download, inference waits for it instead
+        self._available = threading.Event()
+        self._availability_error = None
+        if self._recently_verified():
+            self._available.set()
+        else:
+            threading.Thread(target=self._check_availability, name="ollama-model-check", daemon=True).start()
+
+    def _recently_verified(self):
+        """Whether the model was found on this server within the last `verified_ttl` seconds."""
+        with self._verified_lock:
+            verified_at = self._verified_models.get((self.base_url, self.model))
+        return verified_at is not None and time.monotonic() - verified_at < self.verified_ttl
+
+    def _mark_verified(self):
+        """Records that the model exists on this server."""
+        with self._verified_lock:
+            self._verified_models[(self.base_url, self.model)] = time.monotonic()
+
+    def _check_availability(self):
+        """Runs `_ensure_model_available`, recording its error for the first inference."""
+        try:
+            self._ensure_model_available()
+        except Exception as e:
+            logger.error(f"Ollama embedding model unavailable: {e}")
+            self._availability_error = e
+        finally:
+            self._available.set()
+
+    def _wait_until_available(self):
+        """
+        Blocks until the model check (and pull) has finished.
+
+        Raises:
+            RuntimeError: If the model is missing and could not be pulled.
+        """
+        self._available.wait()
+        if self._availability_error is not None:
+            raise self._availability_error
+
+    @property
+    def async_client(self):
+        """The pooled httpx.AsyncClient of this model on the running event loop, created on first async call."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                http2=HTTP2, headers=JSON_HEADERS, timeout=OLLAMA_TIMEOUT, limits=OLLAMA_LIMITS
+            )
+        return client
     
     def _check_model_exists(self) -> bool:
         """
@@ -233,17 +826,17 @@ class OllamaEmbedding(BaseEmbeddingModel):
         """
         try:
             list_url = f"{self.base_url}/api/tags"
-            response = requests.get(list_url, timeout=10)
+            response = self.client.get(list_url, timeout=10)
             
             if response.status_code == 200:
                 models_data = response.json()
-                existing_models = [model['name'] for model in models_data.get('models', [])]
+                existing_models = {model['name'] for model in models_data.get('models', [])}
                 return self.model in existing_models
             else:
                 logger.warning(f"Failed to check existing models: {response.status_code}")
                 return False
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error checking if model exists: {e}")
             return False
     
@@ -260,35 +853,43 @@ class OllamaEmbedding(BaseEmbeddingModel):
             pull_url = f"{self.base_url}/api/pull"
             payload = {"name": self.model}
             
-            response = requests.post(pull_url, json=payload, timeout=300, stream=True)
-            
-            if response.status_code == 200:
+            # A large download streams for as long as it takes, only connecting is bounded
+            with self.client.stream("POST", pull_url, json=payload, timeout=httpx.Timeout(None, connect=10.0)) as response:
+                if response.status_code != 200:
+                    logger.error(f"Failed to pull model: HTTP {response.status_code}")
+                    return False
+
                 logger.info("Pulling model... Please wait.")
                 
-                # Process streaming response
+                # Process streaming response, Ollama sends thousands of progress
+                # lines so status changes are logged but progress once a second
+                last_status, last_log = None, 0.0
                 for line in response.iter_lines():
-                    if line:
-                        try:
-                            data = json.loads(line.decode('utf-8'))
-                            if 'status' in data:
-                                logger.info(f"Pull status: {data['status']}")
-                                
-                                # Check if pull is complete
-                                if data.get('status') == 'success' or 'successfully' in data.get('status', '').lower():
-                                    logger.info(f"Successfully pulled model '{self.model}'")
-                                    return True
-                        except json.JSONDecodeError:
-                            continue
+                    if not line:
+                        continue
+                    try:
+                        status = json_loads(line).get('status')
+                    except ValueError:
+                        continue
+                    if status is None:
+                        continue
+
+                    # Check if pull is complete
+                    if status == 'success' or 'successfully' in status.lower():
+                        logger.info(f"Successfully pulled model '{self.model}'")
+                        return True
+
+                    now = time.monotonic()
+                    if status != last_status or now - last_log >= 1.0:
+                        logger.info(f"Pull status: {status}")
+                        last_status, last_log = status, now
                 
                 return True
-            else:
-                logger.error(f"Failed to pull model: HTTP {response.status_code}")
-                return False
                 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error("Timeout while pulling model. The model might be large. Please try again or pull manually.")
             return False
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error pulling model: {e}")
             return False
     
@@ -296,6 +897,8 @@ class OllamaEmbedding(BaseEmbeddingModel):
         """
         Ensure the model is available, pull if necessary.
         """
+        if self._recently_verified():
+            return
         if not self._check_model_exists():
             logger.warning(f"Model '{self.model}' not found in Ollama")
             
@@ -307,74 +910,153 @@ class OllamaEmbedding(BaseEmbeddingModel):
                 raise RuntimeError(error_msg)
         else:
             logger.info(f"Model '{self.model}' is available in Ollama")
+        self._mark_verified()
     
-    def run_inference(self, input_data):
+    def batch_vectorize(self, items, batch_limit=None, out=None):
         """
-        Generates embeddings using the Ollama API.
+        Generates embeddings for a list of items in requests of `server_batch_size` texts.
+
+        Ollama batches the texts of one /api/embed request itself, so one request
+        per `server_batch_size` texts replaces a round-trip per small batch.
+
         Args:
-            input_data (Union[List[str], str]): The text or list of texts to embed.
+            items (list[str]): A list of texts to embed.
+            batch_limit (int, optional): Ignored, the request size is `server_batch_size`.
+            out (np.ndarray, optional): (len(items), dimension) float32 array to fill.
+
         Returns:
-            List[List[float]]: A list of embeddings from the Ollama API.
-        Raises:
-            RuntimeError: If the API response indicates an error or missing model.
+            np.ndarray | list: The embeddings of all items, see `BaseEmbeddingModel.batch_vectorize`.
+        """
+        return super().batch_vectorize(items, self.server_batch_size, out=out)
+
+    async def abatch_vectorize(self, items, batch_limit=None):
+        """
+        Asynchronously generates embeddings in requests of `server_batch_size` texts,
+        up to `max_in_flight` of them at once.
+
+        Args:
+            items (list[str]): A list of texts to embed.
+            batch_limit (int, optional): Ignored, the request size is `server_batch_size`.
+
+        Returns:
+            list: A list of embeddings for all items.
         """
+        return await self.abatch_vectorize_concurrent(items, self.server_batch_size, self.max_in_flight)
+
+    def _payload(self, input_data):
+        """Builds the /api/embed request body."""
         if isinstance(input_data, str):
             input_data = [input_data]
-        
-        payload = {
+        logger.debug(f"Sending embedding request for {len(input_data)} texts")
+        return {
             "model": self.model,
             "input": input_data,
         }
-        
-        try:
-            logger.debug(f"Sending embedding request for {len(input_data)} texts")
-            
-            resp = requests.post(self.url, json=payload, timeout=30)
-            
-            if resp.status_code != 200:
-                error_msg = f"Ollama API returned HTTP {resp.status_code}: {resp.text}"
-                raise RuntimeError(error_msg)
-            
-            output = resp.json()
-            
-            # Check for errors in response
-            if 'error' in output:
-                error_msg = f"Ollama embedding failed: {output['error']}"
-                
-                # Special handling for model not found error
-                if 'not found' in output['error'].lower():
-                    logger.warning("Model not found error occurred. Attempting to pull model...")
-                    
-                    if self._pull_model():
-                        # Retry the inference after pulling
-                        logger.info("Retrying embedding after model pull...")
-                        return self.run_inference(input_data)
-                    else:
-                        error_msg += f"\nPlease manually pull the model using: docker exec ollama ollama pull {self.model}"
-                
-                raise RuntimeError(error_msg)
-            
-            # Check if embeddings are present
-            if not output.get("embeddings"):
-                error_msg = f"No embeddings returned from Ollama API. Response: {output}"
-                raise RuntimeError(error_msg)
-            
-            logger.debug(f"Successfully generated {len(output['embeddings'])} embeddings")
-            
-            return output["embeddings"]
-            
-        except requests.exceptions.Timeout:
-            error_msg = "Timeout waiting for Ollama embedding response"
+
+    def _parse_response(self, resp):
+        """
+        Extracts the embeddings of an /api/embed response.
+
+        Returns:
+            np.ndarray | None: float32 embeddings, or None if Ollama reports the model as not found.
+        Raises:
+            RuntimeError: If the response is an error or holds no embeddings.
+        """
+        if resp.status_code != 200:
+            error_msg = f"Ollama API returned HTTP {resp.status_code}: {resp.text}"
             raise RuntimeError(error_msg)
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Network error while calling Ollama API: {e}"
+        
+        output = json_loads(resp.content)
+        
+        # Check for errors in response
+        if 'error' in output:
+            # Special handling for model not found error, the caller pulls and retries
+            if 'not found' in output['error'].lower():
+                logger.warning("Model not found error occurred. Attempting to pull model...")
+                return None
+            raise RuntimeError(f"Ollama embedding failed: {output['error']}")
+        
+        # Check if embeddings are present
+        if not output.get("embeddings"):
+            error_msg = f"No embeddings returned from Ollama API. Response: {output}"
             raise RuntimeError(error_msg)
+        
+        logger.debug(f"Successfully generated {len(output['embeddings'])} embeddings")
+        
+        # Normalized client-side, so inner-product (GPU) indexes rank like cosine
+        return self._postprocess(output["embeddings"])
+
+    def _missing_model_error(self):
+        """Error raised when the model is missing and could not be pulled."""
+        return RuntimeError(
+            f"Ollama embedding failed: model '{self.model}' not found"
+            f"\nPlease manually pull the model using: docker exec ollama ollama pull {self.model}"
+        )
+
+    def run_inference(self, input_data):
+        """
+        Generates embeddings using the Ollama API.
+        Args:
+            input_data (Union[List[str], str]): The text or list of texts to embed.
+        Returns:
+            np.ndarray: float32 array of shape (len(input_data), dimension).
+        Raises:
+            RuntimeError: If the API response indicates an error or missing model.
+        """
+        self._wait_until_available()
+        try:
+            embeddings = self._parse_response(self.client.post(self.url, content=_json_body(self._payload(input_data))))
+        except httpx.TimeoutException:
+            raise RuntimeError("Timeout waiting for Ollama embedding response")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Network error while calling Ollama API: {e}")
         except json.JSONDecodeError as e:
-            error_msg = f"Invalid JSON response from Ollama API: {e}"
-            raise RuntimeError(error_msg)
+            raise RuntimeError(f"Invalid JSON response from Ollama API: {e}")
+
+        if embeddings is None:
+            if not self._pull_model():
+                raise self._missing_model_error()
+            # Retry the inference after pulling
+            logger.info("Retrying embedding after model pull...")
+            return self.run_inference(input_data)
+        self._mark_verified()
+        return embeddings
+
+    async def arun_inference(self, input_data):
+        """
+        Generates embeddings using the Ollama API on the async HTTP client.
+        Args:
+            input_data (Union[List[str], str]): The text or list of texts to embed.
+        Returns:
+            np.ndarray: float32 array of shape (len(input_data), dimension).
+        Raises:
+            RuntimeError: If the API response indicates an error or missing model.
+        """
+        if not self._available.is_set():
+            await asyncio.to_thread(self._available.wait)
+        self._wait_until_available()
+        try:
+            resp = await self.async_client.post(self.url, content=_json_body(self._payload(input_data)))
+            embeddings = self._parse_response(resp)
+        except httpx.TimeoutException:
+            raise RuntimeError("Timeout waiting for Ollama embedding response")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Network error while calling Ollama API: {e}")
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Invalid JSON response from Ollama API: {e}")
+
+        if embeddings is None:
+            if not await asyncio.to_thread(self._pull_model):
+                raise self._missing_model_error()
+            logger.info("Retrying embedding after model pull...")
+            return await self.arun_inference(input_data)
+        self._mark_verified()
+        return embeddings
 
 class OtherEmbedding(BaseEmbeddingModel):
     """Embedding model that interacts with a generic API."""
+    network_bound = True
+
     def __init__(self, config) -> None:
         """
         Initializes a generic embedding model for other API-based services.
@@ -385,17 +1067,77 @@ class OtherEmbedding(BaseEmbeddingModel):
         Args:
             config: The application configuration object.
         """
+        super().__init__()
         self.meta = config.embed_model_names[config.embed_model]
         self.embed_model_fullname = config.embed_model
         self.dimension = self.meta.get("dimension", None)
+        self.max_in_flight = self.meta.get("max_in_flight", 4)
+        self.max_tokens_per_batch = self.meta.get("max_tokens_per_batch", self.max_tokens_per_batch)
+        # Dynamic batching servers (TEI, Infinity) assemble their own batches from
+        # concurrent requests, so many small requests in flight beat a few large ones
+        self.dynamic_batch = self.meta.get("dynamic_batch", False)
+        if self.dynamic_batch:
+            self.max_in_flight = self.meta.get("max_in_flight", 32)
+            self.request_batch_size = self.meta.get("request_batch_size", 16)
         self.model = self.meta["name"]
         self.api_key = os.getenv(self.meta["api_key"], None)
         self.url = get_docker_safe_url(self.meta["url"])
-        assert self.url and self.model, f"Missing URL or model in config: {config.embed_model}"
+        if not self.url or not self.model:
+            raise ValueError(f"Missing URL or model in config: {config.embed_model}")
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.session = _pooled_session()
+        # One AsyncClient per event loop, its connections belong to the loop they were opened on
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def async_client(self):
+        """The pooled httpx.AsyncClient of this model on the running event loop, created on first async call."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                http2=HTTP2, headers=self.headers, timeout=API_TIMEOUT, limits=API_LIMITS
+            )
+        return client
+
+    def batch_vectorize(self, items, batch_limit=20, out=None):
+        """
+        Generates embeddings for a list of items in batches.
+
+        With `dynamic_batch` set in the model config, requests carry `request_batch_size`
+        texts each and up to `max_in_flight` of them run at once, leaving batching to the server.
+
+        Args:
+            items (list[str]): A list of texts to embed.
+            batch_limit (int, optional): Texts per request, ignored with `dynamic_batch`.
+                                         Defaults to 20.
+            out (np.ndarray, optional): (len(items), dimension) float32 array to fill.
+
+        Returns:
+            np.ndarray | list: The embeddings of all items, see `BaseEmbeddingModel.batch_vectorize`.
+        """
+        if self.dynamic_batch:
+            batch_limit = self.request_batch_size
+        return super().batch_vectorize(items, batch_limit, out=out)
+
+    async def abatch_vectorize(self, items, batch_limit=20):
+        """
+        Asynchronously generates embeddings for a list of items, up to `max_in_flight` requests at once.
+
+        Args:
+            items (list[str]): A list of texts to embed.
+            batch_limit (int, optional): Texts per request, ignored with `dynamic_batch`.
+                                         Defaults to 20.
+
+        Returns:
+            list: A list of embeddings for all items.
+        """
+        if self.dynamic_batch:
+            batch_limit = self.request_batch_size
+        return await super().abatch_vectorize(items, batch_limit)
 
     def run_inference(self, input_data):
         """
@@ -405,16 +1147,45 @@ class OtherEmbedding(BaseEmbeddingModel):
             input_data (str | list[str]): The text or list of texts to embed.
 
         Returns:
-            list: A list of embeddings from the API.
+            np.ndarray: float32 array of L2-normalized embeddings from the API.
 
         Raises:
-            AssertionError: If the API response does not contain 'data'.
+            RuntimeError: If the API response does not contain 'data'.
         """
         request_body = self.prepare_payload(input_data)
-        resp = requests.post(self.url, json=request_body, headers=self.headers, timeout=10)
-        output = json.loads(resp.text)
-        assert output["data"], f"Embedding API failed: {output}"
-        return [entry["embedding"] for entry in output["data"]]
+        resp = self.session.post(self.url, data=_json_body(request_body), headers=self.headers, timeout=10)
+        return self._parse_response(resp.content)
+
+    async def arun_inference(self, input_data):
+        """
+        Generates embeddings using the configured API on the async HTTP client.
+
+        Args:
+            input_data (str | list[str]): The text or list of texts to embed.
+
+        Returns:
+            np.ndarray: float32 array of L2-normalized embeddings from the API.
+
+        Raises:
+            RuntimeError: If the API response does not contain 'data'.
+        """
+        resp = await self.async_client.post(self.url, content=_json_body(self.prepare_payload(input_data)))
+        return self._parse_response(resp.content)
+
+    def _parse_response(self, content):
+        """Parses an embedding API response body into a normalized float32 array."""
+        output = json_loads(content)
+        data = output.get("data") if isinstance(output, dict) else None
+        if not data:
+            raise RuntimeError(f"Embedding API failed: {output}")
+
+        if not self.dimension:
+            return self._postprocess([entry["embedding"] for entry in data])
+        # Rows are copied straight into the result, without a list of lists in between
+        arr = np.empty((len(data), self.dimension), dtype=np.float32)
+        for i, entry in enumerate(data):
+            arr[i] = entry["embedding"]
+        return self._postprocess(arr)
 
     def prepare_payload(self, content):
         """
@@ -457,6 +1228,8 @@ def initialize_embedding(config):
     logger.debug("Initializing embedding model `%s`...", embed_model)
 
     if provider == "local":
+        if config.embed_model_names[embed_model].get("onnx_path"):
+            return OnnxEmbeddingModel(config)
         return LocalEmbeddingModel(config)
     elif provider == "ollama":
         return OllamaEmbedding(config)
@@ -464,6 +1237,29 @@ def initialize_embedding(config):
         return OtherEmbedding(config)
 
 
+def _local_embedding_path(config, model_meta):
+    """
+    Resolves the path (or hub name) of a local embedding model, preferring a copy under `MODEL_DIR`.
+
+    Args:
+        config: The application configuration object.
+        model_meta (dict): The model's entry in `config.embed_model_names`.
+
+    Returns:
+        str: The model path.
+    """
+    path = config.model_local_paths.get(model_meta["name"], model_meta.get("local_path"))
+    path = path or model_meta["name"]
+
+    if os.getenv("MODEL_DIR"):
+        potential_path = os.path.join(os.getenv("MODEL_DIR"), path)
+        if os.path.exists(potential_path):
+            path = potential_path
+        else:
+            logger.warning("Model `%s` not found at `%s`, using fallback `%s`", model_meta['name'], path, model_meta['name'])
+    return path
+
+
 def resolve_local_model_path(paths, name, fallback):
     """
     Resolves the local path for a model.
@@ -1,4 +1,5 @@
 import time
+from dataclasses import dataclass
 from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
@@ -36,6 +37,36 @@ class KnowledgeDatabase(Base):
         data["files"] = {f.uid: f.as_dict() for f in self.related_files} if self.related_files else {}
         return data
 
+    def as_dict_fast(self):
+        """Like as_dict, reading loaded state directly; unloaded relationships are empty"""
+        state = self.__dict__
+        created_at = state.get("created_at")
+        data = {
+            "id": state.get("id"),
+            "uid": state.get("uid"),
+            "name": state.get("name"),
+            "description": state.get("description"),
+            "embedding": state.get("embedding"),
+            "dimension": state.get("dimension"),
+            "metadata": state.get("metadata_extra") or {},
+            "created_at": created_at.isoformat() if created_at else None
+        }
+
+        data["files"] = {f.uid: f.as_dict_fast() for f in state.get("related_files") or ()}
+        return data
+
+
+@dataclass(slots=True)
+class DatabaseSummary:
+    """Listing view of a knowledge database, files summarized as a count"""
+    db_id: str
+    name: str
+    description: str
+    embed_model: str
+    dimension: int
+    meta_info: dict
+    file_count: int
+
 
 class KnowledgeFile(Base):
     """Knowledge file model"""
@@ -66,6 +97,22 @@ class KnowledgeFile(Base):
         data["nodes"] = [n.as_dict() for n in self.content_blocks] if self.content_blocks else []
         return data
 
+    def as_dict_fast(self):
+        """Like as_dict, reading loaded state directly; unloaded relationships are empty"""
+        state = self.__dict__
+        created_at = state.get("created_at")
+        data = {
+            "uid": state.get("uid"),
+            "filename": state.get("filename"),
+            "path": state.get("path"),
+            "type": state.get("kind"),
+            "status": state.get("state"),
+            "created_at": created_at.timestamp() if created_at else time.time()
+        }
+
+        data["nodes"] = [n.as_dict_fast() for n in state.get("content_blocks") or ()]
+        return data
+
 
 class KnowledgeNode(Base):
     """Knowledge block model"""
@@ -91,3 +138,16 @@ class KnowledgeNode(Base):
             "end_char_idx": self.end_pos,
             "metadata": self.metadata_extra or {}
         }
+
+    def as_dict_fast(self):
+        """Like as_dict, reading loaded state directly"""
+        state = self.__dict__
+        return {
+            "id": state.get("id"),
+            "file_id": state.get("file_uid"),
+            "text": state.get("content_text"),
+            "hash": state.get("hash"),
+            "start_char_idx": state.get("start_pos"),
+            "end_char_idx": state.get("end_pos"),
+            "metadata": state.get("metadata_extra") or {}
+        }
@@ -1,7 +1,14 @@
 """
 This module provides reranker model loading and scoring utilities for the AI engine.
-It supports local reranker models using FlagEmbedding and exposes a unified initialize_reranker interface.
+It supports local reranker models using FlagEmbedding, or an ONNX export of them run on ONNX Runtime
+(int8-quantized on CPU, fp16 on CUDA), or decoder-only LLM rerankers, and exposes a unified
+initialize_reranker interface.
 """
+import copy
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from FlagEmbedding import FlagReranker
 
@@ -14,9 +21,7 @@ class LocalReranker(FlagReranker):
     It is initialized with a config object and supports scoring via the parent FlagReranker interface.
     """
     def __init__(self, cfg, **options):
-        reranker_entry = cfg.reranker_names[cfg.reranker]
-        load_path = cfg.model_local_paths.get(reranker_entry["name"], reranker_entry.get("local_path"))
-        load_path = load_path or reranker_entry["name"]
+        load_path = _reranker_load_path(cfg)
 
         logger.info("Initializing reranker model '%s' from path: %s", cfg.reranker, load_path)
 
@@ -24,6 +29,190 @@ class LocalReranker(FlagReranker):
         logger.info("Reranker model '%s' successfully initialized", cfg.reranker)
 
 
+class OnnxReranker:
+    """
+    OnnxReranker runs an ONNX export of the local reranker on ONNX Runtime: int8-quantized on the CPU
+    provider, or fp16 on the CUDA provider when the device is cuda and ONNX Runtime has CUDA support.
+    The export is read from the reranker's `onnx_path` setting, or built next to a local model directory
+    on first use, and exposes the FlagReranker compute_score interface.
+    """
+    onnx_filenames = {"int8": "reranker-int8.onnx", "fp16": "reranker-fp16.onnx"}
+
+    def __init__(self, cfg, max_length=512):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        use_cuda = str(cfg.device).startswith("cuda") and "CUDAExecutionProvider" in ort.get_available_providers()
+        precision = "fp16" if use_cuda else "int8"
+        providers = ["CUDAExecutionProvider", "CPUExecutionProvider"] if use_cuda else ["CPUExecutionProvider"]
+
+        load_path = _reranker_load_path(cfg)
+        onnx_path = cfg.reranker_names[cfg.reranker].get("onnx_path") or os.path.join(load_path, self.onnx_filenames[precision])
+        if not os.path.exists(onnx_path):
+            # The export is built from, and written next to, a local copy of the model
+            if not os.path.isdir(load_path):
+                raise ValueError(
+                    f"ONNX reranker '{cfg.reranker}' has no export at '{onnx_path}' and '{load_path}' "
+                    "is not a local model directory to export from, set 'onnx_path' to an existing export"
+                )
+            export_onnx_reranker(load_path, onnx_path, precision=precision)
+
+        logger.info("Initializing %s ONNX reranker model '%s' from path: %s", precision, cfg.reranker, onnx_path)
+
+        # On CPU, length buckets run concurrently on half the cores in total,
+        # each session.run releases the GIL and gets an equal thread share
+        workers = 1 if use_cuda else max(1, min(4, (os.cpu_count() or 2) // 2))
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2 // workers)
+        self.session = ort.InferenceSession(onnx_path, options, providers=providers)
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="onnx-rerank") if workers > 1 else None
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(load_path)
+        self.max_length = max_length
+        logger.info("ONNX reranker model '%s' successfully initialized", cfg.reranker)
+
+    def compute_score(self, sentence_pairs, batch_size=32, normalize=False):
+        """
+        Scores [query, passage] pairs, returning a float for a single pair and a list otherwise.
+        Pairs are batched in order of length so each batch is padded only to similar lengths,
+        batches run concurrently on CPU, and the scores are returned in input order.
+        """
+        if isinstance(sentence_pairs[0], str):
+            sentence_pairs = [sentence_pairs]
+
+        order = np.argsort([len(pair[0]) + len(pair[1]) for pair in sentence_pairs], kind="stable")
+        scores = np.empty(len(sentence_pairs), dtype=np.float32)
+        # The tokenizer is not safe to share across threads, only the sessions run in parallel
+        batches = []
+        for start in range(0, len(order), batch_size):
+            index = order[start:start + batch_size]
+            batch = [sentence_pairs[i] for i in index]
+            inputs = self.tokenizer(
+                [pair[0] for pair in batch],
+                [pair[1] for pair in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            feed = {name: value.astype(np.int64) for name, value in inputs.items() if name in self.input_names}
+            batches.append((index, feed))
+
+        def run(batch):
+            return self.session.run(None, batch[1])[0]
+
+        outputs = self._pool.map(run, batches) if self._pool and len(batches) > 1 else map(run, batches)
+        for (index, _), logits in zip(batches, outputs):
+            scores[index] = logits.reshape(-1)
+
+        if normalize:
+            scores = score_to_prob(scores)
+        scores = scores.tolist()
+        return scores[0] if len(scores) == 1 else scores
+
+
+class DecoderReranker:
+    """
+    DecoderReranker scores pairs with a causal LM reranker (e.g. bge-reranker-v2-gemma) as the logit of "Yes"
+    after a fixed instruction. Pairs are grouped by query, the "A: query" prefix is forwarded once per group
+    and its KV cache reused for every passage, so each candidate only forwards its passage and instruction
+    tokens. Causal attention makes the result the same as running the full prompt.
+    """
+    instruction = (
+        "Given a query A and a passage B, determine whether the passage contains an answer to the query "
+        "by providing a prediction of either 'Yes' or 'No'."
+    )
+
+    def __init__(self, cfg, max_length=1024):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        load_path = _reranker_load_path(cfg)
+        logger.info("Initializing decoder reranker model '%s' from path: %s", cfg.reranker, load_path)
+
+        self.torch = torch
+        self.device = cfg.device
+        dtype = torch.float16 if str(cfg.device).startswith("cuda") else torch.float32
+        self.tokenizer = AutoTokenizer.from_pretrained(load_path)
+        self.model = AutoModelForCausalLM.from_pretrained(load_path, torch_dtype=dtype).to(cfg.device).eval()
+        self.yes_id = self.tokenizer("Yes", add_special_tokens=False)["input_ids"][0]
+        self.suffix_ids = self.tokenizer("\n" + self.instruction, add_special_tokens=False)["input_ids"]
+        self.max_length = max_length
+        logger.info("Decoder reranker model '%s' successfully initialized", cfg.reranker)
+
+    def compute_score(self, sentence_pairs, batch_size=32, normalize=False):
+        """
+        Scores [query, passage] pairs, returning a float for a single pair and a list otherwise.
+        batch_size is accepted for interface compatibility, candidates are run one by one on the cached prefix.
+        """
+        if isinstance(sentence_pairs[0], str):
+            sentence_pairs = [sentence_pairs]
+
+        groups = {}
+        for i, (query, _) in enumerate(sentence_pairs):
+            groups.setdefault(query, []).append(i)
+
+        scores = np.empty(len(sentence_pairs), dtype=np.float32)
+        with self.torch.inference_mode():
+            for query, indices in groups.items():
+                prefix_ids = self.tokenizer(f"A: {query}\n", return_tensors="pt")["input_ids"].to(self.device)
+                prefix_cache = self.model(input_ids=prefix_ids, use_cache=True).past_key_values
+                for i in indices:
+                    passage_ids = self.tokenizer(
+                        f"B: {sentence_pairs[i][1]}",
+                        add_special_tokens=False,
+                        truncation=True,
+                        max_length=self.max_length
+                    )["input_ids"]
+                    input_ids = self.torch.tensor([passage_ids + self.suffix_ids], device=self.device)
+                    # The cache is extended in place by the forward pass, each candidate gets its own copy
+                    logits = self.model(
+                        input_ids=input_ids,
+                        past_key_values=copy.deepcopy(prefix_cache),
+                        use_cache=True
+                    ).logits
+                    scores[i] = logits[0, -1, self.yes_id].float().item()
+
+        if normalize:
+            scores = score_to_prob(scores)
+        scores = scores.tolist()
+        return scores[0] if len(scores) == 1 else scores
+
+
+def export_onnx_reranker(model_path, onnx_path, precision="int8"):
+    """
+    Exports a sequence-classification reranker to ONNX, then either dynamically quantizes its weights
+    to int8 (for CPU) or converts it to fp16 with float32 inputs and outputs kept (for CUDA).
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    logger.info("Exporting %s reranker model at %s to %s", precision, model_path, onnx_path)
+    with tempfile.TemporaryDirectory() as export_dir:
+        model = ORTModelForSequenceClassification.from_pretrained(model_path, export=True)
+        model.save_pretrained(export_dir)
+        export_path = os.path.join(export_dir, "model.onnx")
+        if precision == "fp16":
+            import onnx
+            from onnxruntime.transformers.float16 import convert_float_to_float16
+
+            onnx.save(convert_float_to_float16(onnx.load(export_path), keep_io_types=True), onnx_path)
+        else:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(export_path, onnx_path, weight_type=QuantType.QInt8)
+    return onnx_path
+
+
+def _reranker_load_path(cfg):
+    """
+    Resolves the local path (or hub name) of the configured reranker.
+    """
+    reranker_entry = cfg.reranker_names[cfg.reranker]
+    load_path = cfg.model_local_paths.get(reranker_entry["name"], reranker_entry.get("local_path"))
+    return load_path or reranker_entry["name"]
+
+
 def score_to_prob(values):
     """
     Converts raw scores to probability using sigmoid function.
@@ -41,6 +230,10 @@ def initialize_reranker(cfg):
 
     provider_type, _ = cfg.ranker.split('/', 1)
     if provider_type in {"local", "FlagEmbedding", "huggingface"}:
+        if cfg.rerank_backend == "onnx":
+            return OnnxReranker(cfg)
+        if cfg.rerank_backend == "decoder":
+            return DecoderReranker(cfg)
         return LocalReranker(cfg)
     else:
         raise ValueError(f"Unsupported provider: {cfg.ranker}, allowed: {supported_keys}")
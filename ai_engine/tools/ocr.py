@@ -1,5 +1,7 @@
 import os
+import queue
 import tempfile
+import threading
 from pathlib import Path
 from argparse import ArgumentParser
 
@@ -12,6 +14,9 @@ from llama_index.readers.file import PDFReader
 from ai_engine.utils.logging import logger
 from ai_engine.utils import is_text_pdf
 
+# Rendered pages waiting for OCR, bounds memory while rendering runs ahead
+RENDER_QUEUE_SIZE = 4
+
 
 class OcrProcessor:
     """A class for performing OCR (Optical Character Recognition) on images and PDFs using EasyOCR.
@@ -92,24 +97,54 @@ class OcrProcessor:
         return "\n\n".join([doc.get_content() for doc in documents])
 
     def _process_scanned_pdf(self, pdf_path):
-        image_paths = self._convert_pdf_to_images(pdf_path)
-        full_text = [self.recognize_text_from_image(img) for img in tqdm(image_paths, desc="OCR", ncols=80)]
-        return "\n\n".join(full_text)
+        """OCR every page of a scanned PDF, rendering the next pages on a thread while one is recognized.
 
-    def _convert_pdf_to_images(self, pdf_path):
-        doc = fitz.open(pdf_path)
-        temp_dir = tempfile.mkdtemp(prefix="easyocr_pdf_")
-        saved_images = []
-
-        for i in tqdm(range(doc.page_count), desc="Rendering", ncols=80):
-            page = doc[i]
-            matrix = fitz.Matrix(2, 2)
-            pix = page.get_pixmap(matrix=matrix, alpha=False)
-            img_file = os.path.join(temp_dir, f"page_{i + 1}.png")
-            pix.save(img_file)
-            saved_images.append(img_file)
+        Pages go to the reader as in-memory arrays, without a round-trip through PNG files.
+        """
+        rendered = queue.Queue(maxsize=RENDER_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    rendered.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def render():
+            try:
+                with fitz.open(pdf_path) as doc:
+                    for page in doc:
+                        if not put((self._render_page(page), None)):
+                            return
+            except Exception as e:
+                put((None, e))
+                return
+            put((None, None))
+
+        threading.Thread(target=render, name="ocr-render", daemon=True).start()
+        full_text = []
+        try:
+            with tqdm(desc="OCR", ncols=80) as progress:
+                while True:
+                    image, error = rendered.get()
+                    if error is not None:
+                        raise error
+                    if image is None:
+                        break
+                    full_text.append("\n".join(line[1] for line in self.reader.readtext(image)))
+                    progress.update()
+        finally:
+            stop.set()
+        return "\n\n".join(full_text)
 
-        return saved_images
+    @staticmethod
+    def _render_page(page):
+        """Render a PDF page at 2x zoom into an RGB array."""
+        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2), alpha=False)
+        return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
 
     def _save_temp_image(self, image_data):
         if isinstance(image_data, np.ndarray):
@@ -3,6 +3,11 @@ import random
 import os
 from ai_engine.utils.logging import logger
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def is_text_pdf(pdf_path):
     import fitz
     doc = fitz.open(pdf_path)
@@ -30,6 +35,39 @@ def hashstr(input_string, length=8, with_salt=False):
     return hash[:length]
 
 
+def hashstr_stream(*chunks, length=8):
+    """Hash byte chunks fed one by one, without concatenating them first."""
+    import hashlib
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+def hashstr_batch(texts, length=8):
+    """Salted hashes of many strings, one blake2b call each with a salt shared by the batch."""
+    import hashlib
+    from functools import partial
+    digest = partial(hashlib.blake2b, digest_size=(length + 1) // 2, salt=os.urandom(16))
+    return [digest(text.encode("utf-8", "replace")).hexdigest()[:length] for text in texts]
+
+
+def json_loads(data):
+    """Parse JSON from str or bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    import json
+    return json.loads(data)
+
+
+def json_dumps(obj):
+    """Serialize obj to a JSON str, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    import json
+    return json.dumps(obj, ensure_ascii=False)
+
+
 def get_docker_safe_url(base_url):
     if os.getenv("RUNNING_IN_DOCKER") == "true":
        # Replace all possible local address forms
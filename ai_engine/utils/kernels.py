@@ -0,0 +1,165 @@
+"""
+Vector kernels: row normalization and int8 quantization of embeddings,
+and re-scoring of retrieved hits.
+
+Compiled with Numba when it is installed, row loops run in parallel and
+fastmath lets the dot products use FMA. Without Numba the same results
+come from plain NumPy.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _normalize_rows_jit(mat, out):
+        for i in prange(mat.shape[0]):
+            total = 0.0
+            for j in range(mat.shape[1]):
+                total += mat[i, j] * mat[i, j]
+            norm = np.sqrt(total)
+            if norm == 0.0:
+                norm = 1.0
+            for j in range(mat.shape[1]):
+                out[i, j] = mat[i, j] / norm
+        return out
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _quantize_int8_jit(mat, scales):
+        out = np.empty(mat.shape, dtype=np.int8)
+        for i in prange(mat.shape[0]):
+            max_abs = 0.0
+            for j in range(mat.shape[1]):
+                value = abs(mat[i, j])
+                if value > max_abs:
+                    max_abs = value
+            scale = max_abs / 127.0 if max_abs > 0.0 else 1.0
+            scales[i] = scale
+            for j in range(mat.shape[1]):
+                out[i, j] = np.int8(np.rint(mat[i, j] / scale))
+        return out
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _cosine_scores_jit(query, mat):
+        query_total = 0.0
+        for j in range(query.shape[0]):
+            query_total += query[j] * query[j]
+        query_norm = np.sqrt(query_total)
+
+        scores = np.empty(mat.shape[0], dtype=np.float32)
+        for i in prange(mat.shape[0]):
+            dot = 0.0
+            total = 0.0
+            for j in range(mat.shape[1]):
+                dot += mat[i, j] * query[j]
+                total += mat[i, j] * mat[i, j]
+            norm = np.sqrt(total) * query_norm
+            scores[i] = dot / norm if norm != 0.0 else dot
+        return scores
+
+    @njit(cache=True)
+    def _filter_topk_jit(dist, thr, k):
+        out = np.empty(min(k, dist.shape[0]), dtype=np.int64)
+        n = 0
+        for i in range(dist.shape[0]):
+            if n == out.shape[0]:
+                break
+            if dist[i] > thr:
+                out[n] = i
+                n += 1
+        return out[:n]
+
+
+def normalize_rows(mat, out=None):
+    """
+    L2-normalize every row of a matrix, leaving zero rows unchanged.
+
+    Args:
+        mat (array-like): (N, dim) vectors
+        out (np.ndarray, optional): C-contiguous, writable (N, dim) float32 array
+            to write into, may be mat itself. Defaults to a new array.
+
+    Returns:
+        np.ndarray: (N, dim) float32 unit vectors, out when given
+    """
+    mat = np.ascontiguousarray(mat, dtype=np.float32)
+    if out is None:
+        out = np.empty_like(mat)
+    if njit is not None:
+        return _normalize_rows_jit(mat, out)
+    norms = np.sqrt(np.einsum("ij,ij->i", mat, mat))[:, None]
+    return np.divide(mat, np.where(norms == 0, 1.0, norms), out=out)
+
+
+def quantize_int8(mat):
+    """
+    Symmetric per-row int8 quantization, ``q = round(v / s)`` with ``s = max|v| / 127``.
+
+    Args:
+        mat (array-like): (N, dim) vectors
+
+    Returns:
+        tuple: ((N, dim) int8 array, (N,) float32 scales, 1.0 for zero rows)
+    """
+    mat = np.ascontiguousarray(mat, dtype=np.float32)
+    if njit is not None:
+        scales = np.empty(mat.shape[0], dtype=np.float32)
+        return _quantize_int8_jit(mat, scales), scales
+    scales = np.abs(mat).max(axis=-1, keepdims=True) / 127.0
+    scales[scales == 0] = 1.0
+    return np.round(mat / scales).astype(np.int8), scales.squeeze(-1)
+
+
+def cosine_scores(query, mat):
+    """
+    Cosine similarity of one query vector against every row of a matrix.
+
+    Args:
+        query (array-like): (dim,) query vector
+        mat (array-like): (N, dim) candidate vectors
+
+    Returns:
+        np.ndarray: (N,) float32 similarities, raw dot products where a norm is zero
+    """
+    query = np.ascontiguousarray(query, dtype=np.float32)
+    mat = np.ascontiguousarray(mat, dtype=np.float32)
+    if njit is not None:
+        return _cosine_scores_jit(query, mat)
+    norms = np.linalg.norm(mat, axis=1) * np.linalg.norm(query)
+    return ((mat @ query) / np.where(norms == 0, 1.0, norms)).astype(np.float32, copy=False)
+
+
+def filter_topk(dist, thr, k):
+    """
+    Indices of the first k distances above a threshold, in input order.
+
+    Search hits already come sorted by similarity, so the first k kept
+    entries are the top k.
+
+    Args:
+        dist (array-like): (N,) similarities
+        thr (float): Keep entries strictly above this value
+        k (int): Maximum number of indices to return
+
+    Returns:
+        np.ndarray: (<=k,) int64 indices into dist
+    """
+    dist = np.ascontiguousarray(dist, dtype=np.float64)
+    if njit is not None:
+        return _filter_topk_jit(dist, float(thr), int(k))
+    return np.flatnonzero(dist > thr)[:k]
+
+
+def warm_kernels():
+    """Compile (or load from cache) every kernel on tiny inputs, so the first query does not pay for it."""
+    if njit is None:
+        return
+    mat = np.ones((2, 2), dtype=np.float32)
+    normalize_rows(mat)
+    quantize_int8(mat)
+    cosine_scores(mat[0], mat)
+    filter_topk(np.ones(2), 0.0, 1)
@@ -1,13 +1,12 @@
 import os
 import json
-import asyncio
 import traceback
 import uuid
 from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from langchain_core.messages import AIMessageChunk
 
-from ai_engine import executor, agent_config, retriever
+from ai_engine import agent_config, retriever
 from ai_engine.core.history import HistoryManager
 from ai_engine.agents import agent_manager
 from ai_engine.models import select_model
@@ -118,11 +117,7 @@ async def chat_post(
 async def call(query: str = Body(...), meta: dict = Body(None)):
     meta = meta or {}
     model = select_model(model_provider=meta.get("model_provider"), model_name=meta.get("model_name"))
-    async def predict_async(query):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(executor, model.generate_response, query)
-
-    response = await predict_async(query)
+    response = await model.generate_response_async(query)
     logger.debug("query: %s, response: %s", query, response.content)
 
     return {"response": response.content}
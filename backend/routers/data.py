@@ -7,13 +7,26 @@ import asyncio
 import traceback
 from typing import List, Optional
 from fastapi import APIRouter, File, UploadFile, HTTPException, Body, Query
+from fastapi.responses import Response
 
-from ai_engine.utils import logger, hashstr
+from ai_engine.utils import logger, hashstr, json_dumps
 from ai_engine import executor, retriever, agent_config, knowledge_base, graph_db
 
 data = APIRouter()
 
 
+def json_response(payload):
+    """Serialize an already JSON-ready payload once, skipping FastAPI's encoder pass.
+
+    Falls back to returning the payload as-is when it holds values the
+    serializer does not know, so FastAPI can encode them instead.
+    """
+    try:
+        return Response(content=json_dumps(payload), media_type="application/json")
+    except TypeError:
+        return payload
+
+
 @data.get("/")
 async def get_databases():
     """Get all databases"""
@@ -22,7 +35,7 @@ async def get_databases():
     except Exception as e:
         logger.error("Failed to get database list : , %s, %s", e, traceback.format_exc())
         return {"message": f"Failed to get database list {e}", "databases": []}
-    return database
+    return json_response(database)
 
 @data.post("/")
 async def create_database(
@@ -62,7 +75,7 @@ async def file_to_chunk(db_id: str = Body(...), files: list[str] = Body(...), pa
     """File to chunk"""
     logger.debug("File to chunk for db_id %s: %s %s", db_id, files, params)
     try:
-        processed_files = await knowledge_base.add_files(db_id, files, params)
+        processed_files = await knowledge_base.add_files_async(db_id, files, params)
         return {"message": "Files processed and pending indexing", "files": processed_files, "status": "success"}
     except Exception as e:
         logger.error("Failed to process files for pending indexing: %s, %s", e, traceback.format_exc())
@@ -89,7 +102,7 @@ async def get_database_info(db_id: str):
     database = knowledge_base.get_database_info(db_id)
     if database is None:
         raise HTTPException(status_code=404, detail="Database not found")
-    return database
+    return json_response(database)
 
 @data.delete("/document")
 async def delete_document(db_id: str = Body(...), file_id: str = Body(...)):
@@ -109,7 +122,7 @@ async def get_document_info(db_id: str, file_id: str):
         logger.error("Failed to get file info, %s, %s, %s", e, db_id, file_id)
         info = {"message": "Failed to get file info", "status": "failed"}
 
-    return info
+    return json_response(info)
 
 @data.post("/upload")
 async def upload_file(
@@ -5,11 +5,12 @@ Unit tests for the BaseDBManager class.
 import os
 import unittest
 from unittest.mock import patch, MagicMock
-from sqlalchemy import create_engine, inspect
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session, close_all_sessions
 
 from ai_engine.knowledge_database.base_manager import BaseDBManager
 from ai_engine.knowledge_database.database_manager import DatabaseManager
+from ai_engine.knowledge_database.node_manager import FTS_TABLE
 from ai_engine.models.knowledge import Base
 from ai_engine.configs.agent import AgentConfig
 
@@ -55,11 +56,10 @@ class TestBaseDBManager(unittest.TestCase):
     def tearDown(self):
         """Clean up test environment."""
         # Close database connections
+        close_all_sessions()
         if hasattr(self, 'base_manager'):
-            self.base_manager.Session.close_all()
             self.base_manager.engine.dispose()
         if hasattr(self, 'db_manager'):
-            self.db_manager.Session.close_all()
             self.db_manager.engine.dispose()
             
         # Remove test database file
@@ -88,12 +88,19 @@ class TestBaseDBManager(unittest.TestCase):
         
         # Use existing engine to inspect tables
         inspector = inspect(self.base_manager.engine)
-        tables = inspector.get_table_names()
+        # The node FTS index and its shadow tables are not ORM models
+        tables = [name for name in inspector.get_table_names() if not name.startswith(FTS_TABLE)]
         
         # Check if all tables from Base.metadata are created
         expected_tables = set(Base.metadata.tables.keys())
         self.assertEqual(set(tables), expected_tables)
 
+    def test_sqlite_pragmas(self, mock_graph_db, mock_kb, mock_milvus):
+        """Test new connections run in WAL mode."""
+        with self.base_manager.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+            self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 1)
+
     def test_get_session(self, mock_graph_db, mock_kb, mock_milvus):
         """Test session context manager."""
         with self.base_manager.get_session() as session:
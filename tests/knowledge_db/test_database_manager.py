@@ -38,12 +38,9 @@ class TestDatabaseManager(unittest.TestCase):
         """Test retrieving all databases."""
         # Mock session and query
         mock_session = MagicMock()
-        mock_query = MagicMock()
-        mock_session.query.return_value = mock_query
-        mock_query.options.return_value = mock_query
-        mock_query.all.return_value = [
-            MagicMock(as_dict=lambda: {"uid": "test1", "name": "Test DB 1"}),
-            MagicMock(as_dict=lambda: {"uid": "test2", "name": "Test DB 2"})
+        mock_session.execute.return_value.scalars.return_value = [
+            MagicMock(as_dict_fast=lambda: {"uid": "test1", "name": "Test DB 1"}),
+            MagicMock(as_dict_fast=lambda: {"uid": "test2", "name": "Test DB 2"})
         ]
 
         with patch.object(self.manager, 'get_session') as mock_get_session:
@@ -55,15 +52,47 @@ class TestDatabaseManager(unittest.TestCase):
             self.assertEqual(result[0]["uid"], "test1")
             self.assertEqual(result[1]["name"], "Test DB 2")
 
+    def test_iter_all_databases(self):
+        """Test databases are fetched in batches and yielded lazily."""
+        mock_session = MagicMock()
+        mock_session.execute.return_value.scalars.return_value = [
+            MagicMock(as_dict_fast=lambda: {"uid": "test1", "name": "Test DB 1"})
+        ]
+
+        with patch.object(self.manager, 'get_session') as mock_get_session:
+            mock_get_session.return_value.__enter__.return_value = mock_session
+            
+            result = self.manager.iter_all_databases(batch=50)
+            mock_get_session.assert_not_called()
+            
+            self.assertEqual(list(result), [{"uid": "test1", "name": "Test DB 1"}])
+            stmt = mock_session.execute.call_args.args[0]
+            self.assertEqual(stmt.get_execution_options()["yield_per"], 50)
+
+    def test_iter_database_summaries(self):
+        """Test summaries are built from selected columns and a file count."""
+        mock_session = MagicMock()
+        mock_session.execute.return_value = [
+            ("test1", "Test DB 1", "desc", "test_model", 128, None, 2)
+        ]
+
+        with patch.object(self.manager, 'get_session') as mock_get_session:
+            mock_get_session.return_value.__enter__.return_value = mock_session
+
+            result = list(self.manager.iter_database_summaries(batch=50))
+
+            self.assertEqual(len(result), 1)
+            self.assertEqual(result[0].db_id, "test1")
+            self.assertEqual(result[0].meta_info, {})
+            self.assertEqual(result[0].file_count, 2)
+            stmt = mock_session.execute.call_args.args[0]
+            self.assertEqual(stmt.get_execution_options()["yield_per"], 50)
+
     def test_get_database_by_id(self):
         """Test retrieving a specific database."""
         mock_session = MagicMock()
-        mock_query = MagicMock()
-        mock_session.query.return_value = mock_query
-        mock_query.options.return_value = mock_query
-        mock_query.filter_by.return_value = mock_query
-        mock_query.first.return_value = MagicMock(
-            as_dict=lambda: {"uid": "test1", "name": "Test DB"}
+        mock_session.execute.return_value.scalars.return_value.first.return_value = MagicMock(
+            as_dict_fast=lambda: {"uid": "test1", "name": "Test DB"}
         )
 
         with patch.object(self.manager, 'get_session') as mock_get_session:
@@ -101,10 +130,7 @@ class TestDatabaseManager(unittest.TestCase):
     def test_delete_database(self):
         """Test database deletion."""
         mock_session = MagicMock()
-        mock_query = MagicMock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter_by.return_value = mock_query
-        mock_query.first.return_value = MagicMock()
+        mock_session.execute.return_value.rowcount = 1
 
         with patch.object(self.manager, 'get_session') as mock_get_session:
             mock_get_session.return_value.__enter__.return_value = mock_session
@@ -112,15 +138,13 @@ class TestDatabaseManager(unittest.TestCase):
             result = self.manager.delete_database("test1")
             
             self.assertTrue(result)
-            mock_session.delete.assert_called_once()
+            mock_session.query.assert_not_called()
+            self.assertGreater(mock_session.execute.call_count, 1)
 
     def test_delete_nonexistent_database(self):
         """Test deletion of non-existent database."""
         mock_session = MagicMock()
-        mock_query = MagicMock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter_by.return_value = mock_query
-        mock_query.first.return_value = None
+        mock_session.execute.return_value.rowcount = 0
 
         with patch.object(self.manager, 'get_session') as mock_get_session:
             mock_get_session.return_value.__enter__.return_value = mock_session
@@ -128,7 +152,8 @@ class TestDatabaseManager(unittest.TestCase):
             result = self.manager.delete_database("nonexistent")
             
             self.assertFalse(result)
-            mock_session.delete.assert_not_called()
+            mock_session.query.assert_not_called()
+            mock_session.execute.assert_called_once()
 
 
 if __name__ == '__main__':
@@ -3,10 +3,14 @@ Unit tests for the DocumentProcessor class.
 """
 
 import os
+import asyncio
+import hashlib
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+from llama_index.core.schema import TextNode
 
-from ai_engine.knowledge_database.document_processor import DocumentProcessor
+from ai_engine.knowledge_database.document_processor import DocumentProcessor, _content_hash
 
 
 class TestDocumentProcessor(unittest.TestCase):
@@ -22,18 +26,14 @@ class TestDocumentProcessor(unittest.TestCase):
             "test4.docx"
         ]
 
-    @patch('ai_engine.knowledge_database.document_processor.read_text')
+    @patch('ai_engine.knowledge_database.document_processor.read_text_fast')
     @patch('ai_engine.knowledge_database.document_processor.chunk')
     def test_process_files(self, mock_chunk, mock_read_text):
         """Test processing multiple files."""
         # Mock dependencies
         mock_read_text.return_value = ["Test content"]
         mock_chunk.return_value = [
-            MagicMock(dict=lambda: {
-                "text": "Test chunk",
-                "start_char_idx": 0,
-                "end_char_idx": 10
-            })
+            TextNode(text="Test chunk", start_char_idx=0, end_char_idx=10)
         ]
 
         # Process files
@@ -53,7 +53,7 @@ class TestDocumentProcessor(unittest.TestCase):
 
     def test_process_files_with_error(self):
         """Test processing files with error handling."""
-        with patch('ai_engine.knowledge_database.document_processor.read_text') as mock_read:
+        with patch('ai_engine.knowledge_database.document_processor.read_text_fast') as mock_read:
             mock_read.side_effect = Exception("Test error")
             
             result = self.processor.process_files(["test.pdf"])
@@ -63,6 +63,79 @@ class TestDocumentProcessor(unittest.TestCase):
             self.assertIn("error", file_info)
             self.assertEqual(len(file_info["nodes"]), 0)
 
+    def test_cache_disabled_by_default(self):
+        """Test the chunk cache is only opened with a cache path."""
+        self.assertIsNone(self.processor.cache)
+
+    @patch('ai_engine.knowledge_database.document_processor.chunk')
+    def test_process_files_cache_hit(self, mock_chunk):
+        """Test unchanged files are served from the chunk cache."""
+        mock_chunk.return_value = [
+            TextNode(text="Test chunk", start_char_idx=0, end_char_idx=10)
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processor = DocumentProcessor(cache_path=os.path.join(tmp_dir, "chunk_cache.db"))
+            file_path = os.path.join(tmp_dir, "test.txt")
+            with open(file_path, "w") as f:
+                f.write("Test content")
+
+            first = list(processor.process_files([file_path]).values())[0]
+            second = list(processor.process_files([file_path]).values())[0]
+
+            mock_chunk.assert_called_once()
+            self.assertEqual(second["nodes"], first["nodes"])
+            self.assertEqual(second["status"], "waiting")
+
+    def test_content_hash_mmap(self):
+        """Test large files hashed through mmap match a plain SHA-256."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "test.txt")
+            with open(file_path, "wb") as f:
+                f.write(b"Test content" * 100)
+
+            expected = hashlib.sha256(b"Test content" * 100).hexdigest()
+            self.assertEqual(_content_hash(file_path), expected)
+            with patch('ai_engine.knowledge_database.document_processor._MMAP_HASH_THRESHOLD', 16):
+                self.assertEqual(_content_hash(file_path), expected)
+
+    def test_process_files_pipeline(self):
+        """Test the pipeline chunks files, reports failures and hands each file to on_file."""
+        # Under the working directory, where chunk() parses paths with the file readers
+        with tempfile.TemporaryDirectory(dir=os.getcwd()) as tmp_dir:
+            processor = DocumentProcessor(max_workers=1, cache_path=None)
+            file_path = os.path.join(tmp_dir, "test.txt")
+            with open(file_path, "w") as f:
+                f.write("This is a test sentence. " * 50)
+            stored = []
+
+            result = asyncio.run(processor.process_files_pipeline(
+                [file_path, os.path.join(tmp_dir, "missing.txt")],
+                params={"chunk_size": 50, "chunk_overlap": 10},
+                on_file=stored.append
+            ))
+
+            infos = sorted(result.values(), key=lambda info: info["filename"])
+            self.assertEqual(infos[0]["status"], "failed")
+            self.assertEqual(infos[1]["status"], "waiting")
+            self.assertGreater(len(infos[1]["nodes"]), 1)
+            self.assertEqual(len(stored), 2)
+
+    def test_process_files_pipeline_matches_process_files(self):
+        """Test the pipeline parses files with the same readers and parser as process_files."""
+        with tempfile.TemporaryDirectory(dir=os.getcwd()) as tmp_dir:
+            processor = DocumentProcessor(max_workers=1, cache_path=None)
+            file_path = os.path.join(tmp_dir, "test.md")
+            with open(file_path, "w") as f:
+                f.write("# Title\n\nFirst section. " * 20 + "\n\n# Other\n\nSecond section. " * 20)
+            params = {"chunk_size": 50, "chunk_overlap": 10, "use_parser": True}
+
+            expected = list(processor.process_files([file_path], params=params).values())[0]["nodes"]
+            result = list(asyncio.run(processor.process_files_pipeline([file_path], params=params)).values())[0]["nodes"]
+
+            self.assertEqual([node["text"] for node in result], [node["text"] for node in expected])
+            self.assertEqual([node["metadata"] for node in result], [node["metadata"] for node in expected])
+            self.assertEqual(result[0]["metadata"]["filename"], "test.md")
+
     def test_validate_file_type(self):
         """Test file type validation."""
         valid_files = [
@@ -5,7 +5,7 @@ Unit tests for the EmbeddingManager class.
 import unittest
 from unittest.mock import patch, MagicMock
 
-from ai_engine.knowledge_database.embedding_manager import EmbeddingManager
+from ai_engine.knowledge_database.embedding_manager import EmbeddingManager, MicroBatcher
 from ai_engine.configs.agent import AgentConfig
 from ai_engine import agent_config
 
@@ -21,8 +21,8 @@ class TestEmbeddingManager(unittest.TestCase):
         
         self.manager = EmbeddingManager(self.mock_config)
 
-    @patch('ai_engine.knowledge_database.embedding_manager.initialize_embedding')
-    @patch('ai_engine.knowledge_database.embedding_manager.initialize_reranker')
+    @patch('ai_engine.models.embedding.initialize_embedding')
+    @patch('ai_engine.models.rerank_model.initialize_reranker')
     def test_initialize_models(self, mock_init_reranker, mock_init_embedding):
         """Test model initialization."""
         # Setup mock embedding model
@@ -71,6 +71,90 @@ class TestEmbeddingManager(unittest.TestCase):
         self.assertEqual(result, [0.1, 0.2])
         mock_model.batch_encode.assert_called_once_with(["test"])
 
+    def test_encode_single_text_cached(self):
+        """Test repeated texts are encoded once per embedding model."""
+        mock_model = MagicMock()
+        mock_model.batch_vectorize.return_value = [[0.1, 0.2]]
+        self.manager.embed_model = mock_model
+        self.manager._micro_batcher = None
+
+        first = self.manager.encode_single_text("test")
+        second = self.manager.encode_single_text("test")
+
+        self.assertIs(first, second)
+        mock_model.batch_vectorize.assert_called_once()
+
+        other_model = MagicMock()
+        other_model.batch_vectorize.return_value = [[0.3, 0.4]]
+        self.manager.embed_model = other_model
+        self.assertAlmostEqual(float(self.manager.encode_single_text("test")[0]), 0.3, places=6)
+
+    def test_encode_single_text_query_model(self):
+        """Test queries run on the query model of the current embedding model only."""
+        mock_model = MagicMock()
+        mock_model.embed_model_fullname = "local/bge"
+        mock_model.batch_vectorize.return_value = [[0.1, 0.2]]
+        query_model = MagicMock()
+        query_model.embed_model_fullname = "local/bge"
+        query_model.vectorize.return_value = [[0.3, 0.4]]
+        self.manager.embed_model = mock_model
+        self.manager.query_model = query_model
+        self.manager._micro_batcher = None
+
+        self.assertAlmostEqual(float(self.manager.encode_single_text("query")[0]), 0.3, places=6)
+        mock_model.batch_vectorize.assert_not_called()
+
+        mock_model.embed_model_fullname = "local/other"
+        self.assertAlmostEqual(float(self.manager.encode_single_text("other query")[0]), 0.1, places=6)
+
+    def test_encode_batch(self):
+        """Test batched encoding returns a float32 array."""
+        mock_model = MagicMock()
+        mock_model.batch_vectorize.return_value = [[0.1, 0.2], [0.3, 0.4]]
+        self.manager.embed_model = mock_model
+
+        result = self.manager.encode_batch(["test1", "test2"], batch_size=16)
+
+        self.assertEqual(result.shape, (2, 2))
+        self.assertEqual(str(result.dtype), "float32")
+        mock_model.batch_vectorize.assert_called_once_with(["test1", "test2"], batch_limit=16)
+
+    def test_micro_batcher(self):
+        """Test concurrent submits are coalesced into one batch."""
+        from concurrent.futures import ThreadPoolExecutor
+        encode_fn = MagicMock(side_effect=lambda texts: [[len(t)] for t in texts])
+        batcher = MicroBatcher(encode_fn, batch_size=8, max_wait=0.2)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(batcher.submit, ["a", "bb", "ccc", "dddd"]))
+
+        self.assertEqual(results, [[1], [2], [3], [4]])
+        self.assertLess(encode_fn.call_count, 4)
+
+    def test_micro_batcher_close_during_submits(self):
+        """Test submits racing close() are either encoded or rejected, never left waiting."""
+        from concurrent.futures import ThreadPoolExecutor
+        batcher = MicroBatcher(lambda texts: [[len(t)] for t in texts], batch_size=4, max_wait=0.001)
+
+        def submit(text):
+            try:
+                return batcher.submit(text)
+            except RuntimeError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            texts = ["x" * (i % 5 + 1) for i in range(200)]
+            futures = [executor.submit(submit, text) for text in texts]
+            batcher.close()
+            results = [future.result(timeout=5) for future in futures]
+
+        for text, result in zip(texts, results):
+            self.assertIn(result, (None, [len(text)]))
+        batcher._worker.join(timeout=1)
+        self.assertFalse(batcher._worker.is_alive())
+        with self.assertRaises(RuntimeError):
+            batcher.submit("late")
+
     def test_get_dimension(self):
         """Test getting embedding dimension."""
         mock_model = MagicMock()
@@ -80,6 +164,21 @@ class TestEmbeddingManager(unittest.TestCase):
         result = self.manager.get_dimension()
 
         self.assertEqual(result, 128)
+
+    def test_get_dimension_cached_per_model(self):
+        """Test the dimension is looked up once per embedding model."""
+        mock_model = MagicMock()
+        mock_model.get_dimension.return_value = 128
+        self.manager.embed_model = mock_model
+
+        self.manager.get_dimension()
+        self.manager.get_dimension()
+        mock_model.get_dimension.assert_called_once()
+
+        other_model = MagicMock()
+        other_model.get_dimension.return_value = 256
+        self.manager.embed_model = other_model
+        self.assertEqual(self.manager.get_dimension(), 256)
         mock_model.get_dimension.assert_called_once()
 
     def test_get_dimension_no_model(self):
@@ -111,9 +210,39 @@ class TestEmbeddingManager(unittest.TestCase):
         self.manager.reranker = mock_reranker
 
         result = self.manager.compute_rerank_scores("query", ["text1", "text2"])
+        cached = self.manager.compute_rerank_scores("query", ["text2", "text1"])
 
         self.assertEqual(result, [0.8, 0.6])
-        mock_reranker.compute_score.assert_called_once_with(["query", ["text1", "text2"]], normalize=False)
+        self.assertEqual(cached, [0.6, 0.8])
+        mock_reranker.compute_score.assert_called_once_with(
+            [["query", "text1"], ["query", "text2"]], batch_size=32, normalize=False
+        )
+
+    def test_compute_rerank_scores_duplicates(self):
+        """Test duplicate texts are scored once and share their score."""
+        mock_reranker = MagicMock()
+        mock_reranker.compute_score.return_value = [0.9, 0.3]
+        self.manager.reranker = mock_reranker
+
+        result = self.manager.compute_rerank_scores("query", ["same", "other", "same"])
+
+        self.assertEqual(result, [0.9, 0.3, 0.9])
+        mock_reranker.compute_score.assert_called_once_with(
+            [["query", "same"], ["query", "other"]], batch_size=32, normalize=False
+        )
+
+    def test_compute_rerank_scores_eviction(self):
+        """Test scores survive eviction of their own and of hit cache entries."""
+        mock_reranker = MagicMock()
+        mock_reranker.compute_score.side_effect = lambda pairs, **kwargs: [float(len(text)) for _, text in pairs]
+        self.manager.reranker = mock_reranker
+        self.manager._rerank_cache_size = 2
+
+        self.manager.compute_rerank_scores("query", ["a"])
+        result = self.manager.compute_rerank_scores("query", ["a", "bb", "ccc", "dddd"])
+
+        self.assertEqual(result, [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(list(self.manager._rerank_cache), [("query", "ccc"), ("query", "dddd")])
 
     def test_compute_rerank_scores_no_reranker(self):
         """Test computing rerank scores without reranker."""
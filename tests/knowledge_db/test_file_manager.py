@@ -3,6 +3,7 @@ Unit tests for the FileManager class.
 """
 
 import unittest
+from datetime import datetime
 from unittest.mock import patch, MagicMock
 
 from ai_engine.knowledge_database.file_manager import FileManager
@@ -42,6 +43,25 @@ class TestFileManager(unittest.TestCase):
             self.assertEqual(result["status"], "waiting")
             self.assertEqual(result["nodes"], [])
 
+    def test_add_files(self):
+        """Test adding several files in one session."""
+        mock_session = MagicMock()
+
+        with patch.object(self.manager, 'get_session') as mock_get_session:
+            mock_get_session.return_value.__enter__.return_value = mock_session
+            
+            result = self.manager.add_files("test_db", [
+                ("file1", "test1.txt", "/path/to/test1.txt", "txt", "processing"),
+                ("file2", "test2.md", "/path/to/test2.md", "md", "processing")
+            ])
+            
+            mock_get_session.assert_called_once()
+            mock_session.add_all.assert_called_once()
+            self.assertEqual([f["uid"] for f in result], ["file1", "file2"])
+            self.assertEqual(result[1]["type"], "md")
+            self.assertEqual(result[1]["status"], "processing")
+            self.assertEqual(result[1]["nodes"], [])
+
     def test_update_file_status(self):
         """Test updating file status."""
         mock_session = MagicMock()
@@ -73,13 +93,31 @@ class TestFileManager(unittest.TestCase):
             
             self.assertFalse(result)
 
+    def test_update_files_status(self):
+        """Test updating several file statuses in one statement."""
+        mock_session = MagicMock()
+        mock_session.execute.return_value.rowcount = 2
+
+        with patch.object(self.manager, 'get_session') as mock_get_session:
+            mock_get_session.return_value.__enter__.return_value = mock_session
+            
+            result = self.manager.update_files_status({"file1": "done", "file2": "failed"})
+            
+            self.assertEqual(result, 2)
+            mock_session.execute.assert_called_once()
+
+    def test_update_files_status_empty(self):
+        """Test updating an empty batch of file statuses."""
+        with patch.object(self.manager, 'get_session') as mock_get_session:
+            result = self.manager.update_files_status({})
+            
+            self.assertEqual(result, 0)
+            mock_get_session.assert_not_called()
+
     def test_delete_file(self):
         """Test file deletion."""
         mock_session = MagicMock()
-        mock_query = MagicMock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter_by.return_value = mock_query
-        mock_query.first.return_value = MagicMock()
+        mock_session.execute.return_value.rowcount = 1
 
         with patch.object(self.manager, 'get_session') as mock_get_session:
             mock_get_session.return_value.__enter__.return_value = mock_session
@@ -87,15 +125,13 @@ class TestFileManager(unittest.TestCase):
             result = self.manager.delete_file("test_file")
             
             self.assertTrue(result)
-            mock_session.delete.assert_called_once()
+            mock_session.query.assert_not_called()
+            self.assertGreater(mock_session.execute.call_count, 1)
 
     def test_delete_nonexistent_file(self):
         """Test deletion of non-existent file."""
         mock_session = MagicMock()
-        mock_query = MagicMock()
-        mock_session.query.return_value = mock_query
-        mock_query.filter_by.return_value = mock_query
-        mock_query.first.return_value = None
+        mock_session.execute.return_value.rowcount = 0
 
         with patch.object(self.manager, 'get_session') as mock_get_session:
             mock_get_session.return_value.__enter__.return_value = mock_session
@@ -103,18 +139,21 @@ class TestFileManager(unittest.TestCase):
             result = self.manager.delete_file("nonexistent")
             
             self.assertFalse(result)
-            mock_session.delete.assert_not_called()
+            mock_session.query.assert_not_called()
+            mock_session.execute.assert_called_once()
 
     def test_get_files_by_database(self):
         """Test retrieving files by database."""
+        created_at = datetime(2024, 1, 1)
         mock_session = MagicMock()
-        mock_query = MagicMock()
-        mock_session.query.return_value = mock_query
-        mock_query.options.return_value = mock_query
-        mock_query.filter_by.return_value = mock_query
-        mock_query.all.return_value = [
-            MagicMock(as_dict=lambda: {"uid": "file1", "filename": "test1.txt"}),
-            MagicMock(as_dict=lambda: {"uid": "file2", "filename": "test2.txt"})
+        mock_session.execute.return_value.mappings.return_value.all.side_effect = [
+            [
+                {"uid": "file1", "filename": "test1.txt", "created_at": created_at},
+                {"uid": "file2", "filename": "test2.txt", "created_at": None}
+            ],
+            [
+                {"id": 1, "file_id": "file1", "text": "chunk", "metadata": None}
+            ]
         ]
 
         with patch.object(self.manager, 'get_session') as mock_get_session:
@@ -124,17 +163,16 @@ class TestFileManager(unittest.TestCase):
             
             self.assertEqual(len(result), 2)
             self.assertEqual(result[0]["uid"], "file1")
+            self.assertEqual(result[0]["created_at"], created_at.timestamp())
+            self.assertEqual(result[0]["nodes"], [{"id": 1, "file_id": "file1", "text": "chunk", "metadata": {}}])
             self.assertEqual(result[1]["filename"], "test2.txt")
+            self.assertEqual(result[1]["nodes"], [])
 
     def test_get_file_by_id(self):
         """Test retrieving specific file."""
         mock_session = MagicMock()
-        mock_query = MagicMock()
-        mock_session.query.return_value = mock_query
-        mock_query.options.return_value = mock_query
-        mock_query.filter_by.return_value = mock_query
-        mock_query.first.return_value = MagicMock(
-            as_dict=lambda: {"uid": "test_file", "filename": "test.txt"}
+        mock_session.execute.return_value.scalars.return_value.first.return_value = MagicMock(
+            as_dict_fast=lambda: {"uid": "test_file", "filename": "test.txt"}
         )
 
         with patch.object(self.manager, 'get_session') as mock_get_session:
@@ -147,5 +185,29 @@ class TestFileManager(unittest.TestCase):
             self.assertEqual(result["filename"], "test.txt")
 
 
+    def test_get_files_by_ids(self):
+        """Test several files are fetched in one query keyed by ID."""
+        mock_session = MagicMock()
+        mock_session.execute.return_value.scalars.return_value.all.return_value = [
+            MagicMock(uid="file1", as_dict_fast=lambda: {"uid": "file1", "filename": "a.txt"}),
+            MagicMock(uid="file2", as_dict_fast=lambda: {"uid": "file2", "filename": "b.txt"})
+        ]
+
+        with patch.object(self.manager, 'get_session') as mock_get_session:
+            mock_get_session.return_value.__enter__.return_value = mock_session
+
+            result = self.manager.get_files_by_ids(["file1", "file2", "file1"])
+
+            self.assertEqual(set(result), {"file1", "file2"})
+            self.assertEqual(result["file2"]["filename"], "b.txt")
+            mock_session.execute.assert_called_once()
+
+    def test_get_files_by_ids_empty(self):
+        """Test an empty lookup does not query the database."""
+        with patch.object(self.manager, 'get_session') as mock_get_session:
+            self.assertEqual(self.manager.get_files_by_ids([]), {})
+            mock_get_session.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -3,11 +3,13 @@ Unit tests for the KnowledgeBase class.
 """
 
 import os
+import asyncio
 import unittest
 from unittest.mock import patch, MagicMock
 
 from ai_engine.knowledge_database import KnowledgeBase
 from ai_engine.knowledge_database.kb_db_manager import KBDBManager
+from ai_engine.models.knowledge import DatabaseSummary
 from ai_engine.configs.agent import AgentConfig
 
 
@@ -85,25 +87,17 @@ class TestKnowledgeBase(unittest.TestCase):
         self.assertEqual(result["dimension"], 128)
         self.assertEqual(result["meta_info"], {"key": "value"})
         self.mock_milvus_manager.create_collection.assert_called_once_with(
-            "kb_d6d59f83", 128
+            "kb_d6d59f83", 128,
+            vector_dtype=self.mock_config.get.return_value,
+            index_type=self.mock_config.get.return_value
         )
 
     def test_get_databases(self):
         """Test retrieving all databases."""
         # Mock dependencies
-        self.mock_db_manager.get_all_databases.return_value = [
-            {
-                "db_id": "db1",
-                "name": "DB 1",
-                "embed_model": "test_model",
-                "meta_info": {}
-            },
-            {
-                "db_id": "db2",
-                "name": "DB 2",
-                "embed_model": "test_model",
-                "meta_info": {"type": "docs"}
-            }
+        self.mock_db_manager.iter_database_summaries.return_value = [
+            DatabaseSummary("db1", "DB 1", None, "test_model", 128, {}, 0),
+            DatabaseSummary("db2", "DB 2", None, "test_model", 128, {"type": "docs"}, 3)
         ]
         self.mock_milvus_manager.get_collection_info.return_value = {
             "row_count": 100,
@@ -120,6 +114,9 @@ class TestKnowledgeBase(unittest.TestCase):
         self.assertEqual(result["databases"][0]["db_id"], "db1")
         self.assertEqual(result["databases"][1]["db_id"], "db2")
         self.assertEqual(result["databases"][1]["meta_info"]["type"], "docs")
+        self.assertEqual(result["databases"][0]["file_count"], 0)
+        self.assertEqual(result["databases"][1]["file_count"], 3)
+        self.assertNotIn("files", result["databases"][0])
 
     def test_delete_database(self):
         """Test database deletion."""
@@ -152,14 +149,118 @@ class TestKnowledgeBase(unittest.TestCase):
                 ]
             }
         }
-        self.mock_embedding_manager.encode_texts.return_value = [[0.1, 0.2]]
+        self.mock_embedding_manager.encode_texts_iter.return_value = iter([(0, [[0.1, 0.2]])])
+        self.mock_milvus_manager.get_vector_dtype.return_value = "float32"
 
         # Add files
         self.kb.add_files("test_db", ["test.txt"])
 
         # Verify calls
-        self.mock_db_manager.add_file.assert_called_once()
-        self.mock_db_manager.update_file_status.assert_called_with("file1", "done")
+        self.mock_db_manager.add_files.assert_called_once_with(
+            "test_db", [("file1", "test.txt", "/path/to/test.txt", "txt", "processing")]
+        )
+        self.mock_db_manager.update_files_status.assert_called_once_with({"file1": "done"})
+
+    def test_add_files_single_encode(self):
+        """Test chunks of all files are encoded as one stream and each batch is split between its files."""
+        self.mock_db_manager.get_database_by_id.return_value = {
+            "db_id": "test_db",
+            "embed_model": "test_model"
+        }
+        self.mock_embedding_manager.check_model_compatibility.return_value = True
+        self.mock_doc_processor.process_files.return_value = {
+            "file1": {"filename": "a.txt", "path": "/a.txt", "type": "txt",
+                      "nodes": [{"text": "a1"}, {"text": "a2"}]},
+            "file2": {"filename": "b.txt", "path": "/b.txt", "type": "txt",
+                      "nodes": [{"text": "b1"}]}
+        }
+        self.mock_embedding_manager.encode_texts_iter.return_value = iter([
+            (0, [[0.1, 0.2]]),
+            (1, [[0.75, 0.5], [0.5, 0.25]])
+        ])
+        self.mock_milvus_manager.get_vector_dtype.return_value = "float32"
+
+        self.kb.add_files("test_db", ["a.txt", "b.txt"])
+
+        self.mock_embedding_manager.encode_texts_iter.assert_called_once_with(["a1", "a2", "b1"], batch_size=256)
+        inserted = {}
+        for call in self.mock_milvus_manager.insert_vectors_batched.call_args_list:
+            inserted.setdefault(call.args[1]["file_id"][0], []).append(call.args[1])
+        self.assertEqual([data["text"] for data in inserted["file1"]], [["a1"], ["a2"]])
+        self.assertEqual(inserted["file1"][1]["vector"].tolist(), [[0.75, 0.5]])
+        self.assertEqual(inserted["file2"][0]["vector"].tolist(), [[0.5, 0.25]])
+        self.mock_db_manager.update_files_status.assert_called_once_with({"file1": "done", "file2": "done"})
+
+    def test_add_files_insert_failure_marks_file(self):
+        """Test a failed insert fails only its own file."""
+        self.mock_db_manager.get_database_by_id.return_value = {
+            "db_id": "test_db",
+            "embed_model": "test_model"
+        }
+        self.mock_embedding_manager.check_model_compatibility.return_value = True
+        self.mock_doc_processor.process_files.return_value = {
+            "file1": {"filename": "a.txt", "path": "/a.txt", "type": "txt", "nodes": [{"text": "a1"}]},
+            "file2": {"filename": "b.txt", "path": "/b.txt", "type": "txt", "nodes": [{"text": "b1"}]}
+        }
+        self.mock_embedding_manager.encode_texts_iter.return_value = iter([(0, [[0.1, 0.2], [0.3, 0.4]])])
+        self.mock_milvus_manager.get_vector_dtype.return_value = "float32"
+
+        def insert(name, data):
+            if data["file_id"][0] == "file1":
+                raise RuntimeError("insert failed")
+            return [1]
+
+        self.mock_milvus_manager.insert_vectors_batched.side_effect = insert
+
+        self.kb.add_files("test_db", ["a.txt", "b.txt"])
+
+        self.mock_db_manager.update_files_status.assert_called_once_with({"file1": "failed", "file2": "done"})
+
+    @patch('ai_engine.knowledge_database.MAX_INFLIGHT_FILES', 1)
+    def test_add_files_async_registration_failure_releases_slot(self):
+        """Test a file that fails to register does not keep its in-flight slot."""
+        self.mock_db_manager.get_database_by_id.return_value = {
+            "db_id": "test_db",
+            "embed_model": "test_model"
+        }
+        self.mock_embedding_manager.check_model_compatibility.return_value = True
+        self.mock_db_manager.add_files.side_effect = RuntimeError("database locked")
+        chunk_infos = [
+            {"file_id": f"file{idx}", "filename": f"{idx}.txt", "path": f"/{idx}.txt", "type": "txt", "nodes": []}
+            for idx in range(3)
+        ]
+
+        async def pipeline(files, params, on_file):
+            # The real pipeline calls on_file from its io threads
+            for chunk_info in chunk_infos:
+                await asyncio.to_thread(on_file, chunk_info)
+
+        self.mock_doc_processor.process_files_pipeline.side_effect = pipeline
+
+        asyncio.run(asyncio.wait_for(self.kb.add_files_async("test_db", ["0.txt", "1.txt", "2.txt"]), timeout=5))
+
+        self.mock_db_manager.update_files_status.assert_called_once_with(
+            {"file0": "failed", "file1": "failed", "file2": "failed"}
+        )
+
+    def test_add_documents_to_milvus_streams_batches(self):
+        """Test each encoded batch is inserted with its slice of the chunks."""
+        self.mock_embedding_manager.encode_texts_iter.return_value = iter([
+            (0, [[0.1, 0.2], [0.3, 0.4]]),
+            (2, [[0.5, 0.25]])
+        ])
+        self.mock_milvus_manager.get_vector_dtype.return_value = "float32"
+        self.mock_milvus_manager.insert_vectors_batched.side_effect = lambda name, data: [len(data["text"])]
+
+        result = self.kb._add_documents_to_milvus(
+            "file1", "test_db", ["a", "b", "c"], [{"chunk_idx": 0}, {"chunk_idx": 1}, {"chunk_idx": 2}], batch_size=2
+        )
+
+        self.assertEqual(result, [2, 1])
+        self.mock_embedding_manager.encode_texts_iter.assert_called_once_with(["a", "b", "c"], batch_size=2)
+        inserted = [call.args[1] for call in self.mock_milvus_manager.insert_vectors_batched.call_args_list]
+        self.assertEqual(inserted[1]["text"], ["c"])
+        self.assertEqual(inserted[1]["chunk_idx"], [2])
 
     def test_add_files_model_mismatch(self):
         """Test adding files with incompatible model."""
@@ -177,7 +278,24 @@ class TestKnowledgeBase(unittest.TestCase):
         # Verify result
         self.assertEqual(result["status"], "failed")
         self.assertIn("Model mismatch", result["message"])
-        self.mock_db_manager.add_file.assert_not_called()
+        self.mock_db_manager.add_files.assert_not_called()
+
+    def test_add_files_dimension_mismatch(self):
+        """Test adding files to a database of another vector dimension."""
+        self.mock_db_manager.get_database_by_id.return_value = {
+            "db_id": "test_db",
+            "embed_model": "test_model",
+            "dimension": 256
+        }
+        self.mock_embedding_manager.check_model_compatibility.return_value = True
+        self.mock_embedding_manager.get_dimension.return_value = 128
+
+        result = self.kb.add_files("test_db", ["test.txt"])
+
+        self.assertEqual(result["status"], "failed")
+        self.assertIn("Dimension mismatch", result["message"])
+        self.mock_doc_processor.process_files.assert_not_called()
+        self.mock_db_manager.add_files.assert_not_called()
 
     def test_query(self):
         """Test database querying."""
@@ -228,16 +346,10 @@ class TestKnowledgeBase(unittest.TestCase):
     def test_get_retrievers(self):
         """Test getting all retrievers."""
         # Mock dependencies
-        self.mock_db_manager.get_all_databases.return_value = [
-            {
-                "db_id": "db1",
-                "name": "DB 1",
-                "description": "Test DB",
-                "embed_model": "test_model",
-                "meta_info": {"type": "docs"}
-            }
+        self.mock_db_manager.iter_database_summaries.return_value = [
+            DatabaseSummary("db1", "DB 1", "Test DB", "test_model", 128, {"type": "docs"}, 0)
         ]
-        self.mock_embedding_manager.check_model_compatibility.return_value = True
+        self.mock_embedding_manager.get_model_name.return_value = "test_model"
         mock_retriever = MagicMock()
         self.mock_query_engine.create_retriever.return_value = mock_retriever
 
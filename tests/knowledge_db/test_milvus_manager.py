@@ -3,9 +3,12 @@ Unit tests for the MilvusManager class.
 """
 
 import unittest
-from unittest.mock import patch, MagicMock
+import numpy as np
+from unittest.mock import patch, MagicMock, call
 
-from ai_engine.knowledge_database.milvus_manager import MilvusManager, MilvusException
+from ai_engine.knowledge_database.milvus_manager import (
+    MilvusManager, MilvusException, VECTOR_FIELD_TYPES, quantize_vectors, dequantize_vectors
+)
 from ai_engine.configs.agent import AgentConfig
 
 
@@ -15,7 +18,9 @@ class TestMilvusManager(unittest.TestCase):
     def setUp(self):
         """Set up test environment."""
         self.mock_config = MagicMock(spec=AgentConfig)
-        self.mock_config.get.return_value = "http://localhost:19530"
+        self.mock_config.get.side_effect = lambda key, default=None: (
+            "http://localhost:19530" if key == "milvus_uri" else default
+        )
         self.manager = MilvusManager(self.mock_config)
 
     @patch('ai_engine.knowledge_database.milvus_manager.MilvusClient')
@@ -28,7 +33,24 @@ class TestMilvusManager(unittest.TestCase):
         
         self.assertTrue(result)
         mock_client.list_collections.assert_called_once()
-        mock_client_class.assert_called_once_with(uri="http://localhost:19530")
+        self.assertEqual(mock_client_class.call_args_list[0], call(uri="http://localhost:19530"))
+        self.assertEqual(mock_client_class.call_count, self.manager.pool_size)
+        mock_client_class.assert_called_with(uri="http://localhost:19530", dedicated=True)
+
+    @patch('ai_engine.knowledge_database.milvus_manager.MilvusClient')
+    def test_client_pool_round_robin(self, mock_client_class):
+        """Test searches are spread over the client pool."""
+        clients = [MagicMock(), MagicMock()]
+        mock_client_class.side_effect = clients
+        self.manager.pool_size = 2
+        self.manager.connect()
+        self.manager._index_types["test_collection"] = "AUTOINDEX"
+        self.manager._vector_dtypes["test_collection"] = "float32"
+
+        for _ in range(4):
+            self.manager.search_vectors("test_collection", [0.1, 0.2])
+
+        self.assertEqual([client.search.call_count for client in clients], [2, 2])
 
     @patch('ai_engine.knowledge_database.milvus_manager.MilvusClient')
     def test_connect_failure(self, mock_client_class):
@@ -63,6 +85,145 @@ class TestMilvusManager(unittest.TestCase):
         )
         self.manager.client.create_collection.assert_called_once()
 
+    def test_create_collection_float16(self):
+        """Test collection creation with a float16 vector field."""
+        self.manager.client = MagicMock()
+        self.manager.client.has_collection.return_value = False
+
+        self.manager.create_collection("test_collection", 128, vector_dtype="float16")
+
+        kwargs = self.manager.client.create_collection.call_args.kwargs
+        self.assertIn("schema", kwargs)
+        self.assertIn("index_params", kwargs)
+        self.assertEqual(self.manager.get_vector_dtype("test_collection"), "float16")
+
+    @patch.dict('os.environ', {'MILVUS_GPU': '1'})
+    def test_create_collection_auto_gpu(self):
+        """Test auto index selection on a GPU server."""
+        self.manager.client = MagicMock()
+        self.manager.client.has_collection.return_value = False
+
+        self.manager.create_collection("test_collection", 128, index_type="auto")
+
+        index_params = self.manager.client.prepare_index_params.return_value
+        index_params.add_index.assert_called_once_with(
+            field_name="vector",
+            index_type="GPU_CAGRA",
+            metric_type="IP",
+            params={"intermediate_graph_degree": 128, "graph_degree": 64}
+        )
+        self.assertEqual(self.manager.get_index_type("test_collection"), "GPU_CAGRA")
+
+    def test_create_collection_ivf_pq(self):
+        """Test IVF_PQ sub-quantizer count follows the dimension."""
+        self.manager.client = MagicMock()
+        self.manager.client.has_collection.return_value = False
+
+        self.manager.create_collection("test_collection", 768, index_type="IVF_PQ")
+
+        index_params = self.manager.client.prepare_index_params.return_value
+        kwargs = index_params.add_index.call_args.kwargs
+        self.assertEqual(kwargs["index_type"], "IVF_PQ")
+        self.assertEqual(kwargs["params"]["m"], 96)
+
+    def test_search_vectors_ivf_pq_refine(self):
+        """Test IVF_PQ search over-fetches and re-ranks by exact similarity."""
+        self.manager.client = MagicMock()
+        self.manager._index_types["test_collection"] = "IVF_PQ"
+        self.manager._vector_dtypes["test_collection"] = "float32"
+        self.manager.client.search.return_value = [[
+            {"id": 1, "distance": 0.9},
+            {"id": 2, "distance": 0.8},
+            {"id": 3, "distance": 0.7}
+        ]]
+        self.manager.client.get.return_value = [
+            {"id": 1, "vector": [0.0, 1.0]},
+            {"id": 2, "vector": [1.0, 0.0]},
+            {"id": 3, "vector": [1.0, 1.0]}
+        ]
+
+        result = self.manager.search_vectors("test_collection", [1.0, 0.0], limit=2)
+
+        self.assertEqual(self.manager.client.search.call_args.kwargs["limit"], 8)
+        self.assertEqual([hit["id"] for hit in result], [2, 3])
+        self.assertAlmostEqual(result[0]["distance"], 1.0)
+
+    def test_search_vectors_batch(self):
+        """Test several queries go out in one search and one refine fetch."""
+        self.manager.client = MagicMock()
+        self.manager._index_types["test_collection"] = "IVF_PQ"
+        self.manager._vector_dtypes["test_collection"] = "float32"
+        self.manager.client.search.return_value = [
+            [{"id": 1, "distance": 0.9}, {"id": 2, "distance": 0.8}],
+            [{"id": 2, "distance": 0.9}, {"id": 1, "distance": 0.8}]
+        ]
+        self.manager.client.get.return_value = [
+            {"id": 1, "vector": [0.0, 1.0]},
+            {"id": 2, "vector": [1.0, 0.0]}
+        ]
+
+        result = self.manager.search_vectors_batch(
+            "test_collection", [[1.0, 0.0], [0.0, 1.0]], limit=1
+        )
+
+        self.manager.client.search.assert_called_once()
+        self.assertEqual(self.manager.client.search.call_args.kwargs["data"], [[1.0, 0.0], [0.0, 1.0]])
+        self.manager.client.get.assert_called_once()
+        self.assertEqual([[hit["id"] for hit in hits] for hits in result], [[2], [1]])
+
+    def test_search_vectors_cagra(self):
+        """Test CAGRA search passes itopk_size."""
+        self.manager.client = MagicMock()
+        self.manager.client.search.return_value = [[]]
+        self.manager.itopk_size = 128
+        self.manager._index_types["test_collection"] = "GPU_CAGRA"
+
+        self.manager.search_vectors("test_collection", [0.1, 0.2], limit=3)
+
+        self.assertEqual(
+            self.manager.client.search.call_args.kwargs["search_params"],
+            {"params": {"itopk_size": 128}}
+        )
+
+    @unittest.skipUnless("int8" in VECTOR_FIELD_TYPES, "pymilvus has no int8 vector fields")
+    def test_quantize_vectors_int8(self):
+        """Test per-vector int8 quantization."""
+        vectors = np.array([[0.5, -1.0, 0.25], [0.0, 0.0, 0.0]], dtype=np.float32)
+
+        quantized, scales = quantize_vectors(vectors, "int8")
+
+        self.assertEqual(quantized.dtype, np.int8)
+        self.assertEqual(quantized[0].tolist(), [64, -127, 32])
+        self.assertEqual(quantized[1].tolist(), [0, 0, 0])
+        np.testing.assert_allclose(quantized[0] * scales[0], vectors[0], atol=scales[0])
+
+    @unittest.skipUnless("int8" in VECTOR_FIELD_TYPES, "pymilvus has no int8 vector fields")
+    def test_quantize_vectors_int8_large_batch(self):
+        """Test large int8 batches quantize row by row like small ones."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((100, 8)).astype(np.float32)
+        vectors[3] = 0.0
+
+        quantized, scales = quantize_vectors(vectors, "int8")
+        small, small_scales = quantize_vectors(vectors[:2], "int8")
+
+        self.assertEqual(quantized.shape, (100, 8))
+        self.assertEqual(quantized[3].tolist(), [0] * 8)
+        self.assertEqual(float(scales[3]), 1.0)
+        np.testing.assert_array_equal(quantized[:2], small)
+        np.testing.assert_allclose(scales[:2], small_scales, rtol=1e-6)
+
+    def test_quantize_vectors_bfloat16(self):
+        """Test bfloat16 vectors are packed as bytes and round-trip closely."""
+        vectors = np.array([[0.5, -1.0, 0.3], [1e-3, 2.0, -0.7]], dtype=np.float32)
+
+        quantized, scales = quantize_vectors(vectors, "bfloat16")
+
+        self.assertIsNone(scales)
+        self.assertEqual([len(row) for row in quantized], [6, 6])
+        np.testing.assert_allclose(dequantize_vectors(quantized), vectors, rtol=1e-2)
+        np.testing.assert_array_equal(dequantize_vectors(quantized[0])[:2], [0.5, -1.0])
+
     def test_insert_vectors(self):
         """Test vector insertion."""
         self.manager.client = MagicMock()
@@ -76,6 +237,46 @@ class TestMilvusManager(unittest.TestCase):
             data=data
         )
 
+    def test_insert_vectors_columnar(self):
+        """Test columnar vector insertion is expanded into rows."""
+        self.manager.client = MagicMock()
+        self.manager.client.has_collection.return_value = True
+        vectors = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float32)
+
+        self.manager.insert_vectors("test_collection", {
+            "id": [1, 2],
+            "vector": vectors,
+            "text": ["a", "b"]
+        })
+
+        rows = self.manager.client.insert.call_args.kwargs["data"]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]["id"], 2)
+        self.assertEqual(rows[1]["text"], "b")
+        self.assertEqual(rows[1]["vector"].dtype, np.float32)
+        np.testing.assert_array_equal(rows[1]["vector"], vectors[1])
+
+    def test_insert_vectors_batched(self):
+        """Test large columnar batches are split into several inserts."""
+        self.manager.client = MagicMock()
+        self.manager.client.has_collection.return_value = True
+        vectors = np.arange(10, dtype=np.float32).reshape(5, 2)
+
+        results = self.manager.insert_vectors_batched("test_collection", {
+            "id": [1, 2, 3, 4, 5],
+            "vector": vectors,
+            "text": ["a", "b", "c", "d", "e"]
+        }, batch_size=2)
+
+        self.assertEqual(len(results), 3)
+        batches = sorted(
+            (call.kwargs["data"] for call in self.manager.client.insert.call_args_list),
+            key=lambda rows: rows[0]["id"]
+        )
+        self.assertEqual([len(rows) for rows in batches], [2, 2, 1])
+        self.assertEqual(batches[2][0]["text"], "e")
+        np.testing.assert_array_equal(batches[2][0]["vector"], vectors[4])
+
     def test_insert_vectors_no_collection(self):
         """Test vector insertion with non-existent collection."""
         self.manager.client = MagicMock()
@@ -84,6 +285,20 @@ class TestMilvusManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.manager.insert_vectors("nonexistent", [])
 
+    def test_insert_vectors_known_collection(self):
+        """Test the existence check is made once per collection."""
+        self.manager.client = MagicMock()
+        self.manager.client.has_collection.return_value = True
+
+        self.manager.insert_vectors("test_collection", [])
+        self.manager.insert_vectors("test_collection", [])
+        self.manager.client.has_collection.assert_called_once_with(collection_name="test_collection")
+
+        self.manager.drop_collection("test_collection")
+        self.manager.client.has_collection.return_value = False
+        with self.assertRaises(ValueError):
+            self.manager.insert_vectors("test_collection", [])
+
     def test_search_vectors(self):
         """Test vector similarity search."""
         self.manager.client = MagicMock()
@@ -105,6 +320,27 @@ class TestMilvusManager(unittest.TestCase):
             output_fields=["text", "file_id"]
         )
 
+    def test_rerank_candidates(self):
+        """Test exact cosine re-scoring of candidate vectors."""
+        scores = MilvusManager.rerank_candidates([1.0, 0.0], [[2.0, 0.0], [0.0, 3.0], [1.0, 1.0], [0.0, 0.0]])
+
+        self.assertEqual(scores.dtype, np.float32)
+        np.testing.assert_allclose(scores, [1.0, 0.0, 2 ** -0.5, 0.0], atol=1e-6)
+
+    def test_search_vectors_range(self):
+        """Test a distance threshold is sent as a range search."""
+        self.manager.client = MagicMock()
+        self.manager.client.search.return_value = [[{"id": 1, "distance": 0.8}]]
+        self.manager._vector_dtypes["test_collection"] = "float32"
+        self.manager._index_types["test_collection"] = "HNSW"
+
+        self.manager.search_vectors("test_collection", [0.1, 0.2], distance_threshold=0.5)
+
+        params = self.manager.client.search.call_args.kwargs["search_params"]["params"]
+        self.assertEqual(params["radius"], 0.5)
+        self.assertNotIn("range_filter", params)
+        self.assertEqual(params["ef"], 64)
+
     def test_delete_vectors(self):
         """Test vector deletion."""
         self.manager.client = MagicMock()
@@ -116,6 +352,27 @@ class TestMilvusManager(unittest.TestCase):
             filter="file_id == 'test'"
         )
 
+    def test_delete_vectors_batched(self):
+        """Test deletion by filter streams IDs and deletes them in pages."""
+        self.manager.client = MagicMock()
+        iterator = self.manager.client.query_iterator.return_value
+        iterator.next.side_effect = [[{"id": 1}, {"id": 2}], [{"id": 3}], []]
+        self.manager.client.delete.side_effect = lambda collection_name, ids: {"delete_count": len(ids)}
+
+        deleted = self.manager.delete_vectors_batched("test_collection", "file_id == 'test'", batch_size=2)
+
+        self.assertEqual(deleted, 3)
+        self.manager.client.query_iterator.assert_called_once_with(
+            collection_name="test_collection",
+            filter="file_id == 'test'",
+            output_fields=["id"],
+            batch_size=2
+        )
+        self.assertEqual(
+            sorted(c.kwargs["ids"] for c in self.manager.client.delete.call_args_list), [[1, 2], [3]]
+        )
+        iterator.close.assert_called_once()
+
     def test_drop_collection(self):
         """Test collection deletion."""
         self.manager.client = MagicMock()
@@ -139,6 +396,22 @@ class TestMilvusManager(unittest.TestCase):
         self.assertEqual(result["row_count"], 100)
         self.assertEqual(result["stats"], "test")
 
+    def test_get_collection_info_cached(self):
+        """Test collection info is cached until the collection is written."""
+        self.manager.client = MagicMock()
+        self.manager.client.describe_collection.side_effect = lambda name: {"name": name}
+        self.manager.client.get_collection_stats.return_value = {"row_count": 1}
+        self.manager.client.list_collections.return_value = ["a", "b"]
+
+        self.manager.refresh_all()
+        self.manager.get_collection_info("a")
+        self.manager.get_collection_info("b")
+        self.assertEqual(self.manager.client.describe_collection.call_count, 2)
+
+        self.manager.delete_vectors("a", "file_id == 'test'")
+        self.manager.get_collection_info("a")
+        self.assertEqual(self.manager.client.describe_collection.call_count, 3)
+
     def test_get_collection_info_error(self):
         """Test getting information for non-existent collection."""
         self.manager.client = MagicMock()
@@ -156,6 +156,16 @@ class TestNodeManager(unittest.TestCase):
             self.assertEqual(result[0]["text"], "Test content")
             mock_query.filter.assert_called_once()
 
+    def test_get_nodes_by_filter_fts(self):
+        """Test text search through the full-text index matches substrings."""
+        self.assertTrue(self.manager.fts_enabled)
+        self.manager.add_node(file_id="fts_file", text="Quarterly FTSMARKER report")
+        self.manager.add_node(file_id="fts_file", text="Unrelated content")
+
+        result = self.manager.get_nodes_by_filter(file_id="fts_file", search_text="ftsmark")
+
+        self.assertEqual([node["text"] for node in result], ["Quarterly FTSMARKER report"])
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
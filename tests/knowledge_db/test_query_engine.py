@@ -2,10 +2,11 @@
 Unit tests for the QueryEngine class.
 """
 
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 
-from ai_engine.knowledge_database.query_engine import QueryEngine
+from ai_engine.knowledge_database.query_engine import QueryEngine, TTLCache, _RERANK_CACHE
 from ai_engine.configs.agent import AgentConfig
 
 
@@ -16,6 +17,7 @@ class TestQueryEngine(unittest.TestCase):
         """Set up test environment."""
         self.mock_config = MagicMock(spec=AgentConfig)
         self.mock_config.enable_rerank = True
+        self.mock_config.get.side_effect = lambda key, default=None: default
         
         self.mock_milvus = MagicMock()
         self.mock_embedding = MagicMock()
@@ -46,6 +48,66 @@ class TestQueryEngine(unittest.TestCase):
             "test_collection", [0.1, 0.2], 3
         )
 
+    def test_search_micro_batching(self):
+        """Test concurrent searches are flushed as one multi-query request."""
+        self.engine.micro_batching = True
+        self.mock_embedding.encode_single_text.side_effect = lambda text: [float(len(text))]
+        self.mock_milvus.search_vectors_batch.side_effect = (
+            lambda collection, vectors, limit: [[{"id": int(v[0])}] for v in vectors]
+        )
+        batcher = self.engine._get_search_batcher("test_collection")
+        batcher.max_wait = 0.5
+        batcher.batch_size = 2
+
+        results = {}
+        threads = [
+            threading.Thread(target=lambda q=q: results.__setitem__(q, self.engine.search(q, "test_collection", limit=3)))
+            for q in ("a", "bb")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {"a": [{"id": 1}], "bb": [{"id": 2}]})
+        self.mock_milvus.search_vectors_batch.assert_called_once()
+        self.mock_milvus.search_vectors.assert_not_called()
+
+    def test_search_queued_groups_by_limit(self):
+        """Test one batcher flush searches once per limit and threshold, keeping item order."""
+        self.mock_milvus.search_vectors_batch.side_effect = (
+            lambda collection, vectors, limit, **kwargs: [[{"id": v[0], "limit": limit}] for v in vectors]
+        )
+
+        results = self.engine._search_queued("test_collection", [([1], 3, None), ([2], 5, None), ([3], 3, None)])
+
+        self.assertEqual([hits[0]["id"] for hits in results], [1, 2, 3])
+        self.assertEqual([hits[0]["limit"] for hits in results], [3, 5, 3])
+        self.assertEqual(self.mock_milvus.search_vectors_batch.call_count, 2)
+
+    def test_close_search_batcher(self):
+        """Test closing a collection's batcher stops its thread and forgets it."""
+        batcher = self.engine._get_search_batcher("test_collection")
+
+        self.engine.close_search_batcher("test_collection")
+        batcher._worker.join(timeout=1)
+
+        self.assertFalse(batcher._worker.is_alive())
+        self.assertNotIn("test_collection", self.engine._search_batchers)
+
+    def test_search_many(self):
+        """Test several queries are encoded and searched in one batch."""
+        self.mock_embedding.encode_batch.return_value = [[0.1], [0.2]]
+        self.mock_milvus.search_vectors_batch.return_value = [[{"id": 1}], [{"id": 2}]]
+
+        result = self.engine.search_many(["q1", "q2"], "test_collection", limit=5)
+
+        self.assertEqual(result, [[{"id": 1}], [{"id": 2}]])
+        self.mock_embedding.encode_batch.assert_called_once_with(["q1", "q2"])
+        self.mock_milvus.search_vectors_batch.assert_called_once_with(
+            "test_collection", [[0.1], [0.2]], 5
+        )
+
     def test_advanced_query_with_rerank(self):
         """Test advanced query with reranking enabled."""
         # Setup mocks
@@ -66,10 +128,10 @@ class TestQueryEngine(unittest.TestCase):
                 }
             }
         ]
-        self.mock_db.get_file_by_id.side_effect = [
-            {"uid": "file1", "filename": "test1.txt"},
-            {"uid": "file2", "filename": "test2.txt"}
-        ]
+        self.mock_db.get_files_by_ids.return_value = {
+            "file1": {"uid": "file1", "filename": "test1.txt"},
+            "file2": {"uid": "file2", "filename": "test2.txt"}
+        }
         self.mock_embedding.compute_rerank_scores.return_value = [0.9, 0.7]
         
         # Execute query
@@ -91,13 +153,93 @@ class TestQueryEngine(unittest.TestCase):
         # Verify mock calls
         self.mock_embedding.encode_single_text.assert_called_once_with("test query")
         self.mock_milvus.search_vectors.assert_called_once()
-        self.mock_db.get_file_by_id.assert_any_call("file1")
-        self.mock_db.get_file_by_id.assert_any_call("file2")
+        self.mock_db.get_files_by_ids.assert_called_once_with({"file1", "file2"})
+        self.assertEqual(result["results"][1]["file"]["filename"], "test2.txt")
         self.mock_embedding.compute_rerank_scores.assert_called_once_with(
             "test query",
             ["test text 1", "test text 2"]
         )
 
+    def test_advanced_query_rerank_cached(self):
+        """Test rerank scores are reused for the same query and candidates."""
+        _RERANK_CACHE.clear()
+        self.mock_embedding.encode_single_text.return_value = [0.1, 0.2]
+        self.mock_milvus.search_vectors.return_value = [
+            {"id": 1, "distance": 0.8, "entity": {"file_id": "file1", "text": "test text 1"}},
+            {"id": 2, "distance": 0.7, "entity": {"file_id": "file1", "text": "test text 2"}}
+        ]
+        self.mock_db.get_files_by_ids.return_value = {"file1": {"uid": "file1"}}
+        self.mock_embedding.compute_rerank_scores.return_value = [0.2, 0.9]
+
+        first = self.engine.advanced_query("test query", "test_db", rerank_threshold=0.1)
+        second = self.engine.advanced_query("test query", "test_db", rerank_threshold=0.1)
+
+        self.mock_embedding.compute_rerank_scores.assert_called_once()
+        self.assertEqual([r["id"] for r in second["results"]], [2, 1])
+        self.assertEqual([r["rerank_score"] for r in first["results"]], [r["rerank_score"] for r in second["results"]])
+
+    def test_advanced_query_hit_conversion(self):
+        """Test plain dict hits are used as-is and other mappings are converted."""
+        from collections import UserDict
+        self.mock_config.enable_rerank = False
+        self.mock_embedding.encode_single_text.return_value = [0.1, 0.2]
+        plain = {"id": 1, "distance": 0.8, "entity": {"file_id": "file1", "text": "a"}}
+        wrapped = UserDict({"id": 2, "distance": 0.7, "entity": {"file_id": "file1", "text": "b"}})
+        self.mock_milvus.search_vectors.return_value = [plain, wrapped]
+        self.mock_db.get_files_by_ids.return_value = {}
+
+        result = self.engine.advanced_query("test query", "test_db")
+
+        self.assertIs(result["all_results"][0], plain)
+        self.assertIs(type(result["all_results"][1]), dict)
+
+    def test_advanced_query_many_hits_filter(self):
+        """Test large hit lists are filtered and cut to top_k in search order."""
+        self.mock_config.enable_rerank = False
+        self.mock_embedding.encode_single_text.return_value = [0.1, 0.2]
+        self.mock_milvus.search_vectors.return_value = [
+            {"id": i, "distance": d, "entity": {"file_id": "file1", "text": str(i)}}
+            for i, d in enumerate([0.9, 0.2, 0.8, 0.7] * 20)
+        ]
+        self.mock_db.get_files_by_ids.return_value = {}
+
+        result = self.engine.advanced_query("test query", "test_db", distance_threshold=0.5, top_k=4)
+
+        self.assertEqual([r["id"] for r in result["results"]], [0, 2, 3, 4])
+        self.assertEqual(len(result["all_results"]), 80)
+
+    def test_ttl_cache_expiry(self):
+        """Test TTL cache entries expire and the oldest are evicted."""
+        cache = TTLCache(max_items=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), 3)
+
+        cache.ttl = -1
+        cache.set("d", 4)
+        self.assertIsNone(cache.get("d"))
+
+    def test_retriever_batch(self):
+        """Test a batch retriever searches all queries in one request."""
+        self.mock_config.enable_rerank = False
+        self.mock_embedding.encode_batch.return_value = [[0.1], [0.2]]
+        self.mock_milvus.search_vectors_batch.return_value = [
+            [{"distance": 0.8, "entity": {"file_id": "file1", "text": "a"}}],
+            [{"distance": 0.3, "entity": {"file_id": "file1", "text": "b"}}]
+        ]
+        self.mock_db.get_files_by_ids.return_value = {"file1": {"uid": "file1"}}
+
+        retriever = self.engine.create_retriever("test_db", distance_threshold=0.5)
+        results = retriever.batch(["q1", "q2"])
+
+        self.assertEqual([len(r) for r in results], [1, 0])
+        self.mock_milvus.search_vectors_batch.assert_called_once_with(
+            "test_db", [[0.1], [0.2]], 20, distance_threshold=0.5
+        )
+        self.mock_milvus.search_vectors.assert_not_called()
+
     def test_advanced_query_without_rerank(self):
         """Test advanced query with reranking disabled."""
         # Setup mocks
@@ -112,9 +254,8 @@ class TestQueryEngine(unittest.TestCase):
                 }
             }
         ]
-        self.mock_db.get_file_by_id.return_value = {
-            "uid": "file1",
-            "filename": "test.txt"
+        self.mock_db.get_files_by_ids.return_value = {
+            "file1": {"uid": "file1", "filename": "test.txt"}
         }
         
         # Execute query
@@ -145,9 +286,8 @@ class TestQueryEngine(unittest.TestCase):
                 }
             }
         ]
-        self.mock_db.get_file_by_id.return_value = {
-            "uid": "file1",
-            "filename": "test.txt"
+        self.mock_db.get_files_by_ids.return_value = {
+            "file1": {"uid": "file1", "filename": "test.txt"}
         }
         self.mock_embedding.reranker = None
         self.mock_config.enable_rerank = False
@@ -171,7 +311,42 @@ class TestQueryEngine(unittest.TestCase):
         # Verify mock calls
         self.mock_embedding.encode_single_text.assert_called_once_with("test query")
         self.mock_milvus.search_vectors.assert_called_once()
-        self.mock_db.get_file_by_id.assert_called_once_with("file1")
+        self.mock_db.get_files_by_ids.assert_called_once_with({"file1"})
+
+    def test_create_retriever_micro_batching(self):
+        """Test retrievers submit their limit and threshold to the collection's search batcher."""
+        self.engine.micro_batching = True
+        self.mock_config.enable_rerank = False
+        self.mock_embedding.encode_single_text.return_value = [0.1, 0.2]
+        self.mock_milvus.search_vectors_batch.return_value = [[
+            {"distance": 0.8, "entity": {"file_id": "file1", "text": "test text"}}
+        ]]
+        self.mock_db.get_files_by_ids.return_value = {"file1": {"uid": "file1"}}
+
+        retriever = self.engine.create_retriever("test_db", distance_threshold=0.5, max_query_count=10)
+        results = retriever("test query")
+
+        self.assertEqual(len(results), 1)
+        self.mock_milvus.search_vectors_batch.assert_called_once_with(
+            "test_db", [[0.1, 0.2]], 10, distance_threshold=0.5
+        )
+        self.mock_milvus.search_vectors.assert_not_called()
+        self.engine.close_search_batcher("test_db")
+
+    def test_retriever_files_for_results_only(self):
+        """Test retrievers look up files only for the hits they return."""
+        self.mock_config.enable_rerank = False
+        self.mock_embedding.encode_single_text.return_value = [0.1, 0.2]
+        self.mock_milvus.search_vectors.return_value = [
+            {"distance": 0.8, "entity": {"file_id": "file1", "text": "a"}},
+            {"distance": 0.3, "entity": {"file_id": "file2", "text": "b"}}
+        ]
+        self.mock_db.get_files_by_ids.return_value = {"file1": {"uid": "file1"}}
+
+        results = self.engine.create_retriever("test_db", distance_threshold=0.5)("test query")
+
+        self.assertEqual(results[0]["file"], {"uid": "file1"})
+        self.mock_db.get_files_by_ids.assert_called_once_with({"file1"})
 
 
 if __name__ == '__main__':
@@ -0,0 +1,210 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+from transformers import BatchEncoding
+from FlagEmbedding import FlagModel
+from ai_engine.models.embedding import BaseEmbeddingModel, LocalEmbeddingModel, OnnxEmbeddingModel
+
+
+class FakeEmbedding(BaseEmbeddingModel):
+    """Embeds "<index>:<padding>" texts as [index, length], recording what each batch saw."""
+    dimension = 2
+    prefetch = True
+
+    def __init__(self, fail_at=None):
+        super().__init__()
+        self.fail_at = fail_at
+        self.prepared = []
+        self.embedded = []
+        self.prepare_threads = set()
+
+    def _prepare_segment(self, segment):
+        if len(self.prepared) == self.fail_at:
+            raise RuntimeError("tokenizer failed")
+        self.prepare_threads.add(threading.current_thread().name)
+        self.prepared.append(segment)
+        return [len(text) for text in segment]
+
+    def _embed_prepared(self, segment, prepared):
+        self.embedded.append(segment)
+        return np.array([[float(text.split(":")[0]), float(length)] for text, length in zip(segment, prepared)])
+
+    def run_inference(self, input_data):
+        return self._embed_prepared(input_data, self._prepare_segment(input_data))
+
+
+@pytest.fixture
+def mixed_texts():
+    lengths = [30, 2, 17, 9, 25, 1, 12, 40, 5, 21]
+    return [f"{idx}:" + "x" * length for idx, length in enumerate(lengths)]
+
+
+def expected_vectors(texts):
+    return np.array([[idx, len(text)] for idx, text in enumerate(texts)], dtype=np.float32)
+
+
+def test_batch_vectorize_prefetch_keeps_input_order(mixed_texts):
+    model = FakeEmbedding()
+
+    result = model.batch_vectorize(mixed_texts, batch_limit=3)
+
+    assert isinstance(result, np.ndarray)
+    assert result.dtype == np.float32
+    np.testing.assert_array_equal(result, expected_vectors(mixed_texts))
+    # Batches were prepared on the prefetch thread, in order of length
+    assert model.prepare_threads == {"embed-prefetch"}
+    assert len(model.embedded) == 4
+    lengths = [len(text) for segment in model.embedded for text in segment]
+    assert lengths == sorted(lengths)
+
+
+def test_batch_vectorize_fills_preallocated_out(mixed_texts):
+    model = FakeEmbedding()
+    out = np.full((len(mixed_texts), 2), -1.0, dtype=np.float32)
+
+    result = model.batch_vectorize(mixed_texts, batch_limit=3, out=out)
+
+    assert result is out
+    np.testing.assert_array_equal(out, expected_vectors(mixed_texts))
+
+
+def test_batch_vectorize_without_dimension_returns_list(mixed_texts):
+    model = FakeEmbedding()
+    model.dimension = None
+
+    result = model.batch_vectorize(mixed_texts, batch_limit=3)
+
+    assert isinstance(result, list)
+    np.testing.assert_array_equal(np.array(result), expected_vectors(mixed_texts))
+
+
+def test_batch_vectorize_prefetch_error_propagates(mixed_texts):
+    model = FakeEmbedding(fail_at=2)
+
+    with pytest.raises(RuntimeError, match="tokenizer failed"):
+        model.batch_vectorize(mixed_texts, batch_limit=3)
+    assert len(model.embedded) == 2
+
+
+class StubTokenizer:
+    """Character-level tokenizer with the call and pad interface FlagModel uses."""
+    pad_token_id = 0
+
+    def __call__(self, texts, padding=False, truncation=True, max_length=None, **kwargs):
+        input_ids = [[ord(char) % 63 + 1 for char in text][:max_length] for text in texts]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, inputs, padding=True, return_tensors="pt", **kwargs):
+        width = max(len(ids) for ids in inputs["input_ids"])
+        return BatchEncoding({
+            "input_ids": [list(ids) + [self.pad_token_id] * (width - len(ids)) for ids in inputs["input_ids"]],
+            "attention_mask": [[1] * len(ids) + [0] * (width - len(ids)) for ids in inputs["input_ids"]]
+        }, tensor_type=return_tensors)
+
+
+class StubEncoder(torch.nn.Module):
+    """Embedding plus a layer mixing in the mean of the unmasked tokens, so padding would show."""
+
+    def __init__(self, dim=8):
+        super().__init__()
+        torch.manual_seed(0)
+        self.embed = torch.nn.Embedding(64, dim)
+        self.mix = torch.nn.Linear(dim, dim)
+
+    def forward(self, input_ids, attention_mask, return_dict=True):
+        hidden = self.embed(input_ids)
+        mask = attention_mask.unsqueeze(-1).float()
+        context = (hidden * mask).sum(dim=1, keepdim=True) / mask.sum(dim=1, keepdim=True)
+        return SimpleNamespace(last_hidden_state=hidden + self.mix(context))
+
+
+def stub_local_model(pooling_method):
+    """A LocalEmbeddingModel around the stub tokenizer and encoder, without loading weights."""
+    model = LocalEmbeddingModel.__new__(LocalEmbeddingModel)
+    BaseEmbeddingModel.__init__(model)
+    model._token_cache = OrderedDict()
+    model._token_cache_lock = threading.Lock()
+    model.tokenizer = StubTokenizer()
+    model.model = StubEncoder()
+    model.dimension = 8
+    model.target_devices = ["cpu"]
+    model.pool = None
+    model.pooling_method = pooling_method
+    model.normalize_embeddings = True
+    model.use_fp16 = False
+    model.use_bf16 = False
+    model.convert_to_numpy = True
+    model.truncate_dim = None
+    model.batch_size = 4
+    model.passage_max_length = 16
+    return model
+
+
+@pytest.mark.parametrize("pooling_method", ["cls", "mean"])
+def test_local_embedding_matches_flag_model_encode(pooling_method, mixed_texts):
+    model = stub_local_model(pooling_method)
+    # Longer than passage_max_length, so truncation is compared too
+    texts = mixed_texts + ["y" * 40]
+
+    expected = FlagModel.encode(model, texts)
+    result = model.run_inference(texts)
+    batched = model.batch_vectorize(texts, batch_limit=3)
+
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(batched, expected, rtol=1e-5, atol=1e-6)
+    assert all(len(ids) <= 16 for ids in model._token_cache.values())
+
+
+def test_onnx_embedding_requires_export_for_hub_model(monkeypatch):
+    monkeypatch.delenv("MODEL_DIR", raising=False)
+    config = SimpleNamespace(
+        embed_model="bge",
+        embed_model_names={"bge": {"name": "BAAI/bge-m3", "dimension": 8}},
+        model_local_paths={},
+        device="cpu",
+    )
+
+    with pytest.raises(ValueError, match="onnx_path"):
+        OnnxEmbeddingModel(config)
+
+
+class FakeAsyncEmbedding(FakeEmbedding):
+    """Network-bound fake whose requests for shorter texts take longer, so they finish out of order."""
+    network_bound = True
+    max_tokens_per_batch = 12
+
+    async def arun_inference(self, input_data):
+        await asyncio.sleep(0.05 / max(len(text) for text in input_data))
+        return self.run_inference(input_data)
+
+
+def test_pack_batches_respects_limits(mixed_texts):
+    model = FakeAsyncEmbedding()
+    items = sorted(mixed_texts, key=len)
+
+    starts, segments = model._pack_batches(items, batch_limit=3)
+
+    assert [text for segment in segments for text in segment] == items
+    assert starts == [sum(map(len, segments[:idx])) for idx in range(len(segments))]
+    for segment in segments:
+        tokens = model._token_counts(segment)
+        assert len(segment) <= 3
+        assert len(segment) == 1 or len(segment) * max(tokens) <= model.max_tokens_per_batch
+    # The token budget ends batches before batch_limit does
+    assert len(segments) > -(-len(items) // 3)
+
+
+def test_abatch_vectorize_concurrent_restores_input_order(mixed_texts):
+    model = FakeAsyncEmbedding()
+
+    result = asyncio.run(model.abatch_vectorize_concurrent(mixed_texts, batch_limit=3, max_in_flight=3))
+
+    np.testing.assert_array_equal(np.array(result), expected_vectors(mixed_texts))
+    # Each request was one of the batches packed from the length-sorted texts
+    _, segments = model._pack_batches(sorted(mixed_texts, key=len), batch_limit=3)
+    assert sorted(model.embedded) == sorted(segments)
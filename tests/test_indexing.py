@@ -1,7 +1,7 @@
 import pytest
 import os
 from pathlib import Path
-from ai_engine.core.indexing import chunk, pdfreader, plainreader, read_text
+from ai_engine.core.indexing import chunk, pdfreader, plainreader, read_text, read_text_fast
 
 @pytest.fixture
 def sample_text():
@@ -58,4 +58,18 @@ def test_chunk_with_different_sizes():
     nodes1 = chunk(text, params1)
     nodes2 = chunk(text, params2)
     
-    assert len(nodes1) >= len(nodes2)  # Smaller chunk size should result in more chunks 
\ No newline at end of file
+    assert len(nodes1) >= len(nodes2)  # Smaller chunk size should result in more chunks 
+
+def test_chunk_text_without_separators():
+    text = "abcdefghij" * 2000
+    nodes = chunk(text, {"chunk_size": 100, "chunk_overlap": 20})
+    assert len(nodes) > 1
+    assert all(len(node.text) < len(text) for node in nodes)
+    assert text.startswith(nodes[0].text)
+
+def test_read_text_fast_empty_pdf(tmp_path):
+    from pypdf import PdfWriter
+    file_path = tmp_path / "empty.pdf"
+    with open(file_path, "wb") as f:
+        PdfWriter().write(f)
+    assert read_text_fast(str(file_path)) == ""
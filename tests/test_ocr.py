@@ -1,7 +1,9 @@
+import threading
 import unittest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 import numpy as np
-from ai_engine.tools.ocr import EasyOcrProcessor
+from ai_engine.tools.ocr import OcrProcessor, RENDER_QUEUE_SIZE
 
 class TestEasyOcrProcessor(unittest.TestCase):
     @patch('ai_engine.tools.ocr.easyocr.Reader')
@@ -12,11 +14,84 @@ class TestEasyOcrProcessor(unittest.TestCase):
             (None, 'Hello', None),
             (None, 'World', None)
         ]
-        processor = EasyOcrProcessor(languages=['en'])
+        processor = OcrProcessor(languages=['en'])
         # Tạo ảnh giả dạng numpy array
         img = np.zeros((10, 10, 3), dtype=np.uint8)
         text = processor.recognize_text_from_image(img)
         self.assertEqual(text, 'Hello\nWorld')
 
+
+def fake_page(number, rendered):
+    """A PDF page whose 1x1 render carries its page number in the pixel value."""
+    def get_pixmap(**kwargs):
+        rendered.append(number)
+        return SimpleNamespace(samples=bytes([number] * 3), height=1, width=1, n=3)
+    return SimpleNamespace(get_pixmap=get_pixmap)
+
+
+def read_page_number(image):
+    return [(None, f"page {image[0, 0, 0]}", 1.0)]
+
+
+class TestScannedPdf(unittest.TestCase):
+    def setUp(self):
+        reader_patcher = patch('ai_engine.tools.ocr.easyocr.Reader')
+        self.reader = reader_patcher.start().return_value
+        self.addCleanup(reader_patcher.stop)
+        open_patcher = patch('ai_engine.tools.ocr.fitz.open')
+        self.fitz_open = open_patcher.start()
+        self.addCleanup(open_patcher.stop)
+        self.rendered = []
+        self.processor = OcrProcessor(languages=['en'])
+
+    def open_pages(self, pages):
+        doc = MagicMock()
+        doc.__iter__.side_effect = lambda: iter(pages)
+        self.fitz_open.return_value.__enter__.return_value = doc
+
+    def assert_render_thread_stops(self):
+        for thread in threading.enumerate():
+            if thread.name == "ocr-render":
+                thread.join(timeout=5)
+                self.assertFalse(thread.is_alive())
+
+    def test_pages_keep_their_order(self):
+        """Test pages rendered ahead of the OCR come out in document order."""
+        count = RENDER_QUEUE_SIZE * 3
+        self.open_pages([fake_page(i, self.rendered) for i in range(count)])
+        self.reader.readtext.side_effect = read_page_number
+
+        text = self.processor._process_scanned_pdf("scan.pdf")
+
+        self.assertEqual(text, "\n\n".join(f"page {i}" for i in range(count)))
+        self.fitz_open.assert_called_once_with("scan.pdf")
+
+    def test_render_error_is_raised(self):
+        """Test an error while rendering reaches the caller after the pages before it."""
+        def pages():
+            yield fake_page(0, self.rendered)
+            raise RuntimeError("broken page")
+
+        self.open_pages(pages())
+        self.reader.readtext.side_effect = read_page_number
+
+        with self.assertRaisesRegex(RuntimeError, "broken page"):
+            self.processor._process_scanned_pdf("scan.pdf")
+        self.assertEqual(self.reader.readtext.call_count, 1)
+        self.assert_render_thread_stops()
+
+    def test_ocr_error_stops_rendering(self):
+        """Test the render thread gives up on the remaining pages when the OCR fails."""
+        count = RENDER_QUEUE_SIZE * 10
+        self.open_pages([fake_page(i, self.rendered) for i in range(count)])
+        self.reader.readtext.side_effect = RuntimeError("ocr failed")
+
+        with self.assertRaisesRegex(RuntimeError, "ocr failed"):
+            self.processor._process_scanned_pdf("scan.pdf")
+        self.assert_render_thread_stops()
+        # At most a full queue, the page being put and the page taken were rendered
+        self.assertLessEqual(len(self.rendered), RENDER_QUEUE_SIZE + 2)
+
+
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    unittest.main()